@@ -218,7 +218,17 @@ register(
     content_type="application/json",
     content_encoding="utf-8",
 )
-CELERY_WORKER_MAX_TASKS_PER_CHILD = 1
+# By default each celery task runs in a fresh worker process. With SEED_CELERY_WARM_WORKERS enabled, the worker
+# processes are reused: a process is recycled once it uses more than SEED_CELERY_WORKER_MAX_MEMORY_PER_CHILD (KiB)
+# instead of after every task, per-task state is reset after each task (see seed/celery.py), and the database
+# connections are kept open for SEED_CELERY_CONN_MAX_AGE seconds.
+SEED_CELERY_WARM_WORKERS = os.environ.get("SEED_CELERY_WARM_WORKERS", "false").lower() in {"true", "1", "on"}
+SEED_CELERY_CONN_MAX_AGE = int(os.environ.get("SEED_CELERY_CONN_MAX_AGE", "600"))
+if SEED_CELERY_WARM_WORKERS:
+    CELERY_WORKER_MAX_TASKS_PER_CHILD = None
+    CELERY_WORKER_MAX_MEMORY_PER_CHILD = int(os.environ.get("SEED_CELERY_WORKER_MAX_MEMORY_PER_CHILD", "512000"))
+else:
+    CELERY_WORKER_MAX_TASKS_PER_CHILD = 1
 CELERY_ACCEPT_CONTENT = ["seed_json", "pickle"]
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TASK_SERIALIZER = "seed_json"
@@ -228,6 +238,12 @@ CELERY_TASK_COMPRESSION = "gzip"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# Import, mapping, data quality and matching work is fanned out to celery in chunks of rows. The chunk
+# size is computed from the number of rows, columns and workers unless SEED_IMPORT_CHUNK_SIZE is set
+# (which can also be overridden per organization).
+SEED_IMPORT_CHUNK_SIZE = int(os.environ["SEED_IMPORT_CHUNK_SIZE"]) if os.environ.get("SEED_IMPORT_CHUNK_SIZE") else None
+SEED_IMPORT_WORKER_COUNT = int(os.environ.get("SEED_IMPORT_WORKER_COUNT", os.cpu_count() or 1))
+
 # hmm, we are logging outside the context of the app?
 LOG_FILE = os.path.join(BASE_DIR, "../logs/py.log/")
 
@@ -41,4 +41,9 @@ fi
 
 echo "Number of workers will be set to: $NUMBER_OF_WORKERS"
 celery -A seed beat -l INFO --uid 1000 -S django_celery_beat.schedulers:DatabaseScheduler &
-celery -A seed worker -l INFO -c $NUMBER_OF_WORKERS --max-tasks-per-child 1000 --uid 1000 -E
+# Warm workers are recycled by memory use (see SEED_CELERY_WARM_WORKERS in config/settings/common.py)
+if [[ "${SEED_CELERY_WARM_WORKERS,,}" =~ ^(true|1|on)$ ]]; then
+    celery -A seed worker -l INFO -c $NUMBER_OF_WORKERS --uid 1000 -E
+else
+    celery -A seed worker -l INFO -c $NUMBER_OF_WORKERS --max-tasks-per-child 1000 --uid 1000 -E
+fi
@@ -5,8 +5,10 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 
 import datetime
 import logging
+from collections import defaultdict
 
 from celery import chain, shared_task
+from django.db.models import F, Max, Window
 
 from seed.analysis_pipelines.pipeline import (
     AnalysisPipeline,
@@ -14,7 +16,7 @@ from seed.analysis_pipelines.pipeline import (
     analysis_pipeline_task,
     task_create_analysis_property_views,
 )
-from seed.analysis_pipelines.utils import SimpleMeterReading, get_days_in_reading
+from seed.analysis_pipelines.utils import SimpleMeterReading, get_number_of_days_covered
 from seed.models import Analysis, AnalysisMessage, AnalysisPropertyView, Column, Meter, MeterReading, PropertyView
 
 logger = logging.getLogger(__name__)
@@ -624,32 +626,28 @@ def _get_valid_meters(property_view_ids):
     """
     invalid_meter = []
     meter_readings_by_property_view = {}
-    property_views = PropertyView.objects.filter(id__in=property_view_ids)
+    property_views = list(PropertyView.objects.filter(id__in=property_view_ids))
+
+    # get all readings that started AND ended between the most recent electric meter reading's
+    # end_time and a year prior, for all properties at once
+    meter_readings = (
+        MeterReading.objects.filter(
+            meter__property_id__in={property_view.property_id for property_view in property_views}, meter__type__in=VALID_METERS
+        )
+        .annotate(latest_end_time=Window(Max("end_time"), partition_by=F("meter__property_id")))
+        .filter(start_time__gte=F("latest_end_time") - TIME_PERIOD)
+        .order_by("start_time")
+    )
+    meter_readings_by_property_id = defaultdict(list)
+    for property_id, start_time, end_time, reading in meter_readings.values_list("meter__property_id", "start_time", "end_time", "reading"):
+        meter_readings_by_property_id[property_id].append(SimpleMeterReading(start_time, end_time, reading))
+
     for property_view in property_views:
-        # get the most recent electric meter reading's end_time
-        try:
-            end_time = (
-                MeterReading.objects.filter(meter__property=property_view.property, meter__type__in=VALID_METERS)
-                .order_by("end_time")
-                .last()
-                .end_time
-            )
-        except Exception:
+        if property_view.property_id not in meter_readings_by_property_id:
             invalid_meter.append(property_view.id)
             continue
 
-        # get all readings that started AND ended between end_time and a year prior
-        property_meter_readings = [
-            SimpleMeterReading(reading.start_time, reading.end_time, reading.reading)
-            for reading in MeterReading.objects.filter(
-                meter__property=property_view.property,
-                meter__type__in=VALID_METERS,
-                end_time__lte=end_time,
-                start_time__gte=end_time - TIME_PERIOD,
-            ).order_by("start_time")
-        ]
-
-        meter_readings_by_property_view[property_view.id] = property_meter_readings
+        meter_readings_by_property_view[property_view.id] = meter_readings_by_property_id[property_view.property_id]
 
     errors_by_property_view_id = {}
     for pid in invalid_meter:
@@ -674,7 +672,6 @@ def _calculate_co2(meter_readings, region_code):
     """
     total_reading = 0
     total_average = 0
-    days_affected_by_readings = set()
     for meter_reading in meter_readings:
         reading_mwh = meter_reading.reading / 3.412 / 1000  # convert from kBtu to MWh
         total_reading += reading_mwh
@@ -683,9 +680,7 @@ def _calculate_co2(meter_readings, region_code):
         if rate is None:
             raise Exception(f"Failed to find CO2 rate for {region_code} in {year}")
         total_average += reading_mwh * rate
-        for day in get_days_in_reading(meter_reading):
-            days_affected_by_readings.add(day)
-    total_seconds_covered = len(days_affected_by_readings) * datetime.timedelta(days=1).total_seconds()
+    total_seconds_covered = get_number_of_days_covered(meter_readings) * datetime.timedelta(days=1).total_seconds()
     fraction_of_time_covered = total_seconds_covered / TIME_PERIOD.total_seconds()
     return {
         "average_annual_kgco2e": round(total_average),
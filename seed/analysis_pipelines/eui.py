@@ -5,8 +5,10 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 
 import datetime
 import logging
+from collections import defaultdict
 
 from celery import chain, shared_task
+from django.db.models import F, Max, Window
 
 from seed.analysis_pipelines.pipeline import (
     AnalysisPipeline,
@@ -14,7 +16,7 @@ from seed.analysis_pipelines.pipeline import (
     analysis_pipeline_task,
     task_create_analysis_property_views,
 )
-from seed.analysis_pipelines.utils import SimpleMeterReading, get_days_in_reading
+from seed.analysis_pipelines.utils import SimpleMeterReading, get_number_of_days_covered
 from seed.models import Analysis, AnalysisMessage, AnalysisPropertyView, Column, Cycle, Meter, MeterReading, PropertyView
 
 logger = logging.getLogger(__name__)
@@ -58,36 +60,39 @@ def _get_valid_meters(property_view_ids, config):
     else:
         AnalysisPipelineError("configuration.select_meters must be either 'all', 'date_range', or 'select_cycle'.")
 
-    property_views = PropertyView.objects.filter(id__in=property_view_ids)
+    property_views = PropertyView.objects.filter(id__in=property_view_ids).select_related("state")
+    valid_property_views = []
     for property_view in property_views:
         # ensure we have Gross Floor Area on this property view's state
         if property_view.state.gross_floor_area is None:
             invalid_area.append(property_view.id)
             continue
+        valid_property_views.append(property_view)
 
-        if select_meters == "all":
-            # get the most recent electric meter reading's end_time
-            try:
-                end_time = (
-                    MeterReading.objects.filter(meter__property=property_view.property, meter__type__in=VALID_METERS)
-                    .order_by("end_time")
-                    .last()
-                    .end_time
-                )
-                start_time = end_time - TIME_PERIOD
-            except Exception:
-                invalid_meter.append(property_view.id)
-                continue
+    # get all readings that started AND ended between end_time and a year prior, for all properties at once
+    meter_readings = MeterReading.objects.filter(
+        meter__property_id__in={property_view.property_id for property_view in valid_property_views}, meter__type__in=VALID_METERS
+    )
+    if select_meters == "all":
+        # end_time is the most recent electric meter reading's end_time of each property
+        meter_readings = meter_readings.annotate(
+            latest_end_time=Window(Max("end_time"), partition_by=F("meter__property_id")),
+        ).filter(start_time__gte=F("latest_end_time") - TIME_PERIOD)
+    else:
+        meter_readings = meter_readings.filter(end_time__lte=end_time, start_time__gte=start_time)
 
-        # get all readings that started AND ended between end_time and a year prior
-        property_meter_readings = [
-            SimpleMeterReading(reading.start_time, reading.end_time, reading.reading)
-            for reading in MeterReading.objects.filter(
-                meter__property=property_view.property, meter__type__in=VALID_METERS, end_time__lte=end_time, start_time__gte=start_time
-            ).order_by("start_time")
-        ]
+    meter_readings_by_property_id = defaultdict(list)
+    for property_id, reading_start_time, reading_end_time, reading in meter_readings.order_by("start_time").values_list(
+        "meter__property_id", "start_time", "end_time", "reading"
+    ):
+        meter_readings_by_property_id[property_id].append(SimpleMeterReading(reading_start_time, reading_end_time, reading))
 
-        meter_readings_by_property_view[property_view.id] = property_meter_readings
+    for property_view in valid_property_views:
+        if select_meters == "all" and property_view.property_id not in meter_readings_by_property_id:
+            invalid_meter.append(property_view.id)
+            continue
+
+        meter_readings_by_property_view[property_view.id] = meter_readings_by_property_id.get(property_view.property_id, [])
 
     errors_by_property_view_id = {}
     for pid in invalid_area:
@@ -115,14 +120,9 @@ def _calculate_eui(meter_readings, gross_floor_area):
             'coverage': float # percent of TIME_PERIOD covered by the readings
         }
     """
-    total_reading = 0
-    days_affected_by_readings = set()
-    for meter_reading in meter_readings:
-        total_reading += meter_reading.reading
-        for day in get_days_in_reading(meter_reading):
-            days_affected_by_readings.add(day)
-
-    total_seconds_covered = len(days_affected_by_readings) * datetime.timedelta(days=1).total_seconds()
+    total_reading = sum(meter_reading.reading for meter_reading in meter_readings)
+
+    total_seconds_covered = get_number_of_days_covered(meter_readings) * datetime.timedelta(days=1).total_seconds()
     fraction_of_time_covered = total_seconds_covered / TIME_PERIOD.total_seconds()
     return {
         "eui": round(total_reading / gross_floor_area, 2),
@@ -320,3 +320,32 @@ def get_days_in_reading(meter_reading):
         current_day += relativedelta.relativedelta(days=1)
 
     return all_days
+
+
+def get_number_of_days_covered(meter_readings):
+    """Returns the number of distinct days that the readings cover/touch, i.e. the size of
+    the union of get_days_in_reading for each reading, computed from the union of the readings'
+    day intervals rather than by listing every day.
+
+    :param meter_readings: List[SimpleMeterReading | MeterReading]
+    :return: int
+    """
+    day_intervals = sorted(
+        (meter_reading.start_time.date(), meter_reading.end_time.date())
+        for meter_reading in meter_readings
+        if meter_reading.start_time.date() <= meter_reading.end_time.date()
+    )
+
+    days = 0
+    current_start = current_end = None
+    for start, end in day_intervals:
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            days += (current_end - current_start).days + 1
+        current_start, current_end = start, end
+    if current_end is not None:
+        days += (current_end - current_start).days + 1
+
+    return days
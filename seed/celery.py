@@ -4,10 +4,14 @@ SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and othe
 See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
+import gc
 import os
 
 import celery
+from celery import signals
 from django.conf import settings
+from django.db import reset_queries
+from django.utils import timezone, translation
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
@@ -16,5 +20,31 @@ app = celery.Celery("seed")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks(lambda: (*settings.SEED_CORE_APPS, "seed.analysis_pipelines"))
 
+
+@signals.worker_init.connect
+def configure_warm_worker(**kwargs):
+    """Keep the database connections of reused worker processes open between tasks. Celery's
+    Django fixup closes them before and after each task only if they are obsolete or unusable."""
+    if not settings.SEED_CELERY_WARM_WORKERS:
+        return
+
+    for database in settings.DATABASES.values():
+        database["CONN_MAX_AGE"] = settings.SEED_CELERY_CONN_MAX_AGE
+        database["CONN_HEALTH_CHECKS"] = True
+
+
+@signals.task_postrun.connect
+def reset_task_state(**kwargs):
+    """Reset the state a task can leave behind in a reused worker process, and release its memory
+    before the worker checks the process against the max memory per child."""
+    if not settings.SEED_CELERY_WARM_WORKERS:
+        return
+
+    reset_queries()
+    translation.deactivate()
+    timezone.deactivate()
+    gc.collect()
+
+
 if __name__ == "__main__":
     app.start()
@@ -166,6 +166,58 @@ class EquivalencePartitioner:
         that has a blank pm_property, we would not want to say the
         value in the custom_id must be the pm_property_id.
 
+        Each object joins the first (oldest) class whose key shares a
+        value with the object's comparison key and whose identity does
+        not conflict, otherwise it starts a new class. Rather than
+        comparing every object against every class, the classes are
+        indexed by each of their non-null key values so only the
+        classes sharing a value are checked.
+
+        :param list_of_obj:
+        :return:
+        """
+        class_keys = []
+        class_members = {}
+        identities_for_equivalence = {}
+        # (key position, value) -> indexes into class_keys, in creation order
+        class_index = collections.defaultdict(list)
+
+        for ndx, obj in enumerate(list_of_obj):
+            cmp_key = self.calculate_comparison_key(obj)
+            identity_key = self.calculate_identity_key(obj)
+
+            candidates = set()
+            for position, value in enumerate(cmp_key):
+                if value is not None:
+                    candidates.update(class_index.get((position, value), ()))
+
+            for class_ndx in sorted(candidates):
+                class_key = class_keys[class_ndx]
+                if not self.identities_are_different(identities_for_equivalence[class_key], identity_key):
+                    class_members[class_key].append(ndx)
+                    break
+            else:
+                can_key = self.calculate_canonical_key(obj)
+                if can_key not in class_members:
+                    class_members[can_key] = []
+                    for position, value in enumerate(can_key):
+                        if value is not None:
+                            class_index[(position, value)].append(len(class_keys))
+                    class_keys.append(can_key)
+                class_members[can_key].append(ndx)
+                identities_for_equivalence[can_key] = identity_key
+
+        equivalence_classes = collections.defaultdict(list)
+        for class_key in class_keys:
+            equivalence_classes[class_key] = class_members[class_key]
+        return equivalence_classes
+
+    def _calculate_equivalence_classes_by_scan(self, list_of_obj):
+        """
+        The original implementation of calculate_equivalence_classes,
+        which compares each object against every class. It is kept to
+        check and benchmark the indexed implementation against.
+
         :param list_of_obj:
         :return:
         """
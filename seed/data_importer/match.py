@@ -41,13 +41,15 @@ from seed.utils.match import (
     NoAccessError,
     NoViewsError,
     _get_ali,
-    _link_matches,
+    _link_matches_in_memory,
     empty_criteria_filter,
     get_matching_criteria_column_names,
     matching_filter_criteria,
+    save_linked_views,
     update_sub_progress_total,
 )
 from seed.utils.merge import merge_states_with_views
+from seed.utils.states import bulk_create_states
 from seed.utils.ubid import get_jaccard_index, merge_ubid_models
 
 _log = get_task_logger(__name__)
@@ -213,6 +215,8 @@ def match_and_link_incoming_properties_and_taxlots_by_cycle(
             org,
             PropertyState,
             sub_progress_key,
+            # BuildingSync states have measures and scenarios, which need to be merged one state at a time
+            bulk_merge=not import_file.from_buildingsync,
         )
 
         # Matching steps 3-5/6 for properties
@@ -388,14 +392,24 @@ def link_views_and_states(merged_views, new_views, errored_new_states, ViewClass
 
     # This is ALL the org's views that ARE NOT in the give cycle, by their matching column values
     existing_views = (
-        ViewClass.objects.select_related("state").filter(**{f"{class_name}__organization_id": cycle.organization_id}).exclude(cycle=cycle)
+        ViewClass.objects.select_related("state", f"{class_name}__access_level_instance")
+        .filter(**{f"{class_name}__organization_id": cycle.organization_id})
+        .exclude(cycle=cycle)
     )
     view_lookup: dict[int, Union[PropertyState, TaxLotState]] = {view.state.id: view for view in existing_views}
     match_lookup: dict[tuple, list[dict[str, any]]] = defaultdict(list)
     for state in ({k: getattr(view.state, k) for k in ["id", "hash_object", "updated", *matching_columns]} for view in existing_views):
         match_lookup[tuple(state[c] for c in tuple_values)].append(state)
 
-    shared_args = [ViewClass, cycle, ali, sub_progress_key, tuple_values, view_lookup, match_lookup, check_jaccard]
+    # The IDs of the org's views by canonical record, so previous links can be found without a query per view
+    canonical_view_ids: dict[int, set[int]] = defaultdict(set)
+    for view in existing_views:
+        canonical_view_ids[getattr(view, f"{class_name}_id")].add(view.id)
+    cycle_views = ViewClass.objects.filter(**{f"{class_name}__organization_id": cycle.organization_id}, cycle=cycle)
+    for view_id, canonical_id in cycle_views.values_list("id", f"{class_name}_id"):
+        canonical_view_ids[canonical_id].add(view_id)
+
+    shared_args = [ViewClass, cycle, ali, sub_progress_key, tuple_values, view_lookup, match_lookup, check_jaccard, canonical_view_ids]
 
     # merged_property_views are attached to properties that existed in the db prior to import, so it
     # REALLY should not fail.
@@ -493,7 +507,7 @@ def filter_duplicate_states(unmatched_states, sub_progress_key):
     return canonical_state_ids, errors_state_ids, duplicate_count
 
 
-def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress_key):  # noqa: N803
+def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress_key, bulk_merge=True):  # noqa: N803
     """
     Takes a list of unmatched_state_ids, combines matches of the corresponding
     -States, and returns a set of IDs of the remaining -States.
@@ -501,6 +515,9 @@ def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress
     :param unmatched_state_ids: list
     :param org: Organization object
     :param StateClass: PropertyState or TaxLotState
+    :param bulk_merge: bool, merge all the groups of matches in memory and save the results with
+        bulk inserts (see merge_state_groups). This does not merge the measures, scenarios, etc. of
+        the -States, so pass False when importing BuildingSync files.
     :return: promoted_ids: list
     """
     column_names = get_matching_criteria_column_names(org.id, StateClass.__name__)
@@ -518,7 +535,7 @@ def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress
     # Update the list of IDs whose states haven't been checked for matches.
     unmatched_state_ids = list(set(unmatched_state_ids) - set(promoted_ids))
     # Group IDs by -States that match each other
-    matched_id_groups = (
+    matched_id_groups = list(
         StateClass.objects.filter(id__in=unmatched_state_ids)
         .values(*column_names)
         .annotate(matched_ids=ArrayAgg("id", default=[]))
@@ -529,29 +546,39 @@ def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress
     merges_within_file = 0
     errored_states = []
     priorities = Column.retrieve_priorities(org)
-    batch_size = math.ceil(len(matched_id_groups) / 100)
-    for idx, ids in enumerate(matched_id_groups):
-        if len(ids) == 1:
-            # If there's only 1, no merging is needed, so just promote the ID.
-            promoted_ids += ids
-        else:
-            states = list(StateClass.objects.filter(pk__in=ids).order_by("-id"))
-            raw_ali_ids = {s.raw_access_level_instance for s in states if s.raw_access_level_instance is not None}
-            if len(raw_ali_ids) > 1:
-                errored_states += states
-                continue
+    if bulk_merge:
+        # If there's only 1, no merging is needed, so just promote the ID.
+        promoted_ids += [ids[0] for ids in matched_id_groups if len(ids) == 1]
+        sub_progress_data.step("Matching Data (2/6): Inclusive Matching and Merging")
 
-            merge_state = states.pop()
+        merged_ids, merges_within_file, errored_states = merge_state_groups(
+            [ids for ids in matched_id_groups if len(ids) > 1], org, StateClass, priorities
+        )
+        promoted_ids += merged_ids
+    else:
+        batch_size = math.ceil(len(matched_id_groups) / 100)
+        for idx, ids in enumerate(matched_id_groups):
+            if len(ids) == 1:
+                # If there's only 1, no merging is needed, so just promote the ID.
+                promoted_ids += ids
+            else:
+                states = list(StateClass.objects.filter(pk__in=ids).order_by("-id"))
+                raw_ali_ids = {s.raw_access_level_instance for s in states if s.raw_access_level_instance is not None}
+                if len(raw_ali_ids) > 1:
+                    errored_states += states
+                    continue
 
-            merges_within_file += len(states)
+                merge_state = states.pop()
 
-            while len(states) > 0:
-                newer_state = states.pop()
-                merge_state = save_state_match(merge_state, newer_state, priorities)
+                merges_within_file += len(states)
 
-            promoted_ids.append(merge_state.id)
-        if batch_size > 0 and idx % batch_size == 0:
-            sub_progress_data.step("Matching Data (2/6): Inclusive Matching and Merging")
+                while len(states) > 0:
+                    newer_state = states.pop()
+                    merge_state = save_state_match(merge_state, newer_state, priorities)
+
+                promoted_ids.append(merge_state.id)
+            if batch_size > 0 and idx % batch_size == 0:
+                sub_progress_data.step("Matching Data (2/6): Inclusive Matching and Merging")
 
     sub_progress_data.finish_with_success()
 
@@ -561,6 +588,116 @@ def inclusive_match_and_merge(unmatched_state_ids, org, StateClass, sub_progress
     return promoted_ids, merges_within_file, errored_states
 
 
+def merge_state_groups(id_groups, org, StateClass, priorities):  # noqa: N803
+    """
+    Merge each group of matching -States into a single -State. This gives the same result as
+    merging the -States of a group pair by pair with save_state_match, oldest first, but the -States
+    and audit logs of all the groups are loaded with one query each, the groups are folded together
+    in memory, and the merged -States and their audit logs are saved with bulk inserts.
+
+    The intermediate -States of groups with more than two -States are saved as well so that the
+    audit log history of the merged -State is unchanged. The measures, scenarios, etc. of the
+    -States are not merged.
+
+    :param id_groups: list of lists, IDs of the -States that match each other
+    :param org: Organization object
+    :param StateClass: PropertyState or TaxLotState
+    :param priorities: dict, column names and the priorities of the merging of data
+    :return: merged_state_ids, merge_count, errored_states
+    """
+    AuditLogClass = PropertyAuditLog if StateClass == PropertyState else TaxLotAuditLog
+
+    all_ids = [state_id for ids in id_groups for state_id in ids]
+    if not all_ids:
+        return [], 0, []
+
+    states_by_id = StateClass.objects.select_related("organization", "import_file").in_bulk(all_ids)
+
+    # keep the first audit log of each state
+    audit_logs_by_state_id = {}
+    for audit_log in AuditLogClass.objects.filter(state_id__in=all_ids).order_by("-id"):
+        audit_logs_by_state_id[audit_log.state_id] = audit_log
+
+    recognize_empty_columns = list(
+        org.column_set.filter(table_name=StateClass.__name__, recognize_empty=True, is_extra_data=False).values_list(
+            "column_name", flat=True
+        )
+    )
+    recognize_empty_ed_columns = list(
+        org.column_set.filter(table_name=StateClass.__name__, recognize_empty=True, is_extra_data=True).values_list(
+            "column_name", flat=True
+        )
+    )
+
+    # merges_by_step[i] holds the (merged_state, state1, state2) of the i-th merge of every group, so
+    # the audit logs of each step can be created after the audit logs of their parents
+    merges_by_step = defaultdict(list)
+    final_states = []
+    errored_states = []
+    merge_count = 0
+    for ids in id_groups:
+        states = sorted((states_by_id[state_id] for state_id in ids), key=lambda state: state.id)
+        raw_ali_ids = {s.raw_access_level_instance_id for s in states if s.raw_access_level_instance_id is not None}
+        if len(raw_ali_ids) > 1:
+            errored_states += states
+            continue
+
+        for state in states:
+            if state.id not in audit_logs_by_state_id:
+                # If there is no audit log for the state, then there is an error!
+                raise Exception(f"No audit log for merging of state {state.id}")
+
+        merge_count += len(states) - 1
+
+        merge_state = states[0]
+        for step, newer_state in enumerate(states[1:]):
+            merged_state = merging.merge_state(
+                StateClass(organization=org),
+                merge_state,
+                newer_state,
+                priorities[StateClass.__name__],
+                recognize_empty_columns=recognize_empty_columns,
+                recognize_empty_ed_columns=recognize_empty_ed_columns,
+                merge_relationships=False,
+            )
+            _carry_import_file_into_merged_state(merged_state, merge_state, newer_state)
+            merged_state.merge_state = MERGE_STATE_MERGED
+
+            merges_by_step[step].append((merged_state, merge_state, newer_state))
+            merge_state = merged_state
+
+        final_states.append(merge_state)
+
+    merged_states = [merged_state for step in sorted(merges_by_step) for merged_state, _, _ in merges_by_step[step]]
+    hash_fields = Column.retrieve_db_field_name_for_hash_comparison(StateClass, org.id)
+
+    with transaction.atomic():
+        bulk_create_states(merged_states, hash_fields)
+
+        for step in sorted(merges_by_step):
+            audit_logs = AuditLogClass.objects.bulk_create(
+                [
+                    AuditLogClass(
+                        organization=org,
+                        parent1=audit_logs_by_state_id[state1.id],
+                        parent2=audit_logs_by_state_id[state2.id],
+                        parent_state1=state1,
+                        parent_state2=state2,
+                        state=merged_state,
+                        name="System Match",
+                        description="Automatic Merge",
+                        import_filename=None,
+                        record_type=AUDIT_IMPORT,
+                    )
+                    for merged_state, state1, state2 in merges_by_step[step]
+                ]
+            )
+            for audit_log in audit_logs:
+                audit_logs_by_state_id[audit_log.state.id] = audit_log
+
+    return [state.id for state in final_states], merge_count, errored_states
+
+
 def states_to_views(unmatched_state_ids, org, access_level_instance, cycle, StateClass, sub_progress_key, merge_duplicates=False):  # noqa: N803
     """
     The purpose of this method is to take incoming -States and, apply them to a
@@ -755,17 +892,37 @@ def states_to_views(unmatched_state_ids, org, access_level_instance, cycle, Stat
     )
 
 
-def link_states(states, ViewClass, cycle, highest_ali, sub_progress_key, tuple_values, view_lookup, match_lookup, check_jaccard):  # noqa: N803
+def link_states(
+    states,
+    ViewClass,  # noqa: N803
+    cycle,
+    highest_ali,
+    sub_progress_key,
+    tuple_values,
+    view_lookup,
+    match_lookup,
+    check_jaccard,
+    canonical_view_ids,
+):
     class_name = "property" if ViewClass == PropertyView else "taxlot"
 
     # set up the progress bar
     sub_progress_data = update_sub_progress_total(100, sub_progress_key)
     batch_size = math.ceil(len(states) / 100)
 
+    # get the views of all the states in this cycle at once
+    views_by_state_id = {
+        view.state_id: view
+        for view in ViewClass.objects.filter(state_id__in=[state.id for state in states], cycle_id=cycle.id).select_related(
+            f"{class_name}__access_level_instance"
+        )
+    }
+
     linked_views = []
     unlinked_views = []
     invalid_link_states = []
     unlinked_states = []
+    updated_views = {}
     for idx, state in enumerate(states):
         # get matches
         existing_state_matches = match_lookup.get(tuple(getattr(state, c) for c in tuple_values), [])
@@ -778,7 +935,7 @@ def link_states(states, ViewClass, cycle, highest_ali, sub_progress_key, tuple_v
         existing_views_matches = [view_lookup[x["id"]] for x in existing_state_matches]
 
         # ensure ali is correct
-        view = ViewClass.objects.filter(state_id=state.id, cycle_id=cycle.id).select_related(f"{class_name}__access_level_instance").first()
+        view = views_by_state_id.get(state.id)
         try:
             ali = _get_ali(view, existing_views_matches, highest_ali, class_name)
         except (MultipleALIError, NoAccessError):
@@ -792,9 +949,12 @@ def link_states(states, ViewClass, cycle, highest_ali, sub_progress_key, tuple_v
         if view is None:
             state.raw_access_level_instance = ali
             view = state.promote(cycle=cycle)
+            canonical_view_ids[getattr(view, f"{class_name}_id")].add(view.id)
 
-        # link state
-        link_count = _link_matches([*existing_views_matches, view], cycle.organization_id, view, ViewClass)
+        # link state, the views are saved in bulk below
+        link_count = _link_matches_in_memory(
+            [*existing_views_matches, view], cycle.organization_id, view, ViewClass, canonical_view_ids, updated_views
+        )
         if link_count == 0:
             unlinked_views.append(view)
         else:
@@ -803,6 +963,8 @@ def link_states(states, ViewClass, cycle, highest_ali, sub_progress_key, tuple_v
         if batch_size > 0 and idx % batch_size == 0:
             sub_progress_data.step("Matching Data (6/6): Merging Views")
 
+    save_linked_views(list(updated_views.values()), ViewClass)
+
     sub_progress_data.finish_with_success()
 
     return linked_views, unlinked_views, invalid_link_states, unlinked_states
@@ -851,6 +1013,16 @@ def save_state_match(state1, state2, priorities):
         record_type=AUDIT_IMPORT,
     )
 
+    _carry_import_file_into_merged_state(merged_state, state1, state2)
+
+    # Set the merged_state to merged
+    merged_state.merge_state = MERGE_STATE_MERGED
+    merged_state.save()
+
+    return merged_state
+
+
+def _carry_import_file_into_merged_state(merged_state, state1, state2):
     # If the two states being merged were just imported from the same import file, carry the import_file_id into the new
     # state. Also merge the lot_number fields so that pairing can work correctly on the resulting merged record
     # Possible conditions:
@@ -881,12 +1053,6 @@ def save_state_match(state1, state2, priorities):
             if joined_lots:
                 merged_state.lot_number = ";".join(joined_lots)
 
-    # Set the merged_state to merged
-    merged_state.merge_state = MERGE_STATE_MERGED
-    merged_state.save()
-
-    return merged_state
-
 
 def check_jaccard_match(ubid: str, state_ubid: str, ubid_threshold: float):
     """
@@ -43,7 +43,7 @@ from seed.data_importer.match import match_and_link_incoming_properties_and_taxl
 from seed.data_importer.meters_parser import MetersParser
 from seed.data_importer.models import STATUS_READY_TO_MERGE, ImportFile, ImportRecord
 from seed.data_importer.sensor_readings_parser import SensorsReadingsParser
-from seed.data_importer.utils import usage_point_id
+from seed.data_importer.utils import get_chunk_size, usage_point_id
 from seed.lib.mcm import cleaners, mapper, reader
 from seed.lib.mcm.cleaners import normalize_unicode_and_characters
 from seed.lib.mcm.mapper import expand_rows
@@ -61,8 +61,6 @@ from seed.models import (
     DATA_STATE_MATCHING,
     DATA_STATE_UNKNOWN,
     GREEN_BUTTON,
-    MERGE_STATE_NEW,
-    MERGE_STATE_UNKNOWN,
     PORTFOLIO_BS,
     PORTFOLIO_METER_USAGE,
     SEED_DATA_SOURCES,
@@ -87,18 +85,21 @@ from seed.models import (
 )
 from seed.models.auditlog import AUDIT_IMPORT
 from seed.models.data_quality import DataQualityCheck, Rule
-from seed.serializers.pint import DEFAULT_UNITS, apply_display_unit_preferences
 from seed.utils.buildings import get_source_type
-from seed.utils.cache import set_cache_raw
+from seed.utils.cache import delete_cache, get_cache_raw, set_cache_raw
 from seed.utils.geocode import MapQuestAPIKeyError, create_geocoded_additional_columns, geocode_buildings
 from seed.utils.goals import get_state_pairs
 from seed.utils.match import update_sub_progress_total
+from seed.utils.states import bulk_create_states
 from seed.utils.ubid import decode_unique_ids
 
 _log = get_task_logger(__name__)
 
 STR_TO_CLASS = {"TaxLotState": TaxLotState, "PropertyState": PropertyState}
 
+# The mapping plan only needs to live as long as the mapping tasks of an import file
+MAPPING_PLAN_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 @shared_task(ignore_result=True)
 def check_data_chunk(org_id, model, ids, dq_id, goal_id=None):
@@ -121,7 +122,7 @@ def check_data_chunk(org_id, model, ids, dq_id, goal_id=None):
         d.check_data(model, qs.iterator())
     else:
         d.check_data_cross_cycle(goal_id, state_pairs)
-    d.save_to_cache(dq_id, organization.id)
+    d.save_results(dq_id, organization.id)
 
 
 @shared_task(ignore_result=True)
@@ -148,9 +149,9 @@ def do_checks(org_id, propertystate_ids, taxlotstate_ids, goal_id, import_file_i
     :param import_file_id: int, if present, find the data to check by the import file id
     :return:
     """
-    # If import_file_id, then use that as the identifier, otherwise, initialize_cache will
+    # If import_file_id, then use that as the identifier, otherwise, initialize_results will
     # create a new random id
-    _cache_key, dq_id = DataQualityCheck.initialize_cache(import_file_id, org_id)
+    dq_id = DataQualityCheck.initialize_results(import_file_id, org_id)
 
     progress_data = ProgressData(func_name="check_data", unique_id=dq_id)
     progress_data.delete()
@@ -185,6 +186,9 @@ def finish_mapping(import_file_id, mark_as_done, progress_key):
     import_file = ImportFile.objects.get(pk=import_file_id)
     progress_data = ProgressData.from_key(progress_key)
 
+    # the mapping plan is only shared by the map_row_chunk tasks of this mapping
+    delete_cache(_mapping_plan_cache_key(import_file_id))
+
     # Do not set the mapping_done flag unless mark_as_done is set. This allows an actual
     # user to review the mapping before it is saved and matching starts.
     if mark_as_done:
@@ -259,25 +263,21 @@ def _build_cleaner(org):
     return cleaners.Cleaner(ontology)
 
 
-@shared_task(ignore_result=True)
-def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
-    """Does the work of matching a mapping to a source type and saving
+def _mapping_plan_cache_key(import_file_id):
+    return f"mapping_plan__{import_file_id}"
 
-    :param ids: list of PropertyState IDs to map.
-    :param file_pk: int, the PK for an ImportFile obj.
-    :param source_type: int, represented by either ASSESSED_RAW or PORTFOLIO_RAW.
-    :param prog_key: string, key of the progress key
-    """
-    progress_data = ProgressData.from_key(prog_key)
-    import_file = ImportFile.objects.get(pk=file_pk)
-    save_type = PORTFOLIO_BS
-    if source_type == ASSESSED_RAW:
-        save_type = ASSESSED_BS
-    elif source_type == BUILDINGSYNC_RAW:
-        save_type = BUILDINGSYNC_RAW
 
-    org = Organization.objects.get(pk=import_file.import_record.super_organization.pk)
+def _build_mapping_plan(import_file, org):
+    """Compile everything that map_row_chunk needs to map the rows of an import file
 
+    The plan is the same for every chunk of the file, so it is built once when the mapping tasks
+    are created and then shared with each chunk through the cache instead of each task rebuilding
+    it from the database.
+
+    :param import_file: ImportFile instance
+    :param org: Organization instance, the super organization of the import file
+    :return: dict, with the table_mappings, delimited_fields, cleaner ontology and per table details
+    """
     # get all the table_mappings that exist for the organization
     table_mappings = ColumnMapping.get_column_mappings_by_table_name(org)
 
@@ -296,9 +296,6 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
             if not table_mappings[table]:
                 del table_mappings[table]
 
-    map_cleaner = _build_cleaner(org)
-
-    # *** BREAK OUT INTO SEPARATE METHOD ***
     # figure out which import field is defined as the unique field that may have a delimiter of
     # individual values (e.g., tax lot ids). The definition of the delimited field is currently
     # hard coded
@@ -315,9 +312,6 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                 "to_field_name": "jurisdiction_tax_lot_id",
             }
 
-    # _log.debug("my table mappings are {}".format(table_mappings))
-    # _log.debug("delimited_field that will be expanded and normalized: {}".format(delimited_fields))
-
     # If a single file is being imported into both the tax lot and property table, then add
     # an extra custom mapping for the cross-related data. If the data are not being imported into
     # the property table then make sure to skip this so that superfluous property entries are
@@ -329,7 +323,95 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
             "Lot Number",
             False,
         )
-    # *** END BREAK OUT ***
+
+    tables = {}
+    for table, mappings in table_mappings.items():
+        if not table:
+            continue
+
+        # This may be historic, but we need to pull out the extra_data_fields here to pass
+        # into mapper.map_row. apply_columns are extra_data columns (the raw column names)
+        extra_data_fields = []
+        footprint_details = {}
+        for k, v in mappings.items():
+            # the 3rd element is the is_extra_data flag.
+            # Need to convert this to a dict and not a tuple.
+            if v[3]:
+                extra_data_fields.append(k)
+
+            if v[1] in {"taxlot_footprint", "property_footprint"}:
+                footprint_details["raw_field"] = k
+                footprint_details["obj_field"] = v[1]
+
+        # The hash fields and the hash of an empty state are the same for every row, so compute
+        # them once instead of once per row.
+        hash_fields = Column.retrieve_db_field_name_for_hash_comparison(STR_TO_CLASS[table], org.id)
+        empty_state_hash = hash_state_object(
+            STR_TO_CLASS[table](organization=org), include_extra_data=False, prefetched_columns=hash_fields
+        )
+
+        tables[table] = {
+            "extra_data_fields": extra_data_fields,
+            "footprint_details": footprint_details,
+            "hash_fields": hash_fields,
+            "empty_state_hash": empty_state_hash,
+        }
+
+    return {
+        "table_mappings": table_mappings,
+        "delimited_fields": delimited_fields,
+        "cleaner_ontology": _build_cleaner(org).ontology,
+        "org_has_only_root_ali": AccessLevelInstance.objects.filter(organization=org).count() == 1,
+        "tables": tables,
+    }
+
+
+def _cache_mapping_plan(import_file, org):
+    """Build the mapping plan for the import file and store it in the cache
+
+    :return: str, the cache key of the mapping plan
+    """
+    mapping_plan_key = _mapping_plan_cache_key(import_file.id)
+    set_cache_raw(mapping_plan_key, _build_mapping_plan(import_file, org), MAPPING_PLAN_CACHE_TIMEOUT)
+    return mapping_plan_key
+
+
+def _get_mapping_plan(mapping_plan_key, import_file, org):
+    """Return the cached mapping plan, rebuilding it if it is missing (e.g., evicted from the cache)"""
+    mapping_plan = get_cache_raw(mapping_plan_key) if mapping_plan_key else None
+    if mapping_plan is None:
+        mapping_plan = _build_mapping_plan(import_file, org)
+    return mapping_plan
+
+
+@shared_task(ignore_result=True)
+def map_row_chunk(ids, file_pk, source_type, prog_key, mapping_plan_key=None, **kwargs):
+    """Does the work of matching a mapping to a source type and saving
+
+    :param ids: list of PropertyState IDs to map.
+    :param file_pk: int, the PK for an ImportFile obj.
+    :param source_type: int, represented by either ASSESSED_RAW or PORTFOLIO_RAW.
+    :param prog_key: string, key of the progress key
+    :param mapping_plan_key: string, cache key of the mapping plan shared by all the chunks of the
+        file. If None or no longer in the cache, then the plan is built by this task.
+    """
+    progress_data = ProgressData.from_key(prog_key)
+    import_file = ImportFile.objects.get(pk=file_pk)
+    save_type = PORTFOLIO_BS
+    if source_type == ASSESSED_RAW:
+        save_type = ASSESSED_BS
+    elif source_type == BUILDINGSYNC_RAW:
+        save_type = BUILDINGSYNC_RAW
+
+    org = Organization.objects.get(pk=import_file.import_record.super_organization.pk)
+
+    mapping_plan = _get_mapping_plan(mapping_plan_key, import_file, org)
+    table_mappings = mapping_plan["table_mappings"]
+    delimited_fields = mapping_plan["delimited_fields"]
+    map_cleaner = cleaners.Cleaner(mapping_plan["cleaner_ontology"])
+
+    start_time = time.time()
+    mapped_row_count = 0
     try:
         with transaction.atomic():
             # yes, there are three cascading for loops here. sorry :(
@@ -337,19 +419,13 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                 if not table:
                     continue
 
-                # This may be historic, but we need to pull out the extra_data_fields here to pass
-                # into mapper.map_row. apply_columns are extra_data columns (the raw column names)
-                extra_data_fields = []
-                footprint_details = {}
-                for k, v in mappings.items():
-                    # the 3rd element is the is_extra_data flag.
-                    # Need to convert this to a dict and not a tuple.
-                    if v[3]:
-                        extra_data_fields.append(k)
+                StateClass = STR_TO_CLASS[table]
+                AuditLogClass = PropertyAuditLog if StateClass == PropertyState else TaxLotAuditLog
 
-                    if v[1] in {"taxlot_footprint", "property_footprint"}:
-                        footprint_details["raw_field"] = k
-                        footprint_details["obj_field"] = v[1]
+                table_plan = mapping_plan["tables"][table]
+                extra_data_fields = table_plan["extra_data_fields"]
+                footprint_details = table_plan["footprint_details"]
+                hash_fields = table_plan["hash_fields"]
 
                 # All the data live in the PropertyState.extra_data field when the data are imported
                 data = PropertyState.objects.filter(id__in=ids).only("extra_data", "bounding_box").iterator()
@@ -359,6 +435,9 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                 # methods
                 map_model_obj = None
 
+                # list of (original_row, map_model_obj) tuples that will be bulk created after the loop
+                mapped_states = []
+
                 # Loop over all the rows
                 for original_row in data:
                     # expand the row into multiple rows if needed with the delimited_field replaced
@@ -377,7 +456,7 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
 
                     # The raw data upon import is in the extra_data column
                     for row in expand_rows(original_row.extra_data, delimited_field_list, expand_row):
-                        map_model_obj = mapper.map_row(row, mappings, STR_TO_CLASS[table], extra_data_fields, cleaner=map_cleaner, **kwargs)
+                        map_model_obj = mapper.map_row(row, mappings, StateClass, extra_data_fields, cleaner=map_cleaner, **kwargs)
 
                         # save cross related data, that is data that needs to go into the other
                         # model's collection as well.
@@ -388,7 +467,13 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                         map_model_obj.source_type = save_type
                         map_model_obj.organization = import_file.import_record.super_organization
                         # _process_ali_data(map_model_obj, import_file.access_level_instance)
-                        _process_ali_data(map_model_obj, row, import_file.access_level_instance, table_mappings.get(""))
+                        _process_ali_data(
+                            map_model_obj,
+                            row,
+                            import_file.access_level_instance,
+                            table_mappings.get(""),
+                            org_has_only_root_ali=mapping_plan["org_has_only_root_ali"],
+                        )
 
                         if hasattr(map_model_obj, "data_state"):
                             map_model_obj.data_state = DATA_STATE_MAPPING
@@ -400,8 +485,9 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                         # make sure that the object hasn't already been created. For example, in
                         # the test data the tax lot id is the same for many rows. Make sure
                         # to only create/save the object if it hasn't been created before.
-                        if hash_state_object(map_model_obj, include_extra_data=False) == hash_state_object(
-                            STR_TO_CLASS[table](organization=map_model_obj.organization), include_extra_data=False
+                        if (
+                            hash_state_object(map_model_obj, include_extra_data=False, prefetched_columns=hash_fields)
+                            == table_plan["empty_state_hash"]
                         ):
                             # Skip this object as it has no data...
                             _log.warning("Skipping property or taxlot during mapping because it is identical to another row")
@@ -413,55 +499,32 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
                         if footprint_details.get("obj_field") and getattr(map_model_obj, footprint_details["obj_field"]) is None:
                             _store_raw_footprint_and_create_rule(footprint_details, table, org, import_file, original_row, map_model_obj)
 
-                        # There was an error with a field being too long [> 255 chars].
-                        map_model_obj.save()
+                        mapped_states.append((original_row, map_model_obj))
 
+                if mapped_states:
+                    # There was an error with a field being too long [> 255 chars].
+                    bulk_create_states([mapped_state for _, mapped_state in mapped_states], hash_fields)
+
+                    for original_row, mapped_state in mapped_states:
                         # if importing BuildingSync create a BuildingFile for the property
                         if source_type == BUILDINGSYNC_RAW:
-                            raw_ps_id = original_row.id
-                            xml_filename = import_file.raw_property_state_to_filename.get(str(raw_ps_id))
-                            if xml_filename is None:
-                                raise Exception(
-                                    "Expected ImportFile to have the raw PropertyStates id in its raw_property_state_to_filename dict"
-                                )
-
-                            from_zipfile = import_file.uploaded_filename.endswith(".zip")
-                            # if user uploaded a zipfile, find the xml file related to this property and use it
-                            # else, the user uploaded a sole xml file and we can just use that one.
-                            if from_zipfile:
-                                with zipfile.ZipFile(import_file.file, "r", zipfile.ZIP_STORED) as openzip:
-                                    new_file = SimpleUploadedFile(
-                                        name=xml_filename, content=openzip.read(xml_filename), content_type="application/xml"
-                                    )
-                            else:
-                                xml_filename = import_file.uploaded_filename
-                                if xml_filename == "":
-                                    raise Exception("Expected ImportFiles uploaded_filename to be non-empty")
-                                new_file = SimpleUploadedFile(
-                                    name=xml_filename, content=import_file.file.read(), content_type="application/xml"
-                                )
-
-                            building_file = BuildingFile.objects.create(
-                                file=new_file,
-                                filename=xml_filename,
-                                file_type=BuildingFile.BUILDINGSYNC,
+                            _create_building_file_for_state(import_file, original_row, mapped_state)
+
+                    # Create an audit log record for each of the new map_model_objs that were created.
+                    AuditLogClass.objects.bulk_create(
+                        [
+                            AuditLogClass(
+                                organization=org,
+                                state=mapped_state,
+                                name="Import Creation",
+                                description="Creation from Import file.",
+                                import_filename=import_file,
+                                record_type=AUDIT_IMPORT,
                             )
-
-                            # link the property state to the building file
-                            building_file.property_state = map_model_obj
-                            building_file.save()
-
-                        # Create an audit log record for the new map_model_obj that was created.
-
-                        AuditLogClass = PropertyAuditLog if isinstance(map_model_obj, PropertyState) else TaxLotAuditLog
-                        AuditLogClass.objects.create(
-                            organization=org,
-                            state=map_model_obj,
-                            name="Import Creation",
-                            description="Creation from Import file.",
-                            import_filename=import_file,
-                            record_type=AUDIT_IMPORT,
-                        )
+                            for _, mapped_state in mapped_states
+                        ]
+                    )
+                    mapped_row_count += len(mapped_states)
 
                 # Make sure that we've saved all of the extra_data column names from the first item
                 # in list
@@ -479,16 +542,56 @@ def map_row_chunk(ids, file_pk, source_type, prog_key, **kwargs):
         progress_data.finish_with_error("Invalid type found while mapping data", str(e))
         raise DataError(f"Invalid type found while mapping data: {e!s}")
 
-    progress_data.step()
+    elapsed = time.time() - start_time
+    rows_per_second = mapped_row_count / elapsed if elapsed > 0 else mapped_row_count
+    progress_data.step(f"Mapped {mapped_row_count:,} rows ({rows_per_second:,.0f} rows/sec)")
 
     return True
 
 
-def _process_ali_data(model, raw_data, import_file_ali, ah_mappings):
+def _create_building_file_for_state(import_file, original_row, map_model_obj):
+    """Create the BuildingFile for a property state mapped from a BuildingSync import
+
+    :param import_file: ImportFile, the BuildingSync xml or zip import file
+    :param original_row: PropertyState, the raw state that the mapped state was created from
+    :param map_model_obj: PropertyState, the saved mapped state to link to the BuildingFile
+    """
+    raw_ps_id = original_row.id
+    xml_filename = import_file.raw_property_state_to_filename.get(str(raw_ps_id))
+    if xml_filename is None:
+        raise Exception("Expected ImportFile to have the raw PropertyStates id in its raw_property_state_to_filename dict")
+
+    from_zipfile = import_file.uploaded_filename.endswith(".zip")
+    # if user uploaded a zipfile, find the xml file related to this property and use it
+    # else, the user uploaded a sole xml file and we can just use that one.
+    if from_zipfile:
+        with zipfile.ZipFile(import_file.file, "r", zipfile.ZIP_STORED) as openzip:
+            new_file = SimpleUploadedFile(name=xml_filename, content=openzip.read(xml_filename), content_type="application/xml")
+    else:
+        xml_filename = import_file.uploaded_filename
+        if xml_filename == "":
+            raise Exception("Expected ImportFiles uploaded_filename to be non-empty")
+        new_file = SimpleUploadedFile(name=xml_filename, content=import_file.file.read(), content_type="application/xml")
+
+    building_file = BuildingFile.objects.create(
+        file=new_file,
+        filename=xml_filename,
+        file_type=BuildingFile.BUILDINGSYNC,
+    )
+
+    # link the property state to the building file
+    building_file.property_state = map_model_obj
+    building_file.save()
+
+
+def _process_ali_data(model, raw_data, import_file_ali, ah_mappings, org_has_only_root_ali=None):
     org_alns = model.organization.access_level_names
 
+    if org_has_only_root_ali is None:
+        org_has_only_root_ali = AccessLevelInstance.objects.filter(organization=model.organization).count() == 1
+
     # if org only has root, just assign it to root, they won't have any ali info
-    if AccessLevelInstance.objects.filter(organization=model.organization).count() == 1:
+    if org_has_only_root_ali:
         model.raw_access_level_instance = model.organization.root
         return
 
@@ -586,21 +689,24 @@ def _map_data_create_tasks(import_file_id, progress_key):
 
     source_type = SEED_DATA_SOURCES_MAPPING.get(import_file.source_type, ASSESSED_RAW)
 
-    qs = (
+    ids = list(
         PropertyState.objects.filter(
             import_file=import_file,
             source_type=source_type,
             data_state=DATA_STATE_IMPORT,
-        )
-        .only("id")
-        .iterator()
+        ).values_list("id", flat=True)
     )
 
-    id_chunks = [[obj.id for obj in chunk] for chunk in batch(qs, 100)]
+    org = import_file.import_record.super_organization
+    chunk_size = get_chunk_size(len(ids), import_file.num_columns, org)
+    id_chunks = [list(chunk) for chunk in batch(ids, chunk_size)]
+
+    # compile the mapping plan once and share it with all the chunks
+    mapping_plan_key = _cache_mapping_plan(import_file, org)
 
     progress_data.total = len(id_chunks)
     progress_data.save()
-    tasks = [map_row_chunk.si(ids, import_file_id, source_type, progress_data.key) for ids in id_chunks]
+    tasks = [map_row_chunk.si(ids, import_file_id, source_type, progress_data.key, mapping_plan_key) for ids in id_chunks]
 
     return tasks
 
@@ -624,14 +730,16 @@ def _data_quality_check_create_tasks(org_id, property_state_ids, taxlot_state_id
     # running in parallel.
     DataQualityCheck.retrieve(org_id)
 
+    organization = Organization.objects.filter(id=org_id).first()
+
     tasks = []
     if property_state_ids:
-        id_chunks = [list(chunk) for chunk in batch(property_state_ids, 100)]
+        id_chunks = [list(chunk) for chunk in batch(property_state_ids, get_chunk_size(len(property_state_ids), organization=organization))]
         for ids in id_chunks:
             tasks.append(check_data_chunk.s(org_id, "PropertyState", ids, dq_id))
 
     if taxlot_state_ids:
-        id_chunks_tl = [list(chunk) for chunk in batch(taxlot_state_ids, 100)]
+        id_chunks_tl = [list(chunk) for chunk in batch(taxlot_state_ids, get_chunk_size(len(taxlot_state_ids), organization=organization))]
         for ids in id_chunks_tl:
             tasks.append(check_data_chunk.s(org_id, "TaxLotState", ids, dq_id))
 
@@ -639,8 +747,8 @@ def _data_quality_check_create_tasks(org_id, property_state_ids, taxlot_state_id
         # If goal_id is passed, treat as a cross cycle data quality check.
         try:
             goal = Goal.objects.get(id=goal_id)
-            property_ids = goal.properties().values_list("id", flat=True)
-            id_chunks = [list(chunk) for chunk in batch(property_ids, 100)]
+            property_ids = list(goal.properties().values_list("id", flat=True))
+            id_chunks = [list(chunk) for chunk in batch(property_ids, get_chunk_size(len(property_ids), organization=organization))]
             for ids in id_chunks:
                 tasks.append(check_data_chunk.s(org_id, "Property", ids, dq_id, goal.id))
         except Goal.DoesNotExist:
@@ -691,8 +799,9 @@ def map_data_synchronous(import_file_id: int) -> dict:
     # set is reasonably small because it will block operations and prevent
     # reporting status updates.
     id_chunks = [[obj.id for obj in chunk] for chunk in batch(qs, 100)]
+    mapping_plan_key = _cache_mapping_plan(import_file, import_file.import_record.super_organization)
     for ids in id_chunks:
-        map_row_chunk(ids, import_file_id, source_type, progress_data.key)
+        map_row_chunk(ids, import_file_id, source_type, progress_data.key, mapping_plan_key)
 
     finish_mapping(import_file_id, True, progress_data.key)
 
@@ -711,7 +820,7 @@ def map_data(import_file_id, remap=False, mark_as_done=True):
     import_file = ImportFile.objects.get(pk=import_file_id)
 
     # Clear out the previously mapped data
-    DataQualityCheck.initialize_cache(import_file_id, import_file.import_record.super_organization.id)
+    DataQualityCheck.initialize_results(import_file_id, import_file.import_record.super_organization.id)
 
     # Check for duplicate column headers
     column_headers = import_file.first_row_columns or []
@@ -779,6 +888,7 @@ def _save_raw_data_chunk(chunk, file_pk, progress_key):
 
     # BuildingSync only: track property state ID to its source filename
     raw_property_state_to_filename = {}
+    raw_properties = []
     try:
         with transaction.atomic():
             for c in chunk:
@@ -806,8 +916,11 @@ def _save_raw_data_chunk(chunk, file_pk, progress_key):
                 raw_property.source_type = source_type
                 raw_property.data_state = DATA_STATE_IMPORT
                 raw_property.organization = import_file.import_record.super_organization
-                raw_property.save()
+                raw_properties.append((raw_property, source_filename))
 
+            bulk_create_states([raw_property for raw_property, _ in raw_properties])
+
+            for raw_property, source_filename in raw_properties:
                 if source_filename is not None:
                     raw_property_state_to_filename[str(raw_property.id)] = source_filename
 
@@ -939,7 +1052,7 @@ def _save_greenbutton_data_create_tasks(file_pk, progress_key):
 
     meter_usage_point_id = usage_point_id(meter.source_id)
 
-    chunk_size = 1000
+    chunk_size = get_chunk_size(len(readings), organization=import_file.cycle.organization, min_size=1000, max_size=10_000)
 
     # add in the proposed_imports into the progress key to be used later. (This used to be the summary).
     progress_data.update_summary(meters_parser.proposed_imports)
@@ -1007,9 +1120,9 @@ def _save_sensor_readings_data_create_tasks(file_pk, progress_key):
     sensor_readings_data = parser.sensor_readings_details
 
     tasks = []
-    chunk_size = 500
     for sensor_column_name, readings in sensor_readings_data.items():
         readings_tuples = list(readings.items())
+        chunk_size = get_chunk_size(len(readings_tuples), organization=import_file.cycle.organization, min_size=500, max_size=10_000)
         for batch_readings in batch(readings_tuples, chunk_size):
             tasks.append(_save_sensor_readings_task.s(batch_readings, data_logger_id, sensor_column_name, progress_data.key))
 
@@ -1427,13 +1540,11 @@ def _save_raw_data_create_tasks(file_pk, progress_key):
         import_file.has_generated_headers = parser.has_generated_headers
 
     cache_first_rows(import_file, parser)
-    import_file.num_rows = 0
     import_file.num_columns = parser.num_columns()
 
-    chunks = []
-    for batch_chunk in batch(parser.data, 100):
-        import_file.num_rows += len(batch_chunk)
-        chunks.append(batch_chunk)
+    import_file.num_rows = parser.num_rows()
+    chunk_size = get_chunk_size(import_file.num_rows, import_file.num_columns, import_file.import_record.super_organization)
+    chunks = list(batch(parser.data, chunk_size))
     import_file.save()
 
     progress_data.total = len(chunks)
@@ -1497,13 +1608,11 @@ def save_raw_espm_data_synchronous(file_pk: int) -> dict:
             import_file.has_generated_headers = parser.has_generated_headers
 
         cache_first_rows(import_file, parser)
-        import_file.num_rows = 0
         import_file.num_columns = parser.num_columns()
 
-        chunks = []
-        for batch_chunk in batch(parser.data, 100):
-            import_file.num_rows += len(batch_chunk)
-            chunks.append(batch_chunk)
+        import_file.num_rows = parser.num_rows()
+        chunk_size = get_chunk_size(import_file.num_rows, import_file.num_columns, import_file.import_record.super_organization)
+        chunks = list(batch(parser.data, chunk_size))
         import_file.save()
 
         progress_data.total = len(chunks)
@@ -1630,7 +1739,8 @@ def geocode_and_match_buildings_task(file_pk):
     else:
         # get the properties and chunk them into tasks
         property_state_ids_by_cycle = None
-        id_chunks = [[obj.id for obj in chunk] for chunk in batch(property_states, 100)]
+        property_state_ids = [obj.id for obj in property_states]
+        id_chunks = [list(chunk) for chunk in batch(property_state_ids, get_chunk_size(len(property_state_ids), organization=org))]
         map_additional_models_group = group(_map_additional_models.si(id_chunk, file_pk, progress_data.key) for id_chunk in id_chunks)
 
     progress_data.total = (
@@ -1707,16 +1817,25 @@ def finish_matching(result, import_file_id, progress_key):
     return progress_data.finish_with_success()
 
 
-def add_dictionary_repr_to_hash(hash_obj, dict_obj: dict):
+def add_dictionary_repr_to_hash(hash_obj, dict_obj: dict, normalized_keys: Optional[dict] = None):
+    """
+    :param normalized_keys: dict, optional memo of the encoded, normalized keys, to share across the
+        many states with the same extra_data keys
+    """
     if not isinstance(dict_obj, dict):
         raise ValueError("Only dictionaries can be hashed")
 
     for key, value in sorted(dict_obj.items(), key=lambda x_y: x_y[0]):
         if isinstance(value, dict):
-            add_dictionary_repr_to_hash(hash_obj, value)
+            add_dictionary_repr_to_hash(hash_obj, value, normalized_keys)
         else:
             # TODO: Do we need to normalize_unicode_and_characters (formerly unidecode) here?
-            hash_obj.update(str(normalize_unicode_and_characters(key)).encode("utf-8"))
+            if normalized_keys is None:
+                hash_obj.update(str(normalize_unicode_and_characters(key)).encode("utf-8"))
+            else:
+                if key not in normalized_keys:
+                    normalized_keys[key] = str(normalize_unicode_and_characters(key)).encode("utf-8")
+                hash_obj.update(normalized_keys[key])
             if isinstance(value, str):
                 hash_obj.update(normalize_unicode_and_characters(value).encode("utf-8"))
             else:
@@ -1724,7 +1843,12 @@ def add_dictionary_repr_to_hash(hash_obj, dict_obj: dict):
     return hash_obj
 
 
-def hash_state_object(obj: Union[PropertyState, TaxLotState], include_extra_data=True, prefetched_columns: Optional[list[str]] = None):
+def hash_state_object(
+    obj: Union[PropertyState, TaxLotState],
+    include_extra_data=True,
+    prefetched_columns: Optional[list[str]] = None,
+    normalized_keys: Optional[dict] = None,
+):
     m = hashlib.md5()  # noqa: S324
     for field in prefetched_columns or Column.retrieve_db_field_name_for_hash_comparison(type(obj), obj.organization_id):
         # Default to a random value so we can distinguish between this and None.
@@ -1741,11 +1865,36 @@ def hash_state_object(obj: Union[PropertyState, TaxLotState], include_extra_data
             m.update(str(obj_val).encode("utf-8"))
 
     if include_extra_data:
-        add_dictionary_repr_to_hash(m, obj.extra_data)
+        add_dictionary_repr_to_hash(m, obj.extra_data, normalized_keys)
 
     return m.hexdigest()
 
 
+def hash_state_objects(objs: list[Union[PropertyState, TaxLotState]], include_extra_data=True, prefetched_columns=None):
+    """
+    Hash many states at once, with the same result as hash_state_object for each. The hash fields are
+    retrieved once per organization and inventory type, and the extra_data keys are normalized once.
+
+    :param objs: list of PropertyStates and/or TaxLotStates
+    :param include_extra_data: bool
+    :param prefetched_columns: list, optional fields to hash for all the states
+    :return: list, the hashes in the order of objs
+    """
+    hash_fields = {}
+    normalized_keys = {}
+    hashes = []
+    for obj in objs:
+        fields = prefetched_columns
+        if not fields:
+            fields_key = (type(obj), obj.organization_id)
+            if fields_key not in hash_fields:
+                hash_fields[fields_key] = Column.retrieve_db_field_name_for_hash_comparison(*fields_key)
+            fields = hash_fields[fields_key]
+        hashes.append(hash_state_object(obj, include_extra_data, fields, normalized_keys))
+
+    return hashes
+
+
 @shared_task
 def _map_additional_models(ids, file_pk, progress_key, cycle_id=None):
     """
@@ -2025,125 +2174,3 @@ def validate_use_cases(file_pk):
     _validate_use_cases.s(file_pk, progress_data.key).apply_async()
     _log.debug(progress_data.result())
     return progress_data.result()
-
-
-@shared_task
-def mapping_results_task(args):
-    import_file_id = args.get("import_file_id")
-    inventory_type = args.get("inventory_type")
-    org_id = args.get("org_id")
-    progress_key = args.get("progress_key")
-    progress_data = ProgressData.from_key(progress_key)
-    org = Organization.objects.get(pk=org_id)
-    properties = []
-    tax_lots = []
-
-    try:
-        import_file = ImportFile.objects.get(pk=import_file_id, import_record__super_organization_id=org_id)
-    except ImportFile.DoesNotExist:
-        progress_data.return_with_error("Could not find import file with pk=" + str(import_file_id))
-
-    # List of the only fields to show
-    field_names = import_file.get_cached_mapped_columns
-    fields = {"PropertyState": ["id", "extra_data", "lot_number"], "TaxLotState": ["id", "extra_data"]}
-
-    if inventory_type in {"properties", "all"}:
-        properties = (
-            PropertyState.objects.filter(
-                import_file_id=import_file_id,
-                data_state__in=[DATA_STATE_MAPPING, DATA_STATE_MATCHING],
-                merge_state__in=[MERGE_STATE_UNKNOWN, MERGE_STATE_NEW],
-            )
-            .only(*fields["PropertyState"])
-            .order_by("id")
-        )
-
-    if inventory_type in {"taxlots", "all"}:
-        tax_lots = (
-            TaxLotState.objects.filter(
-                import_file_id=import_file_id,
-                data_state__in=[DATA_STATE_MAPPING, DATA_STATE_MATCHING],
-                merge_state__in=[MERGE_STATE_UNKNOWN, MERGE_STATE_NEW],
-            )
-            .only(*fields["TaxLotState"])
-            .order_by("id")
-        )
-
-    progress_total = len(properties) + len(tax_lots) + len(field_names)  #  + 1 so total is never reached?
-    progress_data = update_sub_progress_total(progress_total, progress_key)
-
-    progress_data.save()
-
-    columns_from_db = Column.retrieve_all(org_id)
-    property_column_name_mapping = {}
-    taxlot_column_name_mapping = {}
-    extra_data_units = {}
-    for field_name in field_names:
-        # find the field from the columns in the database
-        progress_data.step("Fetching column field names")
-        for column in columns_from_db:
-            if column["table_name"] == "PropertyState" and field_name[0] == "PropertyState" and field_name[1] == column["column_name"]:
-                property_column_name_mapping[column["column_name"]] = column["name"]
-                if not column["is_extra_data"]:
-                    fields["PropertyState"].append(field_name[1])  # save to the raw db fields
-                elif DEFAULT_UNITS.get(column["data_type"]):
-                    extra_data_units[column["column_name"]] = DEFAULT_UNITS.get(column["data_type"])
-            elif column["table_name"] == "TaxLotState" and field_name[0] == "TaxLotState" and field_name[1] == column["column_name"]:
-                taxlot_column_name_mapping[column["column_name"]] = column["name"]
-                if not column["is_extra_data"]:
-                    fields["TaxLotState"].append(field_name[1])  # save to the raw db fields
-                elif DEFAULT_UNITS.get(column["data_type"]):
-                    extra_data_units[column["column_name"]] = DEFAULT_UNITS.get(column["data_type"])
-
-    result = {"status": "success"}
-
-    # Map properties
-    if inventory_type in {"properties", "all"}:
-        property_results = []
-        for prop in properties:
-            progress_data.step("Mapping Properties")
-            prop_dict = TaxLotProperty.model_to_dict_with_mapping(
-                prop, property_column_name_mapping, fields=fields["PropertyState"], exclude=["extra_data"]
-            )
-
-            prop_dict.update(
-                TaxLotProperty.extra_data_to_dict_with_mapping(
-                    prop.extra_data, property_column_name_mapping, fields=prop.extra_data.keys(), units=extra_data_units
-                ).items()
-            )
-            if prop.raw_access_level_instance is not None:
-                prop_dict.update(prop.raw_access_level_instance.path)
-            prop_dict["raw_access_level_instance_error"] = prop.raw_access_level_instance_error
-
-            prop_dict = apply_display_unit_preferences(org, prop_dict)
-            property_results.append(prop_dict)
-
-        result["properties"] = property_results
-
-    # Map taxlots
-    if inventory_type in {"taxlots", "all"}:
-        tax_lot_results = []
-        for tax_lot in tax_lots:
-            progress_data.step("Mapping Tax Lots")
-            tax_lot_dict = TaxLotProperty.model_to_dict_with_mapping(
-                tax_lot, taxlot_column_name_mapping, fields=fields["TaxLotState"], exclude=["extra_data"]
-            )
-            tax_lot_dict.update(
-                TaxLotProperty.extra_data_to_dict_with_mapping(
-                    tax_lot.extra_data,
-                    taxlot_column_name_mapping,
-                    fields=tax_lot.extra_data.keys(),
-                ).items()
-            )
-            if tax_lot.raw_access_level_instance is not None:
-                tax_lot_dict.update(tax_lot.raw_access_level_instance.path)
-            tax_lot_dict["raw_access_level_instance_error"] = tax_lot.raw_access_level_instance_error
-
-            tax_lot_dict = apply_display_unit_preferences(org, tax_lot_dict)
-            tax_lot_results.append(tax_lot_dict)
-
-        result["tax_lots"] = tax_lot_results
-
-    set_cache_raw(progress_data.unique_id, result, 1800)  # 30 mins
-
-    progress_data.finish_with_success()
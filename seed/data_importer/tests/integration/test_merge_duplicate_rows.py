@@ -109,6 +109,36 @@ class TestCaseMultipleDuplicateMatching(DataMappingBaseTestCase):
         self.assertEqual(tasks.hash_state_object(ps1, False), tasks.hash_state_object(ps2, False))
         self.assertEqual(tasks.hash_state_object(ps1, False), tasks.hash_state_object(ps3, False))
 
+    def test_hash_fields_cache_is_cleared(self):
+        hash_fields = Column.retrieve_db_field_name_for_hash_comparison(PropertyState, self.org.id)
+        self.assertIn("address_line_2", hash_fields)
+
+        address_line_2 = Column.objects.get(column_name="address_line_2", table_name="PropertyState", organization=self.org)
+        address_line_2.is_excluded_from_hash = True
+        address_line_2.save()
+        self.assertNotIn("address_line_2", Column.retrieve_db_field_name_for_hash_comparison(PropertyState, self.org.id))
+
+        # the cached list is only cleared when is_excluded_from_hash changes
+        address_line_2.display_name = "Second Address Line"
+        address_line_2.save()
+        self.assertNotIn("address_line_2", Column.retrieve_db_field_name_for_hash_comparison(PropertyState, self.org.id))
+
+        address_line_2 = Column.objects.get(pk=address_line_2.pk)
+        address_line_2.is_excluded_from_hash = False
+        address_line_2.save()
+        self.assertEqual(hash_fields, Column.retrieve_db_field_name_for_hash_comparison(PropertyState, self.org.id))
+
+    def test_hash_state_objects(self):
+        states = [
+            PropertyState(address_line_1="123 fake st", extra_data={"a": "100", "b": {"ç": "é"}}, organization=self.org),
+            PropertyState(address_line_1="123 fake st", extra_data={"a": "200"}, organization=self.org),
+            PropertyState(extra_data={"ç": 1.5}, organization=self.org),
+            TaxLotState(address_line_1="123 fake st", extra_data={"a": "100"}, organization=self.org),
+        ]
+
+        self.assertEqual(tasks.hash_state_objects(states), [tasks.hash_state_object(state) for state in states])
+        self.assertEqual(tasks.hash_state_objects(states, False), [tasks.hash_state_object(state, False) for state in states])
+
     def test_hash_various_states(self):
         """The hashing should not affect the data_state, source, type and various other states"""
         ps1 = PropertyState.objects.create(
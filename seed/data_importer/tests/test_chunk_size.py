@@ -0,0 +1,49 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+from django.test import TestCase, override_settings
+
+from seed.data_importer.utils import MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, get_chunk_size
+from seed.landing.models import SEEDUser as User
+from seed.utils.organizations import create_organization
+
+
+@override_settings(SEED_IMPORT_CHUNK_SIZE=None, SEED_IMPORT_WORKER_COUNT=4)
+class TestChunkSize(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("test_user@demo.com", password="test_pass")
+        self.org, _, _ = create_organization(self.user, "test-organization-a")
+
+    def test_small_files_use_minimum_chunk_size(self):
+        self.assertEqual(get_chunk_size(0), MIN_CHUNK_SIZE)
+        self.assertEqual(get_chunk_size(250), MIN_CHUNK_SIZE)
+
+    def test_large_files_are_spread_over_workers(self):
+        # 4 workers x 4 tasks per worker
+        self.assertEqual(get_chunk_size(32_000), 2_000)
+        self.assertEqual(get_chunk_size(10_000_000), MAX_CHUNK_SIZE)
+
+    def test_wide_files_use_smaller_chunks(self):
+        self.assertEqual(get_chunk_size(32_000, column_count=200), 1_000)
+        self.assertEqual(get_chunk_size(32_000, column_count=100_000), MIN_CHUNK_SIZE)
+
+    def test_min_and_max_size(self):
+        self.assertEqual(get_chunk_size(100, min_size=1000), 1000)
+        self.assertEqual(get_chunk_size(10_000_000, min_size=1000, max_size=10_000), 10_000)
+
+    def test_overrides(self):
+        with override_settings(SEED_IMPORT_CHUNK_SIZE=250):
+            self.assertEqual(get_chunk_size(10_000_000, organization=self.org), 250)
+
+            self.org.import_chunk_size = 500
+            self.org.save()
+            self.assertEqual(get_chunk_size(10_000_000, organization=self.org), 500)
+
+            # overrides are kept within the bounds of the computed chunk sizes
+            self.org.import_chunk_size = 50
+            self.assertEqual(get_chunk_size(10_000_000, organization=self.org), MIN_CHUNK_SIZE)
+            self.org.import_chunk_size = 10_000_000
+            self.assertEqual(get_chunk_size(100, organization=self.org), MAX_CHUNK_SIZE)
+            self.assertEqual(get_chunk_size(100, organization=self.org, min_size=1000, max_size=10_000), 10_000)
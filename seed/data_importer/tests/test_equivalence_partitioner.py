@@ -76,3 +76,23 @@ class TestEquivalenceClassGenerator(DataMappingBaseTestCase):
         self.assertEqual(tls3.jurisdiction_tax_lot_id, "1")
         self.assertEqual(tls3.custom_id_1, "100")
         self.assertEqual(tls3.normalized_address, "123 fake street")
+
+    def test_indexed_equivalence_matches_scan(self):
+        partitioner = EquivalencePartitioner.make_propertystate_equivalence()
+
+        states = [
+            PropertyState(pm_property_id=100),
+            PropertyState(custom_id_1=100),
+            PropertyState(pm_property_id=200, normalized_address="123 fake street"),
+            PropertyState(pm_property_id=300, normalized_address="123 fake street"),
+            PropertyState(normalized_address="123 fake street"),
+            PropertyState(ubid="abc+123", custom_id_1=200),
+            PropertyState(ubid="abc+123"),
+            PropertyState(),
+            PropertyState(pm_property_id=""),
+            PropertyState(),
+        ]
+
+        equivalence_classes = partitioner.calculate_equivalence_classes(states)
+        self.assertEqual(list(equivalence_classes.items()), list(partitioner._calculate_equivalence_classes_by_scan(states).items()))
+        self.assertEqual(list(equivalence_classes.values()), [[0, 1], [2, 4, 5], [3], [6], [7, 9], [8]])
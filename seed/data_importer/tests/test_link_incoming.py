@@ -121,6 +121,37 @@ class TestMatchMergeLink(DataMappingBaseTestCase):
         self.assertEqual(3, views_with_same_canonical_record["times_used"])
         self.assertCountEqual([self.cycle_1.id, self.cycle_2.id, self.cycle_3.id], views_with_same_canonical_record["cycle_ids"])
 
+    def test_link_many_properties_across_cycles(self):
+        base_state_details = {
+            "import_file_id": self.import_file_1.id,
+            "data_state": DATA_STATE_MAPPING,
+            "no_default_data": False,
+            "raw_access_level_instance_id": self.org.root.id,
+        }
+        for i in range(5):
+            self.property_state_factory.get_property_state(pm_property_id=f"Link Set {i}", **base_state_details)
+
+        self.import_file_1.mapping_done = True
+        self.import_file_1.save()
+        geocode_and_match_buildings_task(self.import_file_1.id)
+
+        base_state_details["import_file_id"] = self.import_file_2.id
+        for i in range(5):
+            self.property_state_factory.get_property_state(pm_property_id=f"Link Set {i}", **base_state_details)
+        self.property_state_factory.get_property_state(pm_property_id="Single Unmatched", **base_state_details)
+
+        self.import_file_2.mapping_done = True
+        self.import_file_2.save()
+        geocode_and_match_buildings_task(self.import_file_2.id)
+
+        # each set is linked to its match in the other cycle, and the unmatched set is on its own
+        self.assertEqual(11, PropertyView.objects.count())
+        for i in range(5):
+            views = PropertyView.objects.filter(state__pm_property_id=f"Link Set {i}")
+            self.assertCountEqual([self.cycle_1.id, self.cycle_2.id], views.values_list("cycle_id", flat=True))
+            self.assertEqual(1, len(set(views.values_list("property_id", flat=True))))
+        self.assertEqual(6, len(set(PropertyView.objects.values_list("property_id", flat=True))))
+
     def test_match_merge_link_for_taxlots(self):
         """
         In this context, a "set" includes a -State, -View, and canonical record.
@@ -14,10 +14,11 @@ from quantityfield.units import ureg
 from seed.data_importer import tasks
 from seed.data_importer.tests.util import FAKE_MAPPINGS
 from seed.lib.mcm import mapper
-from seed.models import ASSESSED_RAW, DATA_STATE_IMPORT, DATA_STATE_MAPPING, Column, PropertyState
+from seed.models import ASSESSED_RAW, DATA_STATE_IMPORT, DATA_STATE_MAPPING, Column, PropertyAuditLog, PropertyState
 from seed.models.column_mappings import get_column_mapping
 from seed.test_helpers.fake import FakePropertyFactory, FakePropertyStateFactory, FakePropertyViewFactory
 from seed.tests.util import DataMappingBaseTestCase
+from seed.utils.cache import get_cache_raw
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +82,76 @@ class TestMapping(DataMappingBaseTestCase):
         # for p in props:
         #     pp(p)
 
+    def test_mapping_bulk_creates_states_and_audit_logs(self):
+        """Every mapped state is saved with its hash, normalized address, and import audit log"""
+        for _ in range(3):
+            self.property_state_factory.get_property_state_as_extra_data(
+                import_file_id=self.import_file.id, source_type=ASSESSED_RAW, data_state=DATA_STATE_IMPORT
+            )
+        self.import_file.raw_save_done = True
+        self.import_file.save()
+
+        state = PropertyState.objects.filter(import_file=self.import_file).first()
+        suggested_mappings = mapper.build_column_mapping(
+            list(state.extra_data.keys()),
+            Column.retrieve_all_by_tuple(self.org),
+            previous_mapping=get_column_mapping,
+            map_args=[self.org],
+            thresh=80,
+        )
+        mappings = [
+            {
+                "from_field": raw_column,
+                "from_units": None,
+                "to_table_name": suggestion[0],
+                "to_field": suggestion[1],
+                "to_field_display_name": suggestion[1],
+            }
+            for raw_column, suggestion in suggested_mappings.items()
+        ]
+        Column.create_mappings(mappings, self.org, self.user, self.import_file.id)
+
+        tasks.map_data(self.import_file.id)
+
+        props = self.import_file.find_unmatched_property_states()
+        self.assertEqual(props.count(), 3)
+        for prop in props:
+            self.assertIsNotNone(prop.hash_object)
+            self.assertIsNotNone(prop.normalized_address)
+            self.assertEqual(PropertyAuditLog.objects.filter(state=prop, name="Import Creation").count(), 1)
+
+    def test_mapping_plan_is_cached_and_rebuilt_when_missing(self):
+        state = self.property_state_factory.get_property_state_as_extra_data(
+            import_file_id=self.import_file.id, source_type=ASSESSED_RAW, data_state=DATA_STATE_IMPORT
+        )
+        self.import_file.raw_save_done = True
+        self.import_file.save()
+        mappings = [
+            {
+                "from_field": raw_column,
+                "from_units": None,
+                "to_table_name": "PropertyState",
+                "to_field": raw_column,
+                "to_field_display_name": raw_column,
+            }
+            for raw_column in state.extra_data
+        ]
+        Column.create_mappings(mappings, self.org, self.user, self.import_file.id)
+
+        tasks.map_data(self.import_file.id)
+
+        # the plan is only kept while the file is mapped
+        self.assertIsNone(get_cache_raw(tasks._mapping_plan_cache_key(self.import_file.id)))
+
+        mapping_plan = get_cache_raw(tasks._cache_mapping_plan(self.import_file, self.org))
+        self.assertIn("PropertyState", mapping_plan["table_mappings"])
+        self.assertIn("address_line_1", mapping_plan["tables"]["PropertyState"]["hash_fields"])
+
+        # a missing plan is rebuilt from the database
+        rebuilt_plan = tasks._get_mapping_plan("not-a-mapping-plan-key", self.import_file, self.org)
+        self.assertEqual(rebuilt_plan["table_mappings"], mapping_plan["table_mappings"])
+        self.assertEqual(rebuilt_plan["tables"], mapping_plan["tables"])
+
     def test_remapping_with_and_without_unit_aware_columns_does_not_lose_data(self):
         """
         During import, when the initial -State objects are created from the extra_data values,
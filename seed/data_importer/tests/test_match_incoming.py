@@ -12,7 +12,7 @@ import pytz
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from config.settings.common import BASE_DIR
-from seed.data_importer.match import filter_duplicate_states, save_state_match
+from seed.data_importer.match import filter_duplicate_states, merge_state_groups, save_state_match
 from seed.data_importer.models import ImportFile
 from seed.data_importer.tasks import geocode_and_match_buildings_task, map_data, save_raw_data
 from seed.lib.progress_data.progress_data import ProgressData
@@ -1048,6 +1048,44 @@ class TestMatchingHelperMethods(DataMappingBaseTestCase):
         self.assertEqual(pal.parent_state2, ps_2)
         self.assertEqual(pal.description, "Automatic Merge")
 
+    def test_merge_state_groups(self):
+        ps_1 = self.property_state_factory.get_property_state(property_name="first", extra_data={"extra_1": "a"})
+        ps_2 = self.property_state_factory.get_property_state(property_name="second")
+        ps_3 = self.property_state_factory.get_property_state(property_name="third", extra_data={"extra_2": "b"})
+        ps_4 = self.property_state_factory.get_property_state(property_name="fourth")
+        ps_5 = self.property_state_factory.get_property_state(property_name="fifth")
+
+        priorities = Column.retrieve_priorities(self.org.pk)
+        merged_ids, merge_count, errored_states = merge_state_groups(
+            [[ps_3.id, ps_1.id, ps_2.id], [ps_4.id, ps_5.id]], self.org, PropertyState, priorities
+        )
+
+        self.assertEqual(merge_count, 3)
+        self.assertEqual(errored_states, [])
+        # 5 states, 2 intermediate and 2 final merge results
+        self.assertEqual(PropertyState.objects.count(), 9)
+
+        # the newest state takes precedence and extra data is combined
+        merged_state = PropertyState.objects.get(id=merged_ids[0])
+        self.assertEqual(merged_state.merge_state, MERGE_STATE_MERGED)
+        self.assertEqual(merged_state.property_name, "third")
+        self.assertEqual(merged_state.extra_data["extra_1"], "a")
+        self.assertEqual(merged_state.extra_data["extra_2"], "b")
+        self.assertIsNotNone(merged_state.hash_object)
+        self.assertEqual(PropertyState.objects.get(id=merged_ids[1]).property_name, "fifth")
+
+        # the audit log history is the same as merging the states two at a time
+        pal = PropertyAuditLog.objects.get(organization=self.org, state=merged_state)
+        self.assertEqual(pal.name, "System Match")
+        self.assertEqual(pal.description, "Automatic Merge")
+        self.assertEqual(pal.parent_state2, ps_3)
+        self.assertEqual(pal.parent2.state, ps_3)
+        intermediate_pal = pal.parent1
+        self.assertEqual(intermediate_pal.state, pal.parent_state1)
+        self.assertEqual(intermediate_pal.parent_state1, ps_1)
+        self.assertEqual(intermediate_pal.parent_state2, ps_2)
+        self.assertEqual(intermediate_pal.parent1.state, ps_1)
+
     def test_filter_duplicate_states(self):
         for i in range(10):
             self.property_state_factory.get_property_state(
@@ -6,6 +6,21 @@ Utility methods pertaining to data import tasks (save, mapping, matching).
 """
 
 from collections import defaultdict
+from math import ceil
+
+from django.conf import settings
+
+# Bounds on the number of rows that are processed by a single celery task when fanning out the
+# import, mapping, data quality and matching work.
+MIN_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 5000
+
+# Approximate number of cells (rows x columns) that a single task should process. Wide files get
+# smaller chunks so that the task payloads and memory per task stay bounded.
+CELLS_PER_CHUNK = 200_000
+
+# Number of tasks to queue per worker so that the work stays balanced when some chunks are slower
+TASKS_PER_WORKER = 4
 
 
 def kbtu_thermal_conversion_factors(country):
@@ -463,3 +478,33 @@ def usage_point_id(raw_source_id):
         return id_split[usage_point_index]
     else:
         return raw_source_id
+
+
+def get_chunk_size(row_count, column_count=None, organization=None, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """
+    Return the number of rows to process per celery task when fanning out work over a file or set
+    of records.
+
+    Small files keep the minimum chunk size so that the progress bar still moves, while large files
+    get fewer, larger chunks so that the broker and progress overhead per task does not dominate.
+    The chunk size is spread over the available workers (settings.SEED_IMPORT_WORKER_COUNT) and
+    capped by the number of columns. The organization's import_chunk_size, or else the
+    settings.SEED_IMPORT_CHUNK_SIZE, overrides the computed value when set, within the same bounds.
+
+    :param row_count: int, number of rows or records that will be chunked
+    :param column_count: int, optional, number of columns per row
+    :param organization: Organization, optional, used to look up the organization's override
+    :param min_size: int, smallest chunk size to return
+    :param max_size: int, largest chunk size to return
+    :return: int, number of rows per chunk
+    """
+    override = getattr(organization, "import_chunk_size", None) or getattr(settings, "SEED_IMPORT_CHUNK_SIZE", None)
+    if override:
+        chunk_size = int(override)
+    else:
+        worker_count = max(getattr(settings, "SEED_IMPORT_WORKER_COUNT", 1) or 1, 1)
+        chunk_size = ceil((row_count or 0) / (worker_count * TASKS_PER_WORKER))
+        if column_count:
+            chunk_size = min(chunk_size, CELLS_PER_CHUNK // column_count)
+
+    return max(min_size, min(chunk_size, max_size))
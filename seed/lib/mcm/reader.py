@@ -7,14 +7,20 @@ out of CSV files. Fuzzy matches, application to data models happens
 elsewhere.
 """
 
+import datetime
 import json
 import logging
 import mmap
 import operator
+import pickle
 import re
+import tempfile
 from csv import DictReader, Sniffer
+from zipfile import BadZipFile
 
 import xmltodict
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 from xlrd import XLRDError, empty_cell, open_workbook, xldate
 from xlrd.xldate import XLDateAmbiguous
 
@@ -33,6 +39,11 @@ from seed.lib.mcm.cleaners import normalize_unicode_and_characters
     XL_CELL_BLANK,
 ) = range(7)
 
+# Local file header signature of the zip archives XLSX workbooks are stored in
+XLSX_SIGNATURE = b"PK\x03\x04"
+# Number of XLSX rows written to the temporary file at once
+XLSX_SPOOL_BATCH_SIZE = 1000
+
 ROW_DELIMITER = "|#*#|"
 SEED_GENERATED_HEADER_PREFIX = "SEED Generated Header"
 
@@ -349,10 +360,17 @@ class GeoJSONParser:
     def num_columns(self):
         return len(self.headers)
 
+    def num_rows(self):
+        return len(self.data)
+
 
 class ExcelParser:
     """MS Excel (.xls, .xlsx) file parser for MCMParser
 
+    XLSX workbooks are read with openpyxl in read-only mode, which streams the sheet instead of loading
+    it. The values of the rows are written to a temporary file in the same pass, so memory stays bounded
+    and ``seek_to_beginning`` does not parse the sheet again. Legacy XLS workbooks are read with xlrd.
+
     usage:
             f = open('data.xls', 'rb')
             reader = MCMParser(f)
@@ -372,47 +390,148 @@ class ExcelParser:
         self.excelreader = self.excel_dict_reader(self.sheet, self.header_row)
 
     def _get_sheet(self, f, sheet_name=None, sheet_index=0):
-        """returns a xlrd sheet
+        """returns a read-only openpyxl worksheet for XLSX files, otherwise a xlrd sheet
 
         :param f: an open file of type ``file``
         :param sheet_index: the excel sheet with a 0-index
-        :returns: xlrd Sheet
+        :returns: openpyxl ReadOnlyWorksheet or xlrd Sheet
         """
         data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._is_xlsx = False
+        if data[:4] == XLSX_SIGNATURE:
+            try:
+                # zipfile needs a seekable binary file, the import file may be opened in text mode
+                book = load_workbook(open(f.fileno(), "rb", closefd=False), read_only=True, data_only=True)  # noqa: SIM115
+            except (BadZipFile, InvalidFileException, KeyError):
+                # not a workbook, let xlrd report the format error
+                pass
+            else:
+                self._is_xlsx = True
+                self._workbook = book
+
+                if sheet_name is None:
+                    sheet = book.worksheets[sheet_index]
+                elif sheet_name in book.sheetnames:
+                    sheet = book[sheet_name]
+                else:
+                    raise XLRDError(f"No sheet named <{sheet_name!r}>")
+
+                self._spool_xlsx_rows(sheet)
+                return sheet
+
         book = open_workbook(file_contents=data, on_demand=True)
         self._workbook = book  # needed to determine datemode
 
         if sheet_name is None:
-            return book.sheet_by_index(sheet_index)
+            sheet = book.sheet_by_index(sheet_index)
         else:
-            return book.sheet_by_name(sheet_name)
+            sheet = book.sheet_by_name(sheet_name)
+        self._ncols = sheet.ncols
+        return sheet
+
+    @staticmethod
+    def _is_empty_xlsx_cell(cell):
+        """xlrd keeps formula and error cells without a cached value, skip only the other cells without one"""
+        return cell.value is None and cell.data_type not in {"str", "e"}
+
+    def _spool_xlsx_rows(self, sheet):
+        """Read the sheet in one streaming pass. The values of the rows are written to a temporary file
+        in batches, while the number of columns and rows with values and the best guess for the header
+        row are determined. The dimensions stored in the file also count formatted empty cells, which
+        xlrd ignores, so they are not used.
+
+        :param sheet: openpyxl ReadOnlyWorksheet
+        """
+        self._spool = tempfile.TemporaryFile()  # noqa: SIM115
+        # the stored dimensions may also be wrong, read the rows as they are in the file
+        sheet.reset_dimensions()
+
+        ncols = nrows = 0
+        # number of columns -> first row with a value in each of them, and its cleaned values
+        full_rows = {}
+        first_row_headers = []
+        rows = []
+        for i, row in enumerate(sheet.iter_rows()):
+            rows.append([self.get_value(cell) for cell in row])
+            if len(rows) == XLSX_SPOOL_BATCH_SIZE:
+                pickle.dump(rows, self._spool, pickle.HIGHEST_PROTOCOL)
+                rows = []
+
+            filled = [j for j, cell in enumerate(row) if not self._is_empty_xlsx_cell(cell)]
+            if i == 0:
+                first_row_headers = [self.get_value(cell, trim_and_clean_strings=True) for cell in row]
+            if not filled:
+                continue
+            nrows = i + 1
+            ncols = max(ncols, filled[-1] + 1)
+            if len(filled) == filled[-1] + 1 and len(filled) not in full_rows:
+                full_rows[len(filled)] = (i, [self.get_value(cell, trim_and_clean_strings=True) for cell in row])
+        if rows:
+            pickle.dump(rows, self._spool, pickle.HIGHEST_PROTOCOL)
+
+        # default to first row
+        self._xlsx_header_row, headers = full_rows.get(ncols, (0, first_row_headers))
+        self._ncols = ncols
+        self._nrows = nrows
+        self.cache_headers = (headers + [""] * ncols)[:ncols]
+
+    def _iter_values(self, sheet, first_row=0):
+        """returns a generator yielding the values of each row
+
+        :param sheet: openpyxl ReadOnlyWorksheet or xlrd Sheet
+        :param first_row: the 0-indexed row to start with
+        :returns: Generator yielding a row as a list of values
+        """
+        if not self._is_xlsx:
+            return ([self.get_value(cell) for cell in sheet.row(i)] for i in range(first_row, sheet.nrows))
+
+        def spooled_rows():
+            i = offset = 0
+            while i < self._nrows:
+                # other readers may have moved the shared file position
+                self._spool.seek(offset)
+                rows = pickle.load(self._spool)  # noqa: S301
+                offset = self._spool.tell()
+                yield from rows[max(first_row - i, 0) : self._nrows - i]
+                i += len(rows)
+
+        return spooled_rows()
 
     def _get_header_row(self, sheet):
         """returns the best guess for the header row
 
-        :param sheet: xlrd sheet
+        :param sheet: openpyxl ReadOnlyWorksheet or xlrd Sheet
         :returns: index of header row
         """
-        for row in range(sheet.nrows):
-            row_contains_empty_cells = False
-            for col in range(sheet.ncols):
-                if sheet.cell(row, col).ctype == empty_cell.ctype:
-                    row_contains_empty_cells = True
-                    break
-            if not row_contains_empty_cells:
-                return row
+        if self._is_xlsx:
+            return self._xlsx_header_row
+
+        for i in range(sheet.nrows):
+            if empty_cell.ctype not in sheet.row_types(i):
+                return i
         # default to first row
         return 0
 
+    def _clean_string(self, value, **kwargs):
+        """normalize a string value, see ``get_value`` for the kwargs"""
+        if kwargs.get("trim_and_clean_strings", False):
+            # remove leading and trailing whitespace
+            value = value.strip()
+            # remove any double spaces within the string
+            value = " ".join(value.split())
+        return normalize_unicode_and_characters(value)
+
     def get_value(self, item, **kwargs):
         """Handle different value types for XLS.
 
-        :param item: xlrd cell object
+        :param item: xlrd cell object, or openpyxl cell object for XLSX files
         :kwargs:
             :trim_and_clean_strings: boolean, default False, strip whitespace before and after, remove
                                      multiple whitespaces within string. Used specifically for headers
         :returns: items value with dates parsed properly
         """
+        if self._is_xlsx:
+            return self._get_xlsx_value(item, **kwargs)
 
         if item.ctype == XL_CELL_DATE:
             try:
@@ -440,47 +559,76 @@ class ExcelParser:
 
         # XL_CELL_TEXT
         if isinstance(item.value, str):
-            if kwargs.get("trim_and_clean_strings", False):
-                # remove leading and trailing whitespace
-                value = item.value.strip()
-                # remove any double spaces within the string
-                value = " ".join(value.split())
-            else:
-                value = item.value
-            return normalize_unicode_and_characters(value)
+            return self._clean_string(item.value, **kwargs)
 
         # only remaining items should be booleans
         return item.value
 
+    def _get_xlsx_value(self, item, **kwargs):
+        """Handle different value types for XLSX the same way as ``get_value`` does for XLS.
+
+        :param item: openpyxl cell object
+        :returns: items value with dates parsed properly
+        """
+        value = item.value
+
+        # If Excel reports an ERROR (typically the #VALUE! or #NAME! in the cell), then return None
+        if item.data_type == "e":
+            return None
+
+        # If it is blank or empty, then return empty string. Like xlrd, a formula without a cached
+        # string result is None
+        if value is None:
+            return None if item.data_type == "str" else ""
+
+        if isinstance(value, str):
+            return self._clean_string(value, **kwargs)
+
+        # xlrd reads booleans as 0 and 1
+        if isinstance(value, bool):
+            return int(value)
+
+        if isinstance(value, datetime.time):
+            # xlrd reads times as on the day before the 1900 epoch
+            value = datetime.datetime.combine(datetime.date(1899, 12, 31), value)
+        elif isinstance(value, datetime.timedelta):
+            value = datetime.datetime(1899, 12, 31) + value
+        elif isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            value = datetime.datetime.combine(value, datetime.time())
+        if isinstance(value, datetime.datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+
+        if value % 1 == 0:  # integers
+            return int(value)
+        return value
+
     def excel_dict_reader(self, sheet, header_row=0):
         """returns a generator yielding a dict per row from the XLS/XLSX file
         https://gist.github.com/mdellavo/639082
 
-        :param sheet: xlrd Sheet
+        :param sheet: openpyxl ReadOnlyWorksheet or xlrd Sheet
         :param header_row: the row index to start with
         :returns: Generator yielding a row as Dict
         """
 
         # save off the headers into a member variable. Only do this once. If excel_dict_reader is
-        # called later (which it is in `seek_to_beginning` then don't reparse the headers
-        if not self.cache_headers:
-            for j in range(sheet.ncols):
-                self.cache_headers.append(self.get_value(sheet.cell(header_row, j), trim_and_clean_strings=True))
+        # called later (which it is in `seek_to_beginning` then don't reparse the headers. The headers
+        # of XLSX files are cleaned while the sheet is read.
+        if not self.cache_headers and not self._is_xlsx and sheet.nrows:
+            self.cache_headers = [self.get_value(cell, trim_and_clean_strings=True) for cell in sheet.row(header_row)]
 
-        def item(i, j):
-            """returns a tuple (column header, cell value)"""
-            # self.cache_headers[j],
-            return (self.get_value(sheet.cell(header_row, j), trim_and_clean_strings=True), self.get_value(sheet.cell(i, j)))
+        headers = self.cache_headers
+        padding = [""] * len(headers)
 
         # return a generator, using yield here wouldn't run until the first
         # usage causing the try/except in MCMParser _get_reader to return
         # ExcelReader for csv files
-        return (dict(item(i, j) for j in range(sheet.ncols)) for i in range(header_row + 1, sheet.nrows))
+        return (dict(zip(headers, row + padding[len(row) :])) for row in self._iter_values(sheet, header_row + 1))
 
     def seek_to_beginning(self):
         """seeks to the beginning of the file
 
-        Since ``excel_dict_reader`` is in memory, a new one is created. Note: the headers will not be
+        Since ``excel_dict_reader`` is a generator, a new one is created. Note: the headers will not be
         parsed again when the excel_dict_reader is loaded
         """
         self.excel_file.seek(0)
@@ -488,7 +636,12 @@ class ExcelParser:
 
     def num_columns(self):
         """gets the number of columns for the file"""
-        return self.sheet.ncols
+        return self._ncols
+
+    def num_rows(self):
+        """gets the number of rows after the header row for the file"""
+        nrows = self._nrows if self._is_xlsx else self.sheet.nrows
+        return max(nrows - self.header_row - 1, 0)
 
     @property
     def headers(self):
@@ -544,6 +697,11 @@ class CSVParser:
         """gets the number of columns for the file"""
         return len(self.csvreader.fieldnames)
 
+    def num_rows(self):
+        """counts the rows after the header row for the file, reading it without keeping the rows"""
+        self.seek_to_beginning()
+        return sum(1 for _ in DictReader(self.csvfile, dialect=self.csvreader.dialect, fieldnames=self.csvreader.fieldnames))
+
     @property
     def headers(self):
         """original ordered list of headers with leading and trailing spaces stripped"""
@@ -617,6 +775,12 @@ class MCMParser:
         """returns the number of columns of the file"""
         return self.reader.num_columns()
 
+    def num_rows(self):
+        """returns the number of rows of the file, and seeks back to the beginning"""
+        num_rows = self.reader.num_rows()
+        self.seek_to_beginning()
+        return num_rows
+
     @property
     def headers(self):
         """original ordered list of spreadsheet headers that are not cleaned"""
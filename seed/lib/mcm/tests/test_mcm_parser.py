@@ -58,6 +58,11 @@ class CSVParserTest(TestCase):
     def test_it_has_a_num_columns_property(self):
         self.assertEqual(self.parser.num_columns(), 6)
 
+    def test_it_has_a_num_rows_property(self):
+        self.assertEqual(self.parser.num_rows(), 2)
+        # counting the rows doesn't move the data
+        self.assertEqual(len(list(self.parser.data)), 2)
+
     def test_it_has_a_first_five_rows_property(self):
         expectation = [
             "|#*#|".join([str(i) for i in range(1, 7)]),
@@ -122,3 +127,32 @@ class CSVMissingHeadersParserTest(TestCase):
         ]
 
         self.assertEqual(self.parser.first_five_rows, expectation)
+
+
+class ExcelParserTest(TestCase):
+    def setUp(self):
+        test_data = f"{os.path.dirname(os.path.abspath(__file__))}/test_data"
+        self.xls_file = open(f"{test_data}/test_espm.xls", encoding="utf-8")  # noqa: SIM115
+        self.xlsx_file = open(f"{test_data}/test_espm.xlsx", encoding="utf-8")  # noqa: SIM115
+        self.xls_parser = MCMParser(self.xls_file)
+        self.xlsx_parser = MCMParser(self.xlsx_file)
+
+    def tearDown(self) -> None:
+        self.xls_file.close()
+        self.xlsx_file.close()
+
+    def test_xlsx_is_read_like_xls(self):
+        self.assertEqual(self.xlsx_parser.headers, self.xls_parser.headers)
+        self.assertEqual(self.xlsx_parser.num_columns(), self.xls_parser.num_columns())
+        self.assertEqual(self.xlsx_parser.num_rows(), self.xls_parser.num_rows())
+        self.assertEqual(self.xlsx_parser.num_rows(), 3)
+        self.assertEqual(list(self.xlsx_parser.data), list(self.xls_parser.data))
+
+    def test_xlsx_data_can_be_read_again(self):
+        data = list(self.xlsx_parser.data)
+        self.xlsx_parser.seek_to_beginning()
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(list(self.xlsx_parser.data), data)
+        self.assertEqual(data[0]["Property Id"], 5487)
+        self.assertEqual(data[0]["Year Ending"], "2010-12-31 00:00:00")
@@ -155,7 +155,16 @@ def _merge_extra_data(ed1, ed2, priorities, recognize_empty_columns, ignore_merg
     return extra_data
 
 
-def merge_state(merged_state, state1, state2, priorities, ignore_merge_protection=False):
+def merge_state(
+    merged_state,
+    state1,
+    state2,
+    priorities,
+    ignore_merge_protection=False,
+    recognize_empty_columns=None,
+    recognize_empty_ed_columns=None,
+    merge_relationships=True,
+):
     """
     Set attributes on our Canonical model, saving differences.
 
@@ -163,6 +172,11 @@ def merge_state(merged_state, state1, state2, priorities, ignore_merge_protectio
     :param state1: PropertyState/TaxLotState model inst. Left parent.
     :param state2: PropertyState/TaxLotState model inst. Right parent.
     :param priorities: dict, column names with favor new or existing
+    :param recognize_empty_columns: list, optional, names of the db columns that recognize empty
+        values. Pass in when merging many states to avoid querying the columns for every merge.
+    :param recognize_empty_ed_columns: list, optional, same as above but for the extra data columns
+    :param merge_relationships: bool, merge the measures, scenarios and simulations of the states.
+        This requires ``merged_state`` to be saved already.
     :return: inst(``merged_state``), updated.
     """
     # Calculate the difference between the two states and save into a dictionary
@@ -171,9 +185,10 @@ def merge_state(merged_state, state1, state2, priorities, ignore_merge_protectio
     # Handle geocoding results first so that recognize_empty logic is not processed on them.
     _merge_geocoding_results(merged_state, state1, state2, priorities, can_attrs, ignore_merge_protection)
 
-    recognize_empty_columns = state2.organization.column_set.filter(
-        table_name=state2.__class__.__name__, recognize_empty=True, is_extra_data=False
-    ).values_list("column_name", flat=True)
+    if recognize_empty_columns is None:
+        recognize_empty_columns = state2.organization.column_set.filter(
+            table_name=state2.__class__.__name__, recognize_empty=True, is_extra_data=False
+        ).values_list("column_name", flat=True)
 
     default = state2
     state2_present_columns = None
@@ -213,9 +228,10 @@ def merge_state(merged_state, state1, state2, priorities, ignore_merge_protectio
         else:
             setattr(merged_state, attr, attr_value)
 
-    recognize_empty_ed_columns = state2.organization.column_set.filter(
-        table_name=state2.__class__.__name__, recognize_empty=True, is_extra_data=True
-    ).values_list("column_name", flat=True)
+    if recognize_empty_ed_columns is None:
+        recognize_empty_ed_columns = state2.organization.column_set.filter(
+            table_name=state2.__class__.__name__, recognize_empty=True, is_extra_data=True
+        ).values_list("column_name", flat=True)
 
     merged_state.extra_data = _merge_extra_data(
         state1.extra_data,
@@ -230,7 +246,7 @@ def merge_state(merged_state, state1, state2, priorities, ignore_merge_protectio
     merged_state.raw_access_level_instance = default_ali if default_ali is not None else state2.raw_access_level_instance
 
     # merge measures, scenarios, simulations
-    if isinstance(merged_state, PropertyState):
+    if merge_relationships and isinstance(merged_state, PropertyState):
         PropertyState.merge_relationships(merged_state, state1, state2)
 
     return merged_state
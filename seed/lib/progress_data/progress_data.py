@@ -7,10 +7,14 @@ import logging
 from typing import Union
 
 from seed.decorators import get_prog_key
-from seed.utils.cache import delete_cache, get_cache, set_cache
+from seed.utils.cache import delete_cache, get_cache, increment_cache_raw, set_cache
 
 _log = logging.getLogger(__name__)
 
+# The progress of the steps is accumulated in a separate counter, in millionths of a percent, so
+# that tasks running in parallel can step atomically
+PROGRESS_COUNTER_PRECISION = 1_000_000
+
 
 class ProgressData:
     def __init__(self, func_name, unique_id: Union[str, int], init_data=None):
@@ -20,14 +24,22 @@ class ProgressData:
         self.total: Union[int, None] = None
         self.increment_by = None
 
-        # Load in the initialized data, some of this may be overloaded based
-        # on the contents in the cache
-        self.initialize(init_data)
+        if init_data:
+            # the data was read from the cache (see from_key), so there's no need to save and reload it
+            self._set_data(init_data)
+        else:
+            # Load in the initialized data, some of this may be overloaded based
+            # on the contents in the cache
+            self.initialize()
+
+            # read the data from the cache, if there is any
+            self.load()
 
-        # read the data from the cache, if there is any
-        self.load()
+    @property
+    def progress_counter_key(self):
+        return f"{self.key}:progress"
 
-    def initialize(self, init_data=None):
+    def initialize(self, init_data=None, reset_counter=True):
         if init_data:
             self.data = init_data
         else:
@@ -45,6 +57,15 @@ class ProgressData:
             self.total = None
             self.increment_by = None
 
+        self._set_data(self.data)
+        if reset_counter:
+            delete_cache(self.progress_counter_key)
+
+        return self.save()
+
+    def _set_data(self, data):
+        self.data = data
+
         # set some member variables
         if "progress_key" in self.data:
             self.key = self.data["progress_key"]
@@ -52,8 +73,6 @@ class ProgressData:
         if "total" in self.data:
             self.total = self.data["total"]
 
-        return self.save()
-
     def delete(self):
         """
         Delete the cache and reinitialize
@@ -61,9 +80,28 @@ class ProgressData:
         :return: dict, re-initialized data
         """
         delete_cache(self.key)
+        delete_cache(self.progress_counter_key)
 
         return self.initialize()
 
+    def reset_total(self, total):
+        """
+        Reinitialize the progress towards a new total. Unlike delete, the progress counter is wound
+        back by the progress counted so far rather than deleted, so that a step of an instance loaded
+        before the reset adds its increment instead of restoring the progress saved before the reset.
+        Such instances still step by the old total, so the progress is only meaningful when no other
+        instance steps across the reset, i.e., reload the progress data after changing its total.
+
+        :return: dict, re-initialized data
+        """
+        counted = increment_cache_raw(self.progress_counter_key, 0)
+        increment_cache_raw(self.progress_counter_key, -counted)
+        delete_cache(self.key)
+        self.initialize(reset_counter=False)
+        self.total = total
+
+        return self.save()
+
     def finish_with_success(self, message=None):
         # update to get the latest results out of the cache
         self.load()
@@ -110,9 +148,7 @@ class ProgressData:
         # save some member variables
         self.data["total"] = self.total
 
-        set_cache(self.key, self.data["status"], self.data)
-
-        return get_cache(self.key)
+        return set_cache(self.key, self.data["status"], self.data)
 
     def load(self):
         """Read in the data from the cache"""
@@ -128,17 +164,22 @@ class ProgressData:
             self.total = self.data["total"]
 
     def step(self, status_message=None, new_summary=None):
-        """Step the function by increment_value and save back to the cache"""
-        # load the latest value out of the cache
-        self.load()
+        """Step the function by increment_value and save back to the cache. The progress is
+        incremented atomically, but only saved to the cache when it reaches a new whole percent
+        (or the status message or summary change), so that steps are cheap.
 
-        value = self.data["progress"]
-        if value + self.increment_value() >= 100.0:
-            value = 100.0
-        else:
-            value += self.increment_value()
+        :return: dict, the progress data as of this step
+        """
+        previous_value, value = self._increment_progress()
 
         self.data["progress"] = value
+        if status_message is None and new_summary is None and self._is_saved(previous_value, value, "parsing"):
+            return self.data
+
+        # load the latest value out of the cache
+        self.load()
+
+        self.data["progress"] = max(self.data["progress"], value)
         self.data["status"] = "parsing"
         if status_message is not None:
             self.data["status_message"] = status_message
@@ -146,29 +187,51 @@ class ProgressData:
         if new_summary is not None:
             self.data["summary"] = new_summary
 
-        self.save()
-
-        return self.result()
+        return self.save()
 
     def step_with_counter(self):
-        """Step the function by increment_value and save back to the cache with a count"""
+        """Step the function by increment_value and save back to the cache with a count, see step
+
+        :return: dict, the progress data as of this step
+        """
+        previous_value, value = self._increment_progress()
+
+        self.data["progress"] = value
+        # always save the last record, the progress of the last steps may not reach a new whole percent
+        total_records = self.data.get("total_records")
+        is_last_record = total_records is not None and round(value / 100.0 * total_records) >= total_records
+        if not is_last_record and self._is_saved(previous_value, value, "running"):
+            return self.data
+
         # load the latest value out of the cache
         self.load()
 
-        value = self.data["progress"]
-        if value + self.increment_value() >= 100.0:
-            value = 100.0
-        else:
-            value += self.increment_value()
-
+        value = max(self.data["progress"], value)
         self.data["progress"] = value
         self.data["status"] = "running"
         self.data["completed_records"] = round(value / 100.0 * self.data["total_records"])
         self.data["status_message"] = f"{self.data['completed_records']:,} / {self.data['total_records']:,}"
 
-        self.save()
+        return self.save()
 
-        return self.result()
+    def _increment_progress(self):
+        """
+        Atomically add increment_value to the progress counter, which starts from the saved progress
+
+        :return: tuple(float, float), the progress before and after the increment
+        """
+        increment = round(self.increment_value() * PROGRESS_COUNTER_PRECISION)
+        counter = increment_cache_raw(
+            self.progress_counter_key, increment, initial=round(self.data["progress"] * PROGRESS_COUNTER_PRECISION)
+        )
+        previous_value = min((counter - increment) / PROGRESS_COUNTER_PRECISION, 100.0)
+        value = min(counter / PROGRESS_COUNTER_PRECISION, 100.0)
+        return previous_value, value
+
+    def _is_saved(self, previous_value, value, status):
+        """Whether the cache already has the progress of this step, i.e. it is still within the same
+        whole percent as the previously saved step"""
+        return self.data["status"] == status and int(previous_value) == int(value) and value < 100.0
 
     def result(self):
         """
@@ -94,3 +94,82 @@ class TestProgressData(TestCase):
 
         pd.step(new_summary=4815162342)
         self.assertEqual(pd.summary(), 4815162342)
+
+    def test_steps_are_counted_across_instances(self):
+        pd = ProgressData(func_name="test_func_7", unique_id="qwerty")
+        pd.total = 1000
+        pd.data["total_records"] = 1000
+        pd.save()
+
+        # like parallel tasks, each step is taken by a different instance
+        for _ in range(1000):
+            ProgressData.from_key(pd.key).step_with_counter()
+
+        self.assertEqual(pd.result()["progress"], 100)
+        self.assertEqual(pd.result()["completed_records"], 1000)
+        self.assertEqual(pd.result()["status_message"], "1,000 / 1,000")
+
+    def test_last_record_is_saved(self):
+        pd = ProgressData(func_name="test_func_9", unique_id="zxcvbn")
+        pd.total = 300
+        pd.data["total_records"] = 300
+        pd.save()
+
+        # the steps of a third of a percent round down to just under 100 percent
+        for _ in range(300):
+            ProgressData.from_key(pd.key).step_with_counter()
+
+        self.assertEqual(pd.result()["completed_records"], 300)
+        self.assertEqual(pd.result()["status_message"], "300 / 300")
+
+    def test_reset_total_winds_back_the_progress_counter(self):
+        pd = ProgressData(func_name="test_func_10", unique_id="yuiop")
+        pd.total = 10
+        pd.save()
+        for _ in range(5):
+            pd.step()
+        self.assertEqual(pd.result()["progress"], 50)
+
+        other = ProgressData.from_key(pd.key)
+        pd.reset_total(4)
+        self.assertEqual(pd.result()["progress"], 0)
+        self.assertEqual(pd.result()["total"], 4)
+
+        pd.step()
+        self.assertEqual(pd.result()["progress"], 25)
+
+        # an instance loaded before the reset steps by the old total, without restoring the progress from before the reset
+        other.step()
+        self.assertEqual(pd.result()["progress"], 35)
+
+        # instances loaded after the reset step by the new total
+        ProgressData.from_key(pd.key).step()
+        self.assertEqual(pd.result()["progress"], 60)
+
+    def test_steps_are_saved_once_per_percent(self):
+        pd = ProgressData(func_name="test_func_8", unique_id="asdfgh")
+        pd.total = 1000
+        pd.save()
+
+        # the first step saves the status
+        pd.step()
+        self.assertEqual(pd.result()["status"], "parsing")
+        self.assertEqual(pd.result()["progress"], 0.1)
+
+        for _ in range(8):
+            ProgressData.from_key(pd.key).step()
+        self.assertEqual(pd.result()["progress"], 0.1)
+
+        ProgressData.from_key(pd.key).step()
+        self.assertEqual(pd.result()["progress"], 1)
+
+        # a new status message is always saved
+        ProgressData.from_key(pd.key).step("Stepping")
+        self.assertEqual(pd.result()["progress"], 1.1)
+        self.assertEqual(pd.result()["status_message"], "Stepping")
+
+        # reinitializing resets the progress
+        pd = ProgressData(func_name="test_func_8", unique_id="asdfgh")
+        pd.total = 1000
+        pd.step()
+        self.assertEqual(pd.result()["progress"], 0.1)
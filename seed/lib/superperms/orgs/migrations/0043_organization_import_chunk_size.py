@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orgs", "0042_organizationuser_settings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="import_chunk_size",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
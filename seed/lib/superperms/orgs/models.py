@@ -321,6 +321,10 @@ class Organization(models.Model):
     # 2 Factor Auth
     require_2fa = models.BooleanField(default=False)
 
+    # Number of rows per celery task when importing, mapping and checking data. If null, the chunk
+    # size is computed from the size of the file (see seed.data_importer.utils.get_chunk_size)
+    import_chunk_size = models.PositiveIntegerField(blank=True, null=True)
+
     def save(self, *args, **kwargs):
         """Perform checks before saving."""
         # There can only be one.
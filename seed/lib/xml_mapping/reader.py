@@ -92,3 +92,6 @@ class BuildingSyncParser:
 
     def num_columns(self):
         return 0
+
+    def num_rows(self):
+        return len(self.data)
@@ -0,0 +1,101 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from celery import group
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from seed.celery import app
+from seed.data_importer.models import ImportFile
+from seed.data_importer.tasks import _save_raw_data_chunk
+from seed.lib.mcm import reader
+from seed.lib.mcm.utils import batch
+from seed.lib.progress_data.progress_data import ProgressData
+from seed.models import PropertyState
+
+QUEUE = "benchmark_celery_workers"
+
+# Environment of the benchmark worker for each mode, see SEED_CELERY_WARM_WORKERS in config/settings/common.py
+WORKER_MODES = {
+    "fresh": {"SEED_CELERY_WARM_WORKERS": "false"},
+    "warm": {"SEED_CELERY_WARM_WORKERS": "true"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the raw save step of the import pipeline on a celery worker started in each worker mode: 'fresh', where each "
+        "task runs in a new process, and 'warm', where processes are reused. The states created by the benchmark are deleted. "
+        "Requires the broker and result backend to be running."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--import-file-id", required=True, type=int, help="CSV or XLSX ImportFile to save", dest="import_file_id")
+        parser.add_argument(
+            "--chunk-size", default=100, type=int, help="Number of rows saved by each task", action="store", dest="chunk_size"
+        )
+        parser.add_argument(
+            "--concurrency", default=4, type=int, help="Number of processes of the benchmark worker", action="store", dest="concurrency"
+        )
+        parser.add_argument("--modes", default="fresh,warm", help="Comma separated worker modes to benchmark", action="store", dest="modes")
+        parser.add_argument(
+            "--timeout", default=600, type=int, help="Seconds to wait for the worker and the tasks", action="store", dest="timeout"
+        )
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        for mode in modes:
+            if mode not in WORKER_MODES:
+                raise CommandError(f"Unknown worker mode '{mode}', expected one of {', '.join(WORKER_MODES)}")
+
+        import_file = ImportFile.objects.get(pk=options["import_file_id"])
+        rows = list(reader.MCMParser(import_file.local_file).data)
+        chunks = list(batch(rows, options["chunk_size"]))
+
+        self.stdout.write(f"{len(rows):,} rows in {len(chunks):,} tasks, {options['concurrency']} processes")
+        self.stdout.write(f"{'mode':>8} {'sec':>10} {'tasks/sec':>10}")
+        for mode in modes:
+            elapsed = self._run(mode, import_file, chunks, options["concurrency"], options["timeout"])
+            self.stdout.write(f"{mode:>8} {elapsed:>10.2f} {len(chunks) / elapsed:>10.2f}")
+
+    def _run(self, mode, import_file, chunks, concurrency, timeout):
+        """Start a worker in the mode, save the chunks on it, and return the seconds it took."""
+        node_name = f"{QUEUE}_{mode}@%h"
+        worker = subprocess.Popen(
+            [sys.executable, "-m", "celery", "-A", "seed", "worker", "-l", "WARNING", "-c", str(concurrency), "-Q", QUEUE, "-n", node_name],
+            env={**os.environ, **WORKER_MODES[mode]},
+        )
+        last_state_id = PropertyState.objects.aggregate(Max("id"))["id__max"] or 0
+        try:
+            self._wait_for_worker(worker, node_name.split("@")[0], timeout)
+
+            progress_data = ProgressData(func_name="benchmark_celery_workers", unique_id=import_file.pk)
+            progress_data.total = len(chunks)
+            progress_data.save()
+
+            start = time.perf_counter()
+            tasks = group(_save_raw_data_chunk.s(chunk, import_file.pk, progress_data.key).set(queue=QUEUE) for chunk in chunks)
+            tasks.apply_async().get(timeout=timeout)
+            return time.perf_counter() - start
+        finally:
+            worker.terminate()
+            worker.wait()
+            PropertyState.objects.filter(import_file=import_file, id__gt=last_state_id).delete()
+
+    @staticmethod
+    def _wait_for_worker(worker, name, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if worker.poll() is not None:
+                raise CommandError("The benchmark worker exited before it was ready")
+            replies = app.control.ping(timeout=1)
+            if any(node.startswith(f"{name}@") for reply in replies for node in reply):
+                return
+        raise CommandError("Timed out waiting for the benchmark worker")
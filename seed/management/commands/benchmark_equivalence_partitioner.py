@@ -0,0 +1,88 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from django.core.management.base import BaseCommand
+
+from seed.data_importer.equivalence_partitioner import EquivalencePartitioner
+
+BenchmarkState = namedtuple("BenchmarkState", ["ubid", "pm_property_id", "custom_id_1", "normalized_address"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Times EquivalencePartitioner.calculate_equivalence_classes against the original scanning implementation "
+        "on generated property states and checks that both return the same classes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma separated numbers of states to partition",
+            action="store",
+            dest="sizes",
+        )
+        parser.add_argument(
+            "--duplicate-ratio",
+            default=0.1,
+            type=float,
+            help="Fraction of the states that share an identifier with an earlier state",
+            action="store",
+            dest="duplicate_ratio",
+        )
+        parser.add_argument(
+            "--max-scan-size",
+            default=10000,
+            type=int,
+            help="Largest number of states to run the original implementation on, as it is quadratic",
+            action="store",
+            dest="max_scan_size",
+        )
+        parser.add_argument("--seed", default=0, type=int, help="Random seed for the generated states", action="store", dest="seed")
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        partitioner = EquivalencePartitioner.make_propertystate_equivalence()
+
+        self.stdout.write(f"{'states':>10} {'classes':>10} {'indexed sec':>12} {'scan sec':>12}")
+        for size in [int(size) for size in options["sizes"].split(",")]:
+            states = self._make_states(size, options["duplicate_ratio"])
+
+            start = time.perf_counter()
+            indexed = partitioner.calculate_equivalence_classes(states)
+            indexed_elapsed = time.perf_counter() - start
+
+            scan_elapsed = "skipped"
+            if size <= options["max_scan_size"]:
+                start = time.perf_counter()
+                scanned = partitioner._calculate_equivalence_classes_by_scan(states)
+                scan_elapsed = f"{time.perf_counter() - start:.2f}"
+                if list(indexed.items()) != list(scanned.items()):
+                    self.stderr.write(f"Equivalence classes differ for {size:,} states")
+
+            self.stdout.write(f"{size:>10,} {len(indexed):>10,} {indexed_elapsed:>12.2f} {scan_elapsed:>12}")
+
+    @staticmethod
+    def _make_states(size, duplicate_ratio):
+        """Generate mostly unique states, some of which reuse an identifier of an earlier state."""
+        states = []
+        for i in range(size):
+            if states and random.random() < duplicate_ratio:
+                other = random.choice(states)
+                field = random.choice(BenchmarkState._fields)
+                state = BenchmarkState(None, None, None, f"{i} unique street")._replace(**{field: getattr(other, field)})
+            else:
+                state = BenchmarkState(
+                    f"UBID{i}" if random.random() < 0.5 else None,
+                    str(i) if random.random() < 0.7 else None,
+                    f"custom {i}" if random.random() < 0.3 else None,
+                    f"{i} unique street",
+                )
+            states.append(state)
+        return states
@@ -0,0 +1,136 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+import os
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from seed.data_importer.models import ImportFile, ImportRecord
+from seed.data_importer.tasks import geocode_and_match_buildings_task, map_data, save_raw_data
+from seed.landing.models import SEEDUser as User
+from seed.lib.superperms.orgs.models import Organization
+from seed.models import ASSESSED_RAW, SEED_DATA_SOURCES, Column, ColumnMappingProfile, Cycle
+from seed.utils.cache import get_cache
+
+FINISHED_STATUSES = ("success", "warning", "error")
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a file once per chunk size and reports the time and rows/sec of the save, map and match steps. "
+        "Run against a scratch organization with the celery workers that are being measured; the imported "
+        "records are not removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", required=True, help="CSV or XLSX file to import", action="store", dest="file")
+        parser.add_argument("--org-id", required=True, type=int, help="Organization to import into", action="store", dest="org_id")
+        parser.add_argument("--cycle-id", required=True, type=int, help="Cycle to import into", action="store", dest="cycle_id")
+        parser.add_argument(
+            "--mapping-profile-id",
+            required=True,
+            type=int,
+            help="Column mapping profile to map the file with",
+            action="store",
+            dest="mapping_profile_id",
+        )
+        parser.add_argument("--username", required=True, help="User that owns the import records", action="store", dest="username")
+        parser.add_argument(
+            "--chunk-sizes",
+            default="100,500,1000,2000",
+            help="Comma separated chunk sizes to benchmark, kept within the chunk size bounds of each step, use 'auto' for the computed chunk size",
+            action="store",
+            dest="chunk_sizes",
+        )
+        parser.add_argument("--skip-matching", help="Only benchmark saving and mapping", action="store_true", dest="skip_matching")
+        parser.add_argument(
+            "--timeout", default=3600, type=int, help="Seconds to wait for each step to finish", action="store", dest="timeout"
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options["file"]):
+            raise CommandError(f"File does not exist: {options['file']}")
+
+        org = Organization.objects.get(pk=options["org_id"])
+        cycle = Cycle.objects.get(pk=options["cycle_id"], organization=org)
+        user = User.objects.get(username=options["username"])
+        profile = ColumnMappingProfile.objects.get(pk=options["mapping_profile_id"], organizations=org)
+        chunk_sizes = [None if size.strip() == "auto" else int(size) for size in options["chunk_sizes"].split(",")]
+
+        original_chunk_size = org.import_chunk_size
+        results = []
+        try:
+            for chunk_size in chunk_sizes:
+                # update instead of save to not touch any of the other organization fields
+                Organization.objects.filter(pk=org.pk).update(import_chunk_size=chunk_size)
+                results.append(self._benchmark(chunk_size, org, cycle, user, profile, options))
+        finally:
+            Organization.objects.filter(pk=org.pk).update(import_chunk_size=original_chunk_size)
+
+        self.stdout.write(f"{'chunk size':>12} {'rows':>10} {'step':>18} {'seconds':>10} {'rows/sec':>10}")
+        for chunk_size, num_rows, timings in results:
+            for step, elapsed in timings:
+                rows_per_second = num_rows / elapsed if elapsed else 0
+                self.stdout.write(f"{chunk_size or 'auto':>12} {num_rows:>10,} {step:>18} {elapsed:>10.1f} {rows_per_second:>10,.0f}")
+
+    def _benchmark(self, chunk_size, org, cycle, user, profile, options):
+        self.stdout.write(f"Benchmarking chunk size {chunk_size or 'auto'} ...")
+        import_record = ImportRecord.objects.create(
+            name=f"Benchmark chunk size {chunk_size or 'auto'}",
+            owner=user,
+            last_modified_by=user,
+            super_organization=org,
+            access_level_instance=org.root,
+        )
+        filename = os.path.basename(options["file"])
+        with open(options["file"], "rb") as f:
+            import_file = ImportFile.objects.create(
+                import_record=import_record,
+                cycle=cycle,
+                uploaded_filename=filename,
+                file=File(f, name=filename),
+                source_type=SEED_DATA_SOURCES[ASSESSED_RAW][1],
+            )
+
+        timings = [("save_raw_data", self._run_step(lambda: save_raw_data(import_file.id), options["timeout"]))]
+
+        Column.create_mappings(profile.mappings, org, user, import_file.id)
+        timings.append(("map_data", self._run_step(lambda: map_data(import_file.id), options["timeout"])))
+
+        if not options["skip_matching"]:
+            timings.append(
+                (
+                    "match",
+                    self._run_step(lambda: self._start_matching(import_file.id), options["timeout"]),
+                )
+            )
+
+        timings.append(("total", sum(elapsed for _, elapsed in timings)))
+        import_file.refresh_from_db()
+        return chunk_size, import_file.num_rows or 0, timings
+
+    def _start_matching(self, import_file_id):
+        """Start matching, returns the progress of the matching, or the warning or error when it couldn't start"""
+        result = geocode_and_match_buildings_task(import_file_id)
+        if "progress_data" not in result:
+            return result
+        return result["progress_data"]
+
+    def _run_step(self, start_step, timeout):
+        """Start the step and poll its progress key until it finishes, returns the elapsed seconds"""
+        start = time.time()
+        progress = start_step()
+        while progress.get("status") not in FINISHED_STATUSES:
+            if time.time() - start > timeout:
+                raise CommandError(f"Timed out waiting for {progress.get('progress_key')}")
+            time.sleep(0.5)
+            progress = get_cache(progress["progress_key"])
+
+        if progress["status"] == "error":
+            raise CommandError(f"Step failed: {progress.get('message')}")
+
+        return time.time() - start
@@ -8,7 +8,8 @@ from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.db import connection, transaction
 
-from seed.data_importer.tasks import hash_state_object
+from seed.data_importer.tasks import hash_state_objects
+from seed.lib.mcm.utils import batch
 from seed.models import PropertyState, TaxLotState
 
 
@@ -47,14 +48,12 @@ class Command(BaseCommand):
                     print(f"Re-hashing {table} ({count:,})")
                     cursor.execute(f"PREPARE update_hash (integer, text) AS UPDATE {table} SET hash_object = $2 WHERE id = $1;")  # noqa: S608
                     progress = ProgressLogger(count)
-                    for idx, state in enumerate(state_model.objects.iterator(chunk_size=1_000)):
-                        old_hash = state.hash_object
-                        new_hash = hash_state_object(state)
-
-                        update = new_hash != old_hash
-                        if update:
-                            cursor.execute("EXECUTE update_hash (%s, %s);", (state.id, new_hash))
-                        progress.increment(update)
+                    for states in batch(state_model.objects.iterator(chunk_size=1_000), 1_000):
+                        for state, new_hash in zip(states, hash_state_objects(states)):
+                            update = new_hash != state.hash_object
+                            if update:
+                                cursor.execute("EXECUTE update_hash (%s, %s);", (state.id, new_hash))
+                            progress.increment(update)
 
                     print(f"  {progress.updated:,} {table} hash{'' if progress.updated == 1 else 'es'} updated")
                     cursor.execute("DEALLOCATE update_hash;")
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:00
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orgs", "0043_organization_import_chunk_size"),
+        ("seed", "0246_rename_indices"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataQualityCheckResult",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("run_id", models.IntegerField()),
+                ("state_id", models.IntegerField()),
+                ("table_name", models.CharField(blank=True, max_length=200)),
+                ("result", models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("organization", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="orgs.organization")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["organization", "run_id", "state_id"], name="seed_dataqu_organiz_581730_idx")],
+            },
+        ),
+    ]
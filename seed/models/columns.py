@@ -16,13 +16,14 @@ from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, connection, models, transaction
 from django.db.models import Count, Q
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.utils.translation import gettext_lazy as _
 
 from seed.lib.superperms.orgs.models import Organization as SuperOrganization
 from seed.lib.superperms.orgs.models import OrganizationUser
 from seed.models.column_mappings import ColumnMapping
 from seed.models.models import Unit
+from seed.utils.cache import delete_cache, get_cache_raw, set_cache_raw
 
 INVENTORY_DISPLAY = {
     "PropertyState": "Property",
@@ -32,6 +33,9 @@ INVENTORY_DISPLAY = {
 }
 _log = logging.getLogger(__name__)
 
+# The hashable fields of an inventory type change only when a column's is_excluded_from_hash changes
+HASH_FIELDS_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class ColumnCastError(Exception):
     pass
@@ -879,11 +883,22 @@ class Column(models.Model):
         """
         return Column.cast_column_value(self.data_type, value)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # keep the loaded value to know when the cached hash fields go stale
+        instance._loaded_is_excluded_from_hash = instance.__dict__.get("is_excluded_from_hash")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.column_name and not self.column_description:
             self.column_description = self.column_name
         super().save(*args, **kwargs)
 
+        if getattr(self, "_loaded_is_excluded_from_hash", False) != self.is_excluded_from_hash:
+            Column.clear_hash_fields_cache(self.table_name, self.organization_id)
+            self._loaded_is_excluded_from_hash = self.is_excluded_from_hash
+
     def rename_column(self, new_column_name, force=False):
         """
         Rename the column and move all the data to the new column. This can move the
@@ -1394,6 +1409,22 @@ class Column(models.Model):
 
         return sorted(result)
 
+    @staticmethod
+    def hash_fields_cache_key(table_name, organization_id):
+        return f"hash_fields:{organization_id}:{table_name}"
+
+    @staticmethod
+    def clear_hash_fields_cache(table_name, organization_id):
+        """
+        Remove the cached result of retrieve_db_field_name_for_hash_comparison, for when the columns
+        excluded from the hash change.
+
+        :param table_name: string, PropertyState or TaxLotState
+        :param organization_id: int
+        """
+        if table_name in ("PropertyState", "TaxLotState") and organization_id:
+            delete_cache(Column.hash_fields_cache_key(table_name, organization_id))
+
     @staticmethod
     def retrieve_db_field_name_for_hash_comparison(inventory_type, organization_id):
         """
@@ -1402,8 +1433,18 @@ class Column(models.Model):
         multiple records. Note that this ignores extra_data. The result is a superset of all the fields that are used
         in the database across all of the inventory types of interest.
 
+        The result is cached per organization and inventory type, and cleared when a column's
+        is_excluded_from_hash changes.
+
         :return: list, names of columns, independent of inventory type.
         """
+        cacheable = inventory_type.__name__ in ("PropertyState", "TaxLotState") and organization_id
+        if cacheable:
+            cache_key = Column.hash_fields_cache_key(inventory_type.__name__, organization_id)
+            hash_fields = get_cache_raw(cache_key)
+            if hash_fields is not None:
+                return hash_fields
+
         excluded_columns = (
             list(
                 Column.objects.filter(
@@ -1424,8 +1465,12 @@ class Column(models.Model):
                 and (f.name not in excluded_columns)
             )
         ]
+        hash_fields = sorted(set(filter_fields_names))
+
+        if cacheable:
+            set_cache_raw(cache_key, hash_fields, HASH_FIELDS_CACHE_TIMEOUT)
 
-        return sorted(set(filter_fields_names))
+        return hash_fields
 
     @staticmethod
     def retrieve_db_fields_from_db_tables():
@@ -1729,4 +1774,18 @@ def validate_model(sender, **kwargs):
             raise ValidationError("This display name is an organization access level name.")
 
 
+def clear_hash_fields_cache_on_delete(sender, instance, **kwargs):
+    if instance.is_excluded_from_hash:
+        Column.clear_hash_fields_cache(instance.table_name, instance.organization_id)
+
+
+def clear_hash_fields_cache_on_organization_create(sender, instance, created, **kwargs):
+    # organization ids can be reused, e.g. when the database is recreated, so never trust an existing entry
+    if created:
+        for table_name in ("PropertyState", "TaxLotState"):
+            Column.clear_hash_fields_cache(table_name, instance.id)
+
+
 pre_save.connect(validate_model, sender=Column)
+post_delete.connect(clear_hash_fields_cache_on_delete, sender=Column)
+post_save.connect(clear_hash_fields_cache_on_organization_create, sender=SuperOrganization)
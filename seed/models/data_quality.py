@@ -7,20 +7,21 @@ import json
 import logging
 import re
 from collections import defaultdict
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from random import randint
 
+import numpy as np
 import pytz
-from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import IntegrityError, models
-from django.utils.timezone import get_current_timezone, make_aware, make_naive
+from django.db.models import Q
+from django.utils.timezone import get_current_timezone, make_aware, make_naive, now
 from pint.errors import DimensionalityError
 from quantityfield.units import ureg
 
 from seed.lib.superperms.orgs.models import Organization
 from seed.models import Column, DerivedColumn, GoalNote, PropertyView, PropertyViewLabel, StatusLabel, TaxLotView, obj_to_dict
 from seed.serializers.pint import pretty_units
-from seed.utils.cache import get_cache_raw, set_cache_raw
 from seed.utils.goals import get_area_value, get_eui_value, percentage_difference
 from seed.utils.time_utils import convert_datestr
 
@@ -692,33 +693,34 @@ class DataQualityCheck(models.Model):
         super().__init__(*args, **kwargs)
 
     @staticmethod
-    def initialize_cache(identifier, organization_id):
+    def initialize_results(identifier, organization_id):
         """
-        Initialize the cache for storing the results. This is called before the
-        celery tasks are chunked up.
+        Remove any previous results of the run. This is called before the celery tasks are
+        chunked up. Results from runs that are older than a day are removed as well.
 
-        The cache_key is different than the identifier. The cache_key is where all the results are
-        to be stored for the data quality checks, the identifier, is the random number (or specified
-        value that is used to identifier both the progress and the data storage
+        The identifier is the random number (or specified value, e.g., the import file ID) that
+        is used to identify both the progress and the results of the run.
 
-        :param identifier: Identifier for cache, if None, then creates a random one
-        :return: list, [cache_key and the identifier]
+        :param identifier: Identifier for the run, if None, then creates a random one
+        :param organization_id: int
+        :return: int, the identifier
         """
         if identifier is None:
             identifier = randint(100, 100000)
-        cache_key = DataQualityCheck.cache_key(identifier, organization_id)
-        set_cache_raw(cache_key, [])
-        return cache_key, identifier
+        results = DataQualityCheckResult.objects.filter(organization_id=organization_id)
+        results.filter(Q(run_id=identifier) | Q(created__lt=now() - timedelta(days=1))).delete()
+        return identifier
 
     @staticmethod
-    def cache_key(identifier, organization_id):
+    def retrieve_results(identifier, organization_id):
         """
-        Static method to return the location of the data_quality results from redis.
+        Return the results of a data quality run, ordered by the -State ID.
 
-        :param identifier: Import file primary key
-        :return:
+        :param identifier: Import file primary key or the random identifier of the run
+        :param organization_id: int
+        :return: QuerySet of DataQualityCheckResult
         """
-        return f"data_quality_results__{organization_id}__{identifier}"
+        return DataQualityCheckResult.objects.filter(organization_id=organization_id, run_id=identifier).order_by("state_id", "id")
 
     def check_data(self, record_type, rows):
         """
@@ -742,17 +744,31 @@ class DataQualityCheck(models.Model):
             self.column_lookup[(record_type, derived_column_name)] = derived_column_name
 
         # grab all the rules once, save query time
-        rules = self.rules.filter(enabled=True, table_name=record_type).order_by("field", "severity")
+        rules = self.rules.filter(enabled=True, table_name=record_type).select_related("status_label").order_by("field", "severity")
 
         # Get the list of the field names that will show in every result
         fields = self.get_fieldnames(record_type)
+
+        # load the views and labels of all the rows at once instead of per row and rule
+        rows = list(rows)
+        views_by_state_id = self.get_views_by_state_id(record_type, [row.id for row in rows])
+        label_ids_by_view_id = self.get_label_ids_by_view_id(record_type, [view.id for view in views_by_state_id.values()])
         for row in rows:
             # Initialize the ID if it does not exist yet. Add in the other
             # fields that are of interest to the GUI
-            self.init_result(record_type, row, fields)
+            self.init_result(record_type, row, fields, views_by_state_id)
 
-            # Run the checks
-            self._check(rules, row, derived_columns_by_name)
+        # evaluate each derived column with rules once over all of the rows
+        derived_values_by_name = {}
+        for rule in rules:
+            if rule.for_derived_column and rule.field not in derived_values_by_name:
+                derived_values_by_name[rule.field] = derived_columns_by_name[rule.field].evaluate_many(rows)
+
+        # Run the checks one rule at a time over all of the rows
+        label_changes = {}
+        for rule in rules:
+            self._check(rule, rows, derived_values_by_name, views_by_state_id, label_ids_by_view_id, label_changes)
+        self.save_status_label_changes(record_type, label_changes, label_ids_by_view_id)
 
         # Prune the results will remove any entries that have zero data_quality_results
         self.prune_results()
@@ -780,18 +796,60 @@ class DataQualityCheck(models.Model):
 
         GoalNote.objects.bulk_update(goal_notes_to_update, ["passed_checks"])
 
-    def init_result(self, record_type, row, fields):
+    def init_result(self, record_type, row, fields, views_by_state_id=None):
         # Initialize the ID if it does not exist yet. Add in the other
         # fields that are of interest to the GUI
         if row and row.id not in self.results:
             self.results[row.id] = {}
             for field in fields:
                 self.results[row.id][field] = getattr(row, field)
+            if views_by_state_id is not None:
+                view = views_by_state_id.get(row.id)
+            else:
                 view = row.taxlotview_set.first() if record_type == "TaxLotState" else row.propertyview_set.first()
-                if view:
-                    self.results[row.id]["cycle"] = view.cycle.name
+            if view:
+                self.results[row.id]["cycle"] = view.cycle.name
             self.results[row.id]["data_quality_results"] = []
 
+    @staticmethod
+    def get_views_by_state_id(record_type, state_ids):
+        """
+        Return the first view of each of the states, with the cycle and the organization of the
+        canonical record loaded.
+
+        :param record_type: one of PropertyState | TaxLotState
+        :param state_ids: list of ids
+        :return: dict, {state_id: PropertyView or TaxLotView}
+        """
+        if record_type == "PropertyState":
+            views = PropertyView.objects.filter(state_id__in=state_ids).select_related("cycle", "property__organization__parent_org")
+        else:
+            views = TaxLotView.objects.filter(state_id__in=state_ids).select_related("cycle", "taxlot__organization__parent_org")
+
+        views_by_state_id = {}
+        for view in views.order_by("-id"):
+            views_by_state_id[view.state_id] = view
+        return views_by_state_id
+
+    @staticmethod
+    def get_label_ids_by_view_id(record_type, view_ids):
+        """
+        :param record_type: one of PropertyState | TaxLotState
+        :param view_ids: list of PropertyView or TaxLotView ids
+        :return: dict, {view_id: set of status label ids}
+        """
+        if record_type == "PropertyState":
+            view_labels = PropertyViewLabel.objects.filter(propertyview_id__in=view_ids).values_list("propertyview_id", "statuslabel_id")
+        else:
+            view_labels = TaxLotView.labels.through.objects.filter(taxlotview_id__in=view_ids).values_list(
+                "taxlotview_id", "statuslabel_id"
+            )
+
+        label_ids_by_view_id = defaultdict(set)
+        for view_id, label_id in view_labels:
+            label_ids_by_view_id[view_id].add(label_id)
+        return label_ids_by_view_id
+
     def prune_results(self):
         # prune_results will remove any entries that have zero data_quality_results
         for k, v in self.results.copy().items():
@@ -807,45 +865,27 @@ class DataQualityCheck(models.Model):
     def reset_results(self):
         self.results = {}
 
-    def _check(self, rules, row, derived_columns_by_name):
+    def _check(self, rule, rows, derived_values_by_name, views_by_state_id, label_ids_by_view_id, label_changes):
         """
-        Check for errors in the min/max of the values.
-
-        :param rules: list, rules to run from database objects
-        :param row: PropertyState or TaxLotState, row of data to check
-        :param derived_columns_by_name: dict{str: DerivedColumn}
+        Check a rule against all of the rows. The range checks of numeric values are evaluated
+        for the whole column at once, and the status label changes are collected in label_changes
+        to be saved with save_status_label_changes.
+
+        :param rule: Rule, rule to run
+        :param rows: list, PropertyStates or TaxLotStates to check
+        :param derived_values_by_name: dict{str: list}, values of the rows for each derived column with rules
+        :param views_by_state_id: dict{int: PropertyView or TaxLotView}, from get_views_by_state_id
+        :param label_ids_by_view_id: dict{int: set}, from get_label_ids_by_view_id
+        :param label_changes: dict{(view_id, label_id): bool}, whether to add or remove the label
         :return: None
         """
-        # check if the row has any rules applied to it
-        model_labels = {"linked_id": None, "label_ids": []}
-        if row.__class__.__name__ == "PropertyState":
-            label = apps.get_model("seed", "PropertyViewLabel")
-            if PropertyView.objects.filter(state=row).exists():
-                model_labels["linked_id"] = PropertyView.objects.get(state=row).id
-                model_labels["label_ids"] = list(
-                    label.objects.filter(propertyview_id=model_labels["linked_id"]).values_list("statuslabel_id", flat=True)
-                )
-                # _log.debug("Property {} has {} labels".format(model_labels['linked_id'],
-                #                                               len(model_labels['label_ids'])))
-        elif row.__class__.__name__ == "TaxLotState":
-            label = apps.get_model("seed", "TaxLotView_labels")
-            if TaxLotView.objects.filter(state=row).exists():
-                model_labels["linked_id"] = TaxLotView.objects.get(state=row).id
-                model_labels["label_ids"] = list(
-                    label.objects.filter(taxlotview_id=model_labels["linked_id"]).values_list("statuslabel_id", flat=True)
-                )
-                # _log.debug("TaxLot {} has {} labels".format(model_labels['linked_id'],
-                #                                             len(model_labels['label_ids'])))
-
-        for rule in rules:
+        # get the value of every row, rows that already have a result for the rule are None
+        checked_rows = []
+        values = []
+        for i, row in enumerate(rows):
             value = None
-
-            label_applied = False
-            display_name = rule.field
-
             if rule.for_derived_column:
-                derived_column = derived_columns_by_name[rule.field]
-                value = derived_column.evaluate(inventory_state=row)
+                value = derived_values_by_name[rule.field][i]
             elif hasattr(row, rule.field):
                 value = getattr(row, rule.field)
                 # TODO cleanup after the cleaner is better able to handle fields with units on import
@@ -856,45 +896,55 @@ class DataQualityCheck(models.Model):
                 value = row.extra_data.get(rule.field, None)
 
                 if " (Invalid Footprint)" in rule.field and value is not None:
-                    self.add_invalid_geometry_entry_provided(row.id, rule, display_name, value)
+                    self.add_invalid_geometry_entry_provided(row.id, rule, rule.field, value)
                     continue
 
                 try:
                     value = rule.str_to_data_type(value)
                 except DataQualityTypeCastError:
-                    self.add_result_type_error(row.id, rule, display_name, value)
+                    self.add_result_type_error(row.id, rule, rule.field, value)
                     continue
 
-            # get the display name of the rule
-            if (rule.table_name, rule.field) in self.column_lookup:
-                display_name = self.column_lookup[(rule.table_name, rule.field)]
+            checked_rows.append(row)
+            values.append(value)
 
-            # get the status_labels for the linked properties and tax lots
-            linked_id = model_labels["linked_id"]
+        # get the display name of the rule
+        in_column_lookup = (rule.table_name, rule.field) in self.column_lookup
+        display_name = self.column_lookup.get((rule.table_name, rule.field), rule.field)
 
-            if (rule.table_name, rule.field) not in self.column_lookup:
+        if in_column_lookup and rule.condition == Rule.RULE_RANGE:
+            min_valid, max_valid = self.range_valid(rule, values)
+
+        for i, (row, value) in enumerate(zip(checked_rows, values)):
+            view = views_by_state_id.get(row.id)
+            label_applied = False
+
+            if not in_column_lookup:
                 # If the rule is not in the column lookup, then it may have been a required
                 # field that wasn't mapped
                 if rule.condition == Rule.RULE_REQUIRED:
                     self.add_result_missing_req(row.id, rule, display_name, value)
-                    label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                    label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
             elif value is None or value == "":
                 if rule.condition == Rule.RULE_REQUIRED:
                     self.add_result_missing_and_none(row.id, rule, display_name, value)
-                    label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                    label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
                 elif rule.condition == Rule.RULE_NOT_NULL:
                     self.add_result_is_null(row.id, rule, display_name, value)
-                    label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                    label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
             elif rule.condition in {Rule.RULE_INCLUDE, Rule.RULE_EXCLUDE}:
                 if not rule.valid_text(value):
                     self.add_result_string_error(row.id, rule, display_name, value)
-                    label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                    label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
             elif rule.condition == Rule.RULE_RANGE:
+                row_min_valid, row_max_valid = min_valid[i], max_valid[i]
                 try:
-                    if not rule.minimum_valid(value) and rule.severity in {Rule.SEVERITY_ERROR, Rule.SEVERITY_WARNING}:
+                    if row_min_valid is None:
+                        row_min_valid = rule.minimum_valid(value)
+                    if not row_min_valid and rule.severity in {Rule.SEVERITY_ERROR, Rule.SEVERITY_WARNING}:
                         s_min, s_max, s_value = rule.format_strings(value)
                         self.add_result_min_error(row.id, rule, display_name, s_value, s_min)
-                        label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                        label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
                 except ComparisonError:
                     s_min, s_max, s_value = rule.format_strings(value)
                     self.add_result_comparison_error(row.id, rule, display_name, s_value, s_min)
@@ -908,10 +958,12 @@ class DataQualityCheck(models.Model):
                     continue
 
                 try:
-                    if not rule.maximum_valid(value) and rule.severity in {Rule.SEVERITY_ERROR, Rule.SEVERITY_WARNING}:
+                    if row_max_valid is None:
+                        row_max_valid = rule.maximum_valid(value)
+                    if not row_max_valid and rule.severity in {Rule.SEVERITY_ERROR, Rule.SEVERITY_WARNING}:
                         s_min, s_max, s_value = rule.format_strings(value)
                         self.add_result_max_error(row.id, rule, display_name, s_value, s_max)
-                        label_applied = self.update_status_label(label, rule, linked_id, row.id)
+                        label_applied = self.add_status_label_change(label_changes, rule, view, row.id)
                 except ComparisonError:
                     s_min, s_max, s_value = rule.format_strings(value)
                     self.add_result_comparison_error(row.id, rule, display_name, s_value, s_max)
@@ -925,11 +977,101 @@ class DataQualityCheck(models.Model):
                     continue
 
                 # Check min and max values for valid data:
-                if rule.minimum_valid(value) and rule.maximum_valid(value) and rule.severity == Rule.SEVERITY_VALID:
-                    label_applied = self.update_status_label(label, rule, linked_id, row.id, False)
+                if row_min_valid and row_max_valid and rule.severity == Rule.SEVERITY_VALID:
+                    label_applied = self.add_status_label_change(label_changes, rule, view, row.id, False)
+
+            if not label_applied and view is not None and rule.status_label_id in label_ids_by_view_id[view.id]:
+                label_changes[(view.id, rule.status_label_id)] = False
+
+    @staticmethod
+    def range_valid(rule, values):
+        """
+        Check the minimum and maximum of a range rule against a column of values at once. Only
+        plain int and float values are checked here, the other values (dates, quantities, strings,
+        etc.) are None and need to be checked with Rule.minimum_valid and Rule.maximum_valid.
+
+        :param rule: Rule
+        :param values: list of values
+        :return: (list, list), whether each value is not below the minimum and not above the maximum
+        """
+        min_valid = [None] * len(values)
+        max_valid = [None] * len(values)
+        numeric_indexes = [i for i, value in enumerate(values) if type(value) in {int, float}]
+        if not numeric_indexes:
+            return min_valid, max_valid
+
+        numeric_values = np.array([values[i] for i in numeric_indexes], dtype=float)
+        # Rule.minimum_valid and Rule.maximum_valid truncate the rule's limits when comparing to ints
+        is_int = np.array([type(values[i]) is int for i in numeric_indexes])
+        if rule.min is None:
+            numeric_min_valid = np.ones(len(numeric_indexes), dtype=bool)
+        else:
+            numeric_min_valid = ~(numeric_values < np.where(is_int, np.trunc(rule.min), rule.min))
+        if rule.max is None:
+            numeric_max_valid = np.ones(len(numeric_indexes), dtype=bool)
+        else:
+            numeric_max_valid = ~(numeric_values > np.where(is_int, np.trunc(rule.max), rule.max))
+
+        for i, row_min_valid, row_max_valid in zip(numeric_indexes, numeric_min_valid.tolist(), numeric_max_valid.tolist()):
+            min_valid[i] = row_min_valid
+            max_valid[i] = row_max_valid
+        return min_valid, max_valid
+
+    def add_status_label_change(self, label_changes, rule, view, row_id, add_to_results=True):
+        """
+        Same as update_status_label, but the label is recorded in label_changes instead of being
+        applied so that the labels of many views can be saved at once with save_status_label_changes.
+
+        :param label_changes: dict{(view_id, label_id): bool}
+        :param rule: rule object
+        :param view: PropertyView or TaxLotView, from get_views_by_state_id
+        :param row_id:
+        :param add_to_results: bool
+        :return: boolean, if label will be applied
+        """
+        if rule.status_label_id is not None and view is not None:
+            label_org_id = rule.status_label.super_organization_id
+
+            canonical = view.property if rule.table_name == "PropertyState" else view.taxlot
+            parent_org_id = canonical.organization.get_parent().id
+            if parent_org_id != label_org_id:
+                raise IntegrityError(
+                    f"Label with super_organization_id={label_org_id} cannot be applied to a record with parent "
+                    f"organization_id={parent_org_id}."
+                )
+            label_changes[(view.id, rule.status_label_id)] = True
+
+            if add_to_results:
+                self.results[row_id]["data_quality_results"][-1]["label"] = rule.status_label.name
+
+            return True
 
-            if not label_applied and rule.status_label_id in model_labels["label_ids"]:
-                self.remove_status_label(label, rule, linked_id)
+    @staticmethod
+    def save_status_label_changes(record_type, label_changes, label_ids_by_view_id):
+        """
+        Add and remove the status labels collected by _check in bulk.
+
+        :param record_type: one of PropertyState | TaxLotState
+        :param label_changes: dict{(view_id, label_id): bool}, whether to add or remove the label
+        :param label_ids_by_view_id: dict{int: set}, the labels of the views before the check
+        :return: None
+        """
+        if record_type == "PropertyState":
+            label_class, view_id_col = PropertyViewLabel, "propertyview_id"
+        else:
+            label_class, view_id_col = TaxLotView.labels.through, "taxlotview_id"
+
+        new_labels = []
+        view_ids_by_removed_label_id = defaultdict(list)
+        for (view_id, label_id), add in label_changes.items():
+            if add and label_id not in label_ids_by_view_id[view_id]:
+                new_labels.append(label_class(**{view_id_col: view_id, "statuslabel_id": label_id}))
+            elif not add:
+                view_ids_by_removed_label_id[label_id].append(view_id)
+
+        label_class.objects.bulk_create(new_labels)
+        for label_id, view_ids in view_ids_by_removed_label_id.items():
+            label_class.objects.filter(**{f"{view_id_col}__in": view_ids, "statuslabel_id": label_id}).delete()
 
     def _check_cross_cycle(self, rules, row, goal_notes):
         """
@@ -1025,28 +1167,27 @@ class DataQualityCheck(models.Model):
         elif data_type == "eui":
             return get_eui_value(property_obj[cycle_key], goal)
 
-    def save_to_cache(self, identifier, organization_id):
+    def save_results(self, identifier, organization_id):
         """
-        Save the results to the cache database. The data in the cache are
-        stored as a list of dictionaries. The data in this class are stored as
-        a dict of dict. This is important to remember because the data from the
-        cache cannot be simply loaded into the above structure.
+        Save the results of this chunk of the run. Each chunk adds its own rows, so chunks that
+        run at the same time do not overwrite each other's results.
 
-        :param identifier: Import file primary key
+        :param identifier: Import file primary key or the random identifier of the run
+        :param organization_id: int
         :return: None
         """
-        # change the format of the data in the cache. Make this a list of
-        # objects instead of object of objects.
-        existing_results = get_cache_raw(DataQualityCheck.cache_key(identifier, organization_id)) or []
-
-        results = []
-        for key, value in self.results.items():
-            results.append(value)
-
-        existing_results += results
-
-        z = sorted(existing_results, key=lambda k: k["id"])
-        set_cache_raw(DataQualityCheck.cache_key(identifier, organization_id), z, 86400)  # 24 hours
+        DataQualityCheckResult.objects.bulk_create(
+            [
+                DataQualityCheckResult(
+                    organization_id=organization_id,
+                    run_id=identifier,
+                    state_id=state_id,
+                    table_name=result["data_quality_results"][0]["table_name"],
+                    result=result,
+                )
+                for state_id, result in sorted(self.results.items())
+            ]
+        )
 
     def initialize_rules(self):
         """
@@ -1379,3 +1520,21 @@ class DataQualityCheck(models.Model):
 
     def __str__(self):
         return f"DataQuality ({self.pk}:{self.name}) - Rule Count: {self.rules.count()}"
+
+
+class DataQualityCheckResult(models.Model):
+    """
+    The results of a data quality check run for a single -State, stored in the same format as
+    the entries of DataQualityCheck.results.
+    """
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    # Import file ID or the random identifier of the run
+    run_id = models.IntegerField()
+    state_id = models.IntegerField()
+    table_name = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["organization", "run_id", "state_id"])]
@@ -3,22 +3,32 @@ SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and othe
 See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
-import contextlib
+import hashlib
+import json
 import logging
 
 from django.db import models
-from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models import Avg, BigIntegerField, Case, Count, F, FloatField, Max, Min, Q, Sum, When
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
 from django.http import QueryDict
 
 from seed.lib.superperms.orgs.models import Organization
 from seed.models.columns import Column
 from seed.models.cycles import Cycle
 from seed.models.filter_group import FilterGroup
-from seed.models.properties import PropertyState, PropertyView
+from seed.models.properties import PropertyView
+from seed.utils.cache import get_cache_raw, set_cache_raw
 from seed.utils.search import build_view_filters_and_sorts
 
 logger = logging.getLogger()
 
+AGGREGATIONS = [Avg, Max, Min, Sum, Count]
+# values of extra data that are cast to numbers when aggregating. The digits and exponent are limited so
+# that every match is within the range of a double precision and the cast can't fail the query
+NUMERIC_REGEX = r"^\s*[-+]?(\d{1,200}(\.\d{0,200})?|\.\d{1,200})([eE][-+]?\d{1,2})?\s*$"
+DATA_VIEW_EVALUATION_CACHE_TIMEOUT = 60 * 60
+
 
 class DataView(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -33,13 +43,14 @@ class DataView(models.Model):
     def views_by_filter(self, user_ali):
         filter_group_views = {}
         views_by_filter_group_id = {}
+        columns = Column.retrieve_all(org_id=self.organization_id, inventory_type="property", only_used=False, include_related=False)
         for filter_group in self.filter_groups.all():
             views_by_filter_group_id[filter_group.id] = {}
             filter_group_views[filter_group.id] = {}
             query_dict = QueryDict(mutable=True)
             query_dict.update(filter_group.query_dict)
             for cycle in self.cycles.all():
-                filter_views = self._get_filter_group_views(cycle, query_dict, user_ali)
+                filter_views = self._get_filter_group_views(cycle, query_dict, user_ali, columns)
                 label_views = self._get_label_views(cycle, filter_group, user_ali)
                 views = self._combine_views(filter_views, label_views)
                 filter_group_views[filter_group.id][cycle.id] = views
@@ -91,6 +102,15 @@ class DataView(models.Model):
         #   ]
         # }
 
+        cache_key = self._evaluation_cache_key(columns, user_ali)
+        response = get_cache_raw(cache_key)
+        if response is None:
+            response = self._evaluate(columns, user_ali)
+            set_cache_raw(cache_key, response, DATA_VIEW_EVALUATION_CACHE_TIMEOUT)
+
+        return response
+
+    def _evaluate(self, columns, user_ali):
         response = {
             "meta": {
                 "organization": self.organization.id,
@@ -109,6 +129,14 @@ class DataView(models.Model):
             column_id = column.id
             data[column_id] = {"filter_groups_by_id": {}, "unit": None}
 
+            # aggregate the column for all of the filter groups and cycles at once
+            derived_values = None
+            if column.derived_column:
+                derived_values = self._evaluate_derived_column(column, views_by_filter)
+                aggregations_by_group = self._aggregate_derived_column(derived_values, views_by_filter)
+            else:
+                aggregations_by_group = self._aggregate_column(column, views_by_filter)
+
             for filter_group in self.filter_groups.all():
                 filter_id = filter_group.id
                 data[column_id]["filter_groups_by_id"][filter_id] = {"cycles_by_id": {}}
@@ -117,28 +145,89 @@ class DataView(models.Model):
                     data_cycles = data[column_id]["filter_groups_by_id"][filter_id]["cycles_by_id"]
                     data_cycles[cycle.id] = {}
                     views = views_by_filter[filter_id][cycle.id]
-                    states = PropertyState.objects.filter(propertyview__in=views)
 
-                    for aggregation in [Avg, Max, Min, Sum, Count, "views_by_default_field"]:
+                    for aggregation in [*AGGREGATIONS, "views_by_default_field"]:
                         self._format_aggregation_name(aggregation)
                         self._format_filter_group_data(data_cycles, cycle.id, aggregation)
 
                         if aggregation == "views_by_default_field":
-                            self._assign_views_by_default_field_values(views, data, data_cycles, column, cycle.id, aggregation)
+                            self._assign_views_by_default_field_values(
+                                views, data, data_cycles, column, cycle.id, aggregation, derived_values
+                            )
                         else:
-                            value = self._evaluate_aggregation(states, aggregation, column)
-                            data_cycles[cycle.id][aggregation.name] = value
+                            data_cycles[cycle.id][aggregation.name] = aggregations_by_group[(filter_id, cycle.id)][aggregation.name]
 
-        self._format_graph_data(response, columns, views_by_filter)
+        self._format_graph_data(response, columns)
         return response
 
-    def _format_graph_data(self, response, columns, views_by_filter):
+    def _evaluation_cache_key(self, columns, user_ali):
+        """
+        Key for the cached evaluation of the columns. The key changes when the data view, its
+        filter groups, the columns, or the inventory the user's access level instance can see in the
+        data view's cycles change. Labels and access level instances are fingerprinted by their
+        (view, label) and (view, access level instance) pairs, so moving a label or a property changes
+        the key. States written with update() or bulk_update() without setting updated are only seen
+        when a view's state is replaced, so the evaluation can be stale until DATA_VIEW_EVALUATION_CACHE_TIMEOUT.
+        """
+        cycles = list(self.cycles.all())
+        filter_groups = self.filter_groups.prefetch_related("and_labels", "or_labels", "exclude_labels")
+        inventory = PropertyView.objects.filter(
+            property__organization_id=self.organization_id,
+            cycle__in=cycles,
+            property__access_level_instance__lft__gte=user_ali.lft,
+            property__access_level_instance__rgt__lte=user_ali.rgt,
+        ).aggregate(
+            count=Count("id", distinct=True),
+            max_id=Max("id"),
+            max_state_id=Max("state_id"),
+            states=Sum("state_id"),
+            updated=Max("state__updated"),
+            access_levels=Sum(Cast("id", BigIntegerField()) * F("property__access_level_instance_id")),
+            label_count=Count("labels"),
+            view_labels=Sum(Cast("id", BigIntegerField()) * F("labels__id")),
+        )
+        definition = {
+            "user_ali": user_ali.id,
+            "display_field": self.organization.property_display_field,
+            "cycles": sorted(cycle.id for cycle in cycles),
+            "filter_groups": [
+                [
+                    filter_group.id,
+                    filter_group.query_dict,
+                    sorted(label.id for label in filter_group.and_labels.all()),
+                    sorted(label.id for label in filter_group.or_labels.all()),
+                    sorted(label.id for label in filter_group.exclude_labels.all()),
+                ]
+                for filter_group in filter_groups
+            ],
+            "columns": [
+                [
+                    column.id,
+                    column.column_name,
+                    column.is_extra_data,
+                    column.derived_column.expression if column.derived_column else None,
+                    sorted(
+                        (parameter.parameter_name, parameter.source_column_id)
+                        for parameter in column.derived_column.derivedcolumnparameter_set.all()
+                    )
+                    if column.derived_column
+                    else None,
+                ]
+                for column in columns
+            ],
+            "inventory": inventory,
+        }
+        digest = hashlib.md5(json.dumps(definition, sort_keys=True, default=str).encode("utf-8")).hexdigest()  # noqa: S324
+        return f"data_view_evaluation:{self.id}:{digest}"
+
+    def _format_graph_data(self, response, columns):
         # {filter_group: filter_group.name, column: column.column_name, aggregation: aggregation.name, data: [1,2,3]},
         for filter_group in self.filter_groups.all():
             filter_id = filter_group.id
             filter_name = filter_group.name
             for column in columns:
-                for aggregation in [Avg, Max, Min, Sum, Count]:  # NEED TO ADD 'views_by_label' for scatter plot
+                cycles_by_id = response["columns_by_id"][column.id]["filter_groups_by_id"][filter_id]["cycles_by_id"]
+                for aggregation in AGGREGATIONS:  # NEED TO ADD 'views_by_label' for scatter plot
                     self._format_aggregation_name(aggregation)
                     dataset = {
                         "data": [],
@@ -147,10 +236,7 @@ class DataView(models.Model):
                         "filter_group": filter_name,
                     }
                     for cycle in sorted(self.cycles.all(), key=lambda x: x.name):
-                        views = views_by_filter[filter_id][cycle.id]
-                        states = PropertyState.objects.filter(propertyview__in=views)
-                        value = self._evaluate_aggregation(states, aggregation, column)
-                        dataset["data"].append(value)
+                        dataset["data"].append(cycles_by_id[cycle.id][aggregation.name])
                     response["graph_data"]["datasets"].append(dataset)
 
     def _format_property_display_field(self, view):
@@ -175,6 +261,7 @@ class DataView(models.Model):
         column,
         cycle_id,
         aggregation,
+        derived_values=None,
     ):
         for view in views:
             # Default assignment on first pass
@@ -184,7 +271,7 @@ class DataView(models.Model):
             if column.is_extra_data:
                 state_value = view.state.extra_data.get(column.column_name)
             elif column.derived_column:
-                state_value = column.derived_column.evaluate(view.state)
+                state_value = derived_values[view.state_id] if derived_values is not None else column.derived_column.evaluate(view.state)
             else:
                 state_value = getattr(view.state, column.column_name)
 
@@ -207,43 +294,97 @@ class DataView(models.Model):
         else:
             data_cycles[cycle_id][aggregation.name] = []
 
-    def _evaluate_aggregation(self, states, aggregation, column):
+    def _aggregate_column(self, column, views_by_filter):
+        """
+        Aggregate a canonical or extra data column for every filter group and cycle in one query,
+        grouped by cycle with a filtered aggregate per filter group. Extra data values are cast to
+        numbers in the query, and values that aren't numeric are ignored.
+
+        :return: dict{(filter_group_id, cycle_id): {aggregation name: value}}
+        """
         if column.is_extra_data:
-            return self._evaluate_extra_data(states, aggregation, column)
-        elif column.derived_column:
-            return self._evaluate_derived_column(states, aggregation, column)
+            expression = Case(
+                When(
+                    **{f"state__extra_data__{column.column_name}__regex": NUMERIC_REGEX},
+                    then=Cast(KeyTextTransform(column.column_name, "state__extra_data"), output_field=FloatField()),
+                ),
+                default=None,
+                output_field=FloatField(),
+            )
         else:
-            aggregation = states.aggregate(value=aggregation(column.column_name))
-
-            if aggregation.get("value") or aggregation.get("value") == 0:
-                value = aggregation["value"]
-                if isinstance(value, (float, int)):
-                    return round(value, 2)
-                return round(value.m, 2)
-
-    def _evaluate_extra_data(self, states, aggregation, column):
-        extra_data_col = "extra_data__" + column.column_name
-        q_set = states.annotate(data=F(extra_data_col)).values("data")
-        values = []
-        for val in list(q_set):
-            with contextlib.suppress(ValueError, TypeError):
-                values.append(float(val["data"]))
-        if values:
-            type_to_aggregate = {Avg: sum(values) / len(values), Count: len(values), Max: max(values), Min: min(values), Sum: sum(values)}
-            return round(type_to_aggregate[aggregation], 2)
-
-    def _evaluate_derived_column(self, states, aggregation, column):
-        # to evaluate a derived_column: DerivedColumn.evaluate(propertyState)
-        values = []
-
-        for state in states:
-            val = column.derived_column.evaluate(state)
-            if val is not None:
-                values.append(val)
-
-        if values:
-            type_to_aggregate = {Avg: sum(values) / len(values), Count: len(values), Max: max(values), Min: min(values), Sum: sum(values)}
-            return round(type_to_aggregate[aggregation], 2)
+            expression = F(f"state__{column.column_name}")
+
+        annotations = {}
+        view_ids = set()
+        for filter_id, views_by_cycle in views_by_filter.items():
+            filter_view_ids = [view.id for views in views_by_cycle.values() for view in views]
+            if not filter_view_ids:
+                continue
+            view_ids.update(filter_view_ids)
+            for aggregation in AGGREGATIONS:
+                self._format_aggregation_name(aggregation)
+                annotations[f"{aggregation.name}_{filter_id}"] = aggregation(expression, filter=Q(id__in=filter_view_ids))
+
+        rows_by_cycle_id = {}
+        if view_ids:
+            rows = PropertyView.objects.filter(id__in=view_ids).values("cycle_id").annotate(**annotations).order_by()
+            rows_by_cycle_id = {row["cycle_id"]: row for row in rows}
+
+        aggregations_by_group = {}
+        for filter_id, views_by_cycle in views_by_filter.items():
+            for cycle_id in views_by_cycle:
+                row = rows_by_cycle_id.get(cycle_id, {})
+                values = {aggregation.name: row.get(f"{aggregation.name}_{filter_id}") for aggregation in AGGREGATIONS}
+                if not values["Count"]:
+                    values["Count"] = 0
+
+                if column.is_extra_data and values["Count"] == 0:
+                    # like derived columns, there are no aggregations without numeric values
+                    aggregations_by_group[(filter_id, cycle_id)] = dict.fromkeys(values)
+                else:
+                    aggregations_by_group[(filter_id, cycle_id)] = {name: self._round_value(value) for name, value in values.items()}
+
+        return aggregations_by_group
+
+    def _evaluate_derived_column(self, column, views_by_filter):
+        """
+        Evaluate a derived column for the states of all of the filter groups and cycles at once
+
+        :return: dict{state_id: float | None}
+        """
+        states_by_id = {
+            view.state_id: view.state for views_by_cycle in views_by_filter.values() for views in views_by_cycle.values() for view in views
+        }
+        states = list(states_by_id.values())
+        return dict(zip(states_by_id.keys(), column.derived_column.evaluate_many(states)))
+
+    def _aggregate_derived_column(self, derived_values, views_by_filter):
+        """
+        :return: dict{(filter_group_id, cycle_id): {aggregation name: value}}
+        """
+        aggregations_by_group = {}
+        for filter_id, views_by_cycle in views_by_filter.items():
+            for cycle_id, views in views_by_cycle.items():
+                values = [derived_values[state_id] for state_id in {view.state_id for view in views}]
+                values = [value for value in values if value is not None]
+                aggregations_by_group[(filter_id, cycle_id)] = self._aggregate_values(values)
+
+        return aggregations_by_group
+
+    def _aggregate_values(self, values):
+        for aggregation in AGGREGATIONS:
+            self._format_aggregation_name(aggregation)
+        if not values:
+            return {aggregation.name: None for aggregation in AGGREGATIONS}
+
+        type_to_aggregate = {Avg: sum(values) / len(values), Count: len(values), Max: max(values), Min: min(values), Sum: sum(values)}
+        return {aggregation.name: round(type_to_aggregate[aggregation], 2) for aggregation in AGGREGATIONS}
+
+    def _round_value(self, value):
+        if value or value == 0:
+            if isinstance(value, (float, int)):
+                return round(value, 2)
+            return round(value.m, 2)
 
     def _combine_views(self, filter_views, label_views):
         if label_views or label_views == []:
@@ -277,9 +418,10 @@ class DataView(models.Model):
             views = views.exclude(labels__in=exclude_labels)
         return list(views)
 
-    def _get_filter_group_views(self, cycle, query_dict, user_ali):
+    def _get_filter_group_views(self, cycle, query_dict, user_ali, columns=None):
         org_id = self.organization.id
-        columns = Column.retrieve_all(org_id=org_id, inventory_type="property", only_used=False, include_related=False)
+        if columns is None:
+            columns = Column.retrieve_all(org_id=org_id, inventory_type="property", only_used=False, include_related=False)
         annotations = {}
         try:
             filters, annotations, order_by = build_view_filters_and_sorts(query_dict, columns, "property")
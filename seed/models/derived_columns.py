@@ -6,8 +6,10 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 from __future__ import annotations
 
 import copy
+import functools
 from typing import Any
 
+import numpy as np
 from django.core.exceptions import ValidationError
 from django.db import models
 from lark import Lark, Transformer, v_args
@@ -20,6 +22,25 @@ from seed.models.properties import PropertyState
 from seed.models.tax_lots import TaxLotState
 
 
+def _cast_param_to_float(value: Any) -> float | None:
+    """Helper to turn a value into a float, or None if non-numeric
+
+    :param value: <value>
+    :return: float | None
+    """
+    # handle booleans as special case b/c float(True) == 1.0 which we don't want
+    if isinstance(value, bool):
+        return None
+
+    if isinstance(value, ureg.Quantity):
+        value = value.magnitude
+
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
 def _cast_params_to_floats(params: dict[str, Any]) -> dict[str, float]:
     """Helper to turn dict values to floats or remove them if non-numeric
 
@@ -28,19 +49,14 @@ def _cast_params_to_floats(params: dict[str, Any]) -> dict[str, float]:
     """
     tmp_params = {}
     for key, value in params.items():
-        # handle booleans as special case b/c float(True) == 1.0 which we don't want
-        if isinstance(value, bool):
-            continue
+        float_value = _cast_param_to_float(value)
+        if float_value is not None:
+            tmp_params[key] = float_value
+    return tmp_params
 
-        updated_value = value
-        if isinstance(value, ureg.Quantity):
-            updated_value = value.magnitude
 
-        try:
-            tmp_params[key] = float(updated_value)
-        except (ValueError, TypeError):
-            continue
-    return tmp_params
+def _nan_where(condition, values):
+    return np.where(condition, np.nan, values)
 
 
 class ExpressionEvaluator:
@@ -109,6 +125,73 @@ class ExpressionEvaluator:
             """
             self.params = params
 
+    @v_args(inline=True)
+    class CompileTree(Transformer):
+        """Transforms expression tree into a function of a dict of NumPy arrays, one value per
+        row for each parameter, which evaluates the expression for all rows at once. Rows that
+        can't be evaluated (e.g., division by zero) are NaN. NumPy floating point warnings should
+        be ignored while calling the function, see ExpressionEvaluator.evaluate_many.
+        Should be used with the expression grammar above
+        """
+
+        def number(self, value):
+            value = np.float64(value)
+            return lambda _: value
+
+        def param(self, name):
+            name = str(name)
+
+            def get_param(params):
+                try:
+                    return params[name]
+                except KeyError:
+                    raise KeyError(f"Parameter not found: {name}")
+
+            return get_param
+
+        def add(self, a, b):
+            return lambda params: a(params) + b(params)
+
+        def sub(self, a, b):
+            return lambda params: a(params) - b(params)
+
+        def mul(self, a, b):
+            return lambda params: a(params) * b(params)
+
+        def div(self, a, b):
+            def divide(params):
+                denominator = b(params)
+                return _nan_where(denominator == 0, a(params) / denominator)
+
+            return divide
+
+        def mod(self, a, b):
+            def modulo(params):
+                denominator = b(params)
+                return _nan_where(denominator == 0, np.mod(a(params), denominator))
+
+            return modulo
+
+        def neg(self, a):
+            return lambda params: -a(params)
+
+        def pow(self, a, b):
+            def power(params):
+                base, exponent = a(params), b(params)
+                # zero to a negative power is a division by zero. A negative base to a fractional power is NaN.
+                return _nan_where((base == 0) & (exponent < 0), np.power(base, exponent))
+
+            return power
+
+        def abs(self, a):
+            return lambda params: np.abs(a(params))
+
+        def min(self, *args):
+            return lambda params: functools.reduce(np.minimum, [arg(params) for arg in args])
+
+        def max(self, *args):
+            return lambda params: functools.reduce(np.maximum, [arg(params) for arg in args])
+
     def __init__(self, expression: str, validate: bool = True):
         """Construct an expression evaluator.
 
@@ -148,6 +231,33 @@ class ExpressionEvaluator:
         self._transformer.set_params(parameters)
         return self._parser.parse(self._expression)  # type: ignore[return-value]
 
+    def evaluate_many(self, parameters: dict[str, np.ndarray], size: int) -> np.ndarray:
+        """Evaluate the expression for many rows of parameters at once. The expression is
+        compiled the first time and reused for later calls.
+
+        :param parameters: dict, keys are parameter names and values are arrays of floats, one
+            per row, with NaN where a row doesn't have the parameter
+        :param size: int, number of rows
+        :return: np.ndarray, floats, with NaN where the expression couldn't be evaluated
+        """
+        if not hasattr(self, "_compiled"):
+            tree = Lark(self.EXPRESSION_GRAMMAR, parser="lalr").parse(self._expression)
+            self._compiled_parameter_names = {str(node.children[0]) for node in tree.find_data("param")}
+            self._compiled = self.CompileTree().transform(tree)
+
+        if any(name not in parameters for name in self._compiled_parameter_names):
+            return np.full(size, np.nan)
+
+        with np.errstate(all="ignore"):
+            result = np.array(np.broadcast_to(self._compiled(parameters), (size,)), dtype=float)
+
+        # rows missing a parameter have no result, even if NaN didn't propagate (e.g., NaN ** 0 == 1)
+        for name in self._compiled_parameter_names:
+            result[np.isnan(parameters[name])] = np.nan
+        result[~np.isfinite(result)] = np.nan
+
+        return result
+
 
 class InvalidExpressionError(Exception):
     """Raised when parsing an expression"""
@@ -250,22 +360,29 @@ class DerivedColumn(models.Model):
                 ...
             }
         """
-        if not hasattr(self, "_cached_column_parameters"):
-            self._cached_column_parameters = DerivedColumnParameter.objects.filter(derived_column=self.id).prefetch_related("source_column")
-
         params = {}
-        for parameter in self._cached_column_parameters:
-            source_column_name = parameter.source_column.column_name
-            value = None
+        for parameter in self._get_column_parameters():
+            params[parameter.parameter_name] = self._get_source_value(inventory_state, parameter.source_column.column_name)
 
-            if hasattr(inventory_state, source_column_name):
-                value = getattr(inventory_state, source_column_name)
-            else:
-                value = inventory_state.extra_data.get(source_column_name)
+        return params
 
-            params[parameter.parameter_name] = value
+    def _get_column_parameters(self):
+        if not hasattr(self, "_cached_column_parameters"):
+            self._cached_column_parameters = list(
+                DerivedColumnParameter.objects.filter(derived_column=self.id).select_related("source_column__derived_column")
+            )
+        return self._cached_column_parameters
 
-        return params
+    def _get_evaluator(self):
+        if not hasattr(self, "_cached_evaluator"):
+            self._cached_evaluator = ExpressionEvaluator(self.expression)
+        return self._cached_evaluator
+
+    @staticmethod
+    def _get_source_value(inventory_state, source_column_name):
+        if hasattr(inventory_state, source_column_name):
+            return getattr(inventory_state, source_column_name)
+        return inventory_state.extra_data.get(source_column_name)
 
     def evaluate(self, inventory_state: None | PropertyState | TaxLotState = None, parameters: None | dict[str, float] = None):
         """Evaluate the expression. Caller must provide `parameters`, `inventory_state`,
@@ -276,6 +393,8 @@ class DerivedColumn(models.Model):
         If the expression can't be evaluated due to invalid/missing parameters or
         a ZeroDivisionError occurs, this method returns None.
 
+        To evaluate the expression for many states, use evaluate_many.
+
         WARNING: this method caches parts of the model. If the instance or linked
         sources are updated you must re-query to reset the cache.
 
@@ -283,19 +402,10 @@ class DerivedColumn(models.Model):
         :param parameters: dict, optional, defines mapping of expression parameter names to values
         :return: float | None
         """
-        if not hasattr(self, "_cached_evaluator"):
-            self._cached_evaluator = ExpressionEvaluator(self.expression)
-
-        if parameters is None:
-            parameters = {}
-
-        inventory_parameters = {}
+        merged_parameters = copy.copy(parameters) if parameters is not None else {}
         if inventory_state is not None:
-            tmp_params = self.get_parameter_values(inventory_state)
-            inventory_parameters = _cast_params_to_floats(tmp_params)
-
-        merged_parameters = copy.copy(parameters)
-        merged_parameters.update(inventory_parameters)
+            # values from the inventory which aren't numeric don't replace the provided parameters
+            merged_parameters.update(_cast_params_to_floats(self.get_parameter_values(inventory_state)))
         merged_parameters = _cast_params_to_floats(merged_parameters)
 
         # determine if any source columns are derived_columns
@@ -305,7 +415,7 @@ class DerivedColumn(models.Model):
             return None
 
         try:
-            return self._cached_evaluator.evaluate(merged_parameters)
+            return self._get_evaluator().evaluate(merged_parameters)
         except KeyError:
             # was missing one or more parameters
             return None
@@ -323,14 +433,104 @@ class DerivedColumn(models.Model):
             )
 
     def check_for_source_columns_derived(self, inventory_state=None, merged_parameters={}):
-        dcps = self.derivedcolumnparameter_set.all()
-        for dcp in dcps:
+        for dcp in self._get_column_parameters():
             column = dcp.source_column
             if column.derived_column:
                 dc = column.derived_column
                 val = dc.evaluate(inventory_state)
                 merged_parameters[dcp.parameter_name] = val
 
+    def get_evaluation_order(self) -> list[DerivedColumn]:
+        """Return the derived columns this one depends on, directly or through other derived
+        columns, followed by this one, such that each derived column comes after its sources.
+
+        :return: list[DerivedColumn]
+        """
+        if hasattr(self, "_cached_evaluation_order"):
+            return self._cached_evaluation_order
+
+        # load the parameters of all of the organization's derived columns at once
+        derived_columns = {self.id: self}
+        parameters_by_derived_column_id = {}
+        for parameter in DerivedColumnParameter.objects.filter(derived_column__organization_id=self.organization_id).select_related(
+            "source_column__derived_column"
+        ):
+            parameters_by_derived_column_id.setdefault(parameter.derived_column_id, []).append(parameter)
+            source_derived_column = parameter.source_column.derived_column
+            if source_derived_column is not None and source_derived_column.id not in derived_columns:
+                derived_columns[source_derived_column.id] = source_derived_column
+
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(derived_column):
+            if derived_column.id in visited:
+                return
+            if derived_column.id in visiting:
+                raise ValueError(f"Derived column {self.name} depends on itself through {derived_column.name}")
+            visiting.add(derived_column.id)
+            parameters = parameters_by_derived_column_id.get(derived_column.id, [])
+            derived_column._cached_column_parameters = parameters
+            for parameter in parameters:
+                if parameter.source_column.derived_column_id is not None:
+                    visit(derived_columns[parameter.source_column.derived_column_id])
+            visiting.remove(derived_column.id)
+            visited.add(derived_column.id)
+            order.append(derived_column)
+
+        visit(self)
+        self._cached_evaluation_order = order
+
+        return order
+
+    def evaluate_many(self, inventory_states: list[PropertyState | TaxLotState]) -> list[float | None]:
+        """Evaluate the expression for many states at once, with the same results as calling
+        evaluate on each state. The expression is evaluated over arrays of the parameter values
+        of all the states, and nested derived columns are evaluated once for all the states,
+        before the derived columns that use them.
+
+        WARNING: this method caches parts of the model. If the instance or linked
+        sources are updated you must re-query to reset the cache.
+
+        :param inventory_states: list, PropertyStates | TaxLotStates
+        :return: list, float | None for each state
+        """
+        inventory_states = list(inventory_states)
+        results: dict[int, np.ndarray] = {}
+        for derived_column in self.get_evaluation_order():
+            results[derived_column.id] = derived_column._evaluate_array(inventory_states, results)
+
+        return [None if np.isnan(value) else float(value) for value in results[self.id]]
+
+    def _evaluate_array(self, inventory_states, derived_results):
+        """Evaluate the expression for the states, given the results of the derived columns it depends on
+
+        :param inventory_states: list, PropertyStates | TaxLotStates
+        :param derived_results: dict{int: np.ndarray}, results of other derived columns by id
+        :return: np.ndarray, NaN where there is no result
+        """
+        size = len(inventory_states)
+        parameters = {}
+        has_missing_source = np.zeros(size, dtype=bool)
+        for parameter in self._get_column_parameters():
+            source_column = parameter.source_column
+            if source_column.derived_column_id is not None:
+                values = derived_results[source_column.derived_column_id]
+                # like evaluate, there is no result when any derived source column has no result
+                has_missing_source |= np.isnan(values)
+            else:
+                values = np.array(
+                    [_cast_param_to_float(self._get_source_value(state, source_column.column_name)) for state in inventory_states],
+                    dtype=float,
+                )
+            parameters[parameter.parameter_name] = values
+
+        result = self._get_evaluator().evaluate_many(parameters, size)
+        result[has_missing_source] = np.nan
+
+        return result
+
 
 class DerivedColumnParameter(models.Model):
     """
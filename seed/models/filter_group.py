@@ -32,7 +32,7 @@ class FilterGroup(models.Model):
             related_model = "taxlot"
             ViewClass = TaxLotView
 
-        if not views:
+        if views is None:
             views = ViewClass.objects.select_related(related_model, "state").filter(
                 **{f"{related_model}__organization_id": self.organization_id}
             )
@@ -35,6 +35,7 @@ from seed.models.models import (
 from seed.models.tax_lot_properties import TaxLotProperty
 from seed.utils.address import normalize_address_str
 from seed.utils.generic import compare_orgs_between_label_and_target, obj_to_dict, split_model_fields
+from seed.utils.geocode import sync_long_lat
 from seed.utils.time_utils import convert_datestr, convert_to_js_timestamp
 from seed.utils.ubid import generate_ubidmodels_for_state
 
@@ -999,28 +1000,7 @@ def sync_latitude_longitude_and_long_lat(sender, instance, **kwargs):
         pass  # Occurs on object creation
     else:
         # Sync Latitude, Longitude, and long_lat fields if applicable
-        latitude_change = original_obj.latitude != instance.latitude
-        longitude_change = original_obj.longitude != instance.longitude
-        long_lat_change = original_obj.long_lat != instance.long_lat
-        lat_and_long_both_populated = instance.latitude is not None and instance.longitude is not None
-        # The 'not long_lat_change' condition removes the case when long_lat is changed by an external API,
-        # so the first block below is when a user manually changes the lat/long and the geocoding confidence
-        # needs to be updated to "manually" (or keep as Census Geocoder)
-        if (latitude_change or longitude_change) and lat_and_long_both_populated and not long_lat_change:
-            instance.long_lat = f"POINT ({instance.longitude} {instance.latitude})"
-            # keep Census Geocoder confidence if newly present in the string
-            if instance is not None and instance.geocoding_confidence is not None:
-                if "Census Geocoder" in instance.geocoding_confidence and "Census Geocoder" not in original_obj.geocoding_confidence:
-                    instance.geocoding_confidence = instance.geocoding_confidence
-                else:
-                    instance.geocoding_confidence = "Manually geocoded (N/A)"
-            else:
-                # If we are here, then we are manually geocoding the property
-                instance.geocoding_confidence = "Manually geocoded (N/A)"
-
-        elif (latitude_change or longitude_change) and not lat_and_long_both_populated:
-            instance.long_lat = None
-            instance.geocoding_confidence = None
+        sync_long_lat(instance, original_obj)
 
 
 m2m_changed.connect(compare_orgs_between_label_and_target, sender=PropertyView.labels.through)
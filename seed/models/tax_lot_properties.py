@@ -16,7 +16,7 @@ from django.contrib.gis.db.models import GeometryField
 from django.contrib.gis.geos import GEOSGeometry
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, prefetch_related_objects
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.utils.timezone import make_naive
@@ -169,6 +169,7 @@ class TaxLotProperty(models.Model):
         """
         if len(object_list) == 0:
             return []
+        object_list = list(object_list)
 
         if object_list[0].__class__.__name__ == "PropertyView":
             this_cls, this_lower = "Property", "property"
@@ -199,6 +200,11 @@ class TaxLotProperty(models.Model):
         }
 
         ids = [obj.pk for obj in object_list]
+        obj_ids = [getattr(obj, lookups["obj_id"]) for obj in object_list]
+
+        # load the states and properties/taxlots of any views that were not fetched with select_related, this is a
+        # no-op for the views that were
+        prefetch_related_objects(object_list, "state", this_lower)
 
         # getting these at the top keeps us querying for any ali more once, and allows us to query for them all at once.
         if this_cls == "Property":
@@ -229,7 +235,7 @@ class TaxLotProperty(models.Model):
 
         # determine merge statuses
         states_qs = lookups["view_class"].objects.filter(id__in=ids)
-        merged_state_ids = (
+        merged_state_ids = set(
             lookups["audit_log_class"]
             .objects.filter(
                 name__in=["Manual Match", "System Match", "Merge current state in migration"],
@@ -238,6 +244,37 @@ class TaxLotProperty(models.Model):
             .values_list("state_id", flat=True)
         )
 
+        # gather group memberships
+        InventoryGroupMapping = apps.get_model("seed", "InventoryGroupMapping")
+        obj_ids_in_groups = set(
+            InventoryGroupMapping.objects.filter(**{f"{this_lower}_id__in": obj_ids}).values_list(f"{this_lower}_id", flat=True)
+        )
+
+        # gather non goal label ids
+        if this_cls == "Property":
+            view_labels = (
+                apps.get_model("seed", "PropertyViewLabel")
+                .objects.filter(propertyview_id__in=ids, goal__isnull=True)
+                .values_list("propertyview_id", "statuslabel_id")
+            )
+        else:
+            view_labels = (
+                lookups["view_class"].labels.through.objects.filter(taxlotview_id__in=ids).values_list("taxlotview_id", "statuslabel_id")
+            )
+        label_ids_by_view_id = defaultdict(list)
+        for view_id, label_id in view_labels.order_by("id"):
+            label_ids_by_view_id[view_id].append(label_id)
+
+        # gather goal notes, keeping the first note of each property
+        if goal_id:
+            goal_notes_by_property_id = {}
+            for goal_note in apps.get_model("seed", "GoalNote").objects.filter(goal=goal_id, property_id__in=obj_ids).order_by("-id"):
+                goal_notes_by_property_id[goal_note.property_id] = goal_note
+            historical_notes_by_property_id = {
+                historical_note.property_id: historical_note
+                for historical_note in apps.get_model("seed", "HistoricalNote").objects.filter(property_id__in=obj_ids)
+            }
+
         # gather all columns - separate the 'related' columns
         related_columns = []
         obj_columns = []
@@ -304,10 +341,9 @@ class TaxLotProperty(models.Model):
             if this_cls == "Property":
                 obj_dict.update(ali_path_by_id[obj.property.access_level_instance_id])
                 obj_dict["meters_exist_indicator"] = obj_meter_counts.get(obj.property_id, 0) > 0
-                obj_dict["groups_indicator"] = obj.property.group_mappings.count() > 0
             else:
                 obj_dict.update(ali_path_by_id[obj.taxlot.access_level_instance_id])
-                obj_dict["groups_indicator"] = obj.taxlot.group_mappings.count() > 0
+            obj_dict["groups_indicator"] = getattr(obj, lookups["obj_id"]) in obj_ids_in_groups
 
             # bring in GIS data
             obj_dict[lookups["bounding_box"]] = bounding_box_wkt(obj.state)
@@ -330,15 +366,13 @@ class TaxLotProperty(models.Model):
 
             # add goal note data
             if goal_id:
-                goal_note = obj.property.goalnote_set.filter(goal=goal_id).first()
+                goal_note = goal_notes_by_property_id.get(obj.property_id)
                 obj_dict["goal_note"] = goal_note.serialize() if goal_note else None
-                obj_dict["historical_note"] = obj.property.historical_note.serialize()
+                historical_note = historical_notes_by_property_id.get(obj.property_id)
+                obj_dict["historical_note"] = historical_note.serialize() if historical_note else None
 
             # add non goal label ids
-            if this_cls == "Property":
-                obj_dict["labels"] = list(obj.propertyviewlabel_set.filter(goal__isnull=True).values_list("statuslabel_id", flat=True))
-            else:
-                obj_dict["labels"] = list(obj.labels.values_list("id", flat=True))
+            obj_dict["labels"] = label_ids_by_view_id.get(obj.id, [])
 
             results.append(obj_dict)
 
@@ -422,9 +456,11 @@ class TaxLotProperty(models.Model):
 
         # Not sure what this code is really doing, but it only exists for TaxLotViews
         if lookups["obj_class"] == "TaxLotView":
-            # Get whole taxlotstate table:
+            # Get the taxlot states of the related properties
             tuple_prop_to_jurisdiction_tl = tuple(
-                TaxLotProperty.objects.values_list("property_view_id", "taxlot_view__state__jurisdiction_tax_lot_id")
+                TaxLotProperty.objects.filter(property_view_id__in=related_ids).values_list(
+                    "property_view_id", "taxlot_view__state__jurisdiction_tax_lot_id"
+                )
             )
 
             # create a mapping that defaults to an empty list
@@ -445,7 +481,7 @@ class TaxLotProperty(models.Model):
 
         # Get merged_indicators for related
         join_states_qs = lookups["related_view_class"].objects.filter(id__in=related_ids)
-        join_merged_state_ids = (
+        join_merged_state_ids = set(
             lookups["related_audit_log_class"]
             .objects.filter(
                 name__in=["Manual Match", "System Match", "Merge current state in migration"],
@@ -9,6 +9,7 @@ that's where the display preference lives.
 """
 
 import re
+from functools import lru_cache
 
 from django.core.serializers.json import DjangoJSONEncoder
 from quantityfield.units import ureg
@@ -56,39 +57,84 @@ def get_dimensionality(quantity_object):
     return str(quantity_object.dimensionality)
 
 
-def collapse_unit(org, x):
+class UnitConversionPlan:
+    """
+    Conversion of Quantity objects to the display units and decimal places of
+    an organization. The multiplier from each unit to its display unit is
+    computed with pint the first time the unit is seen, after which collapsing
+    a value is a float multiplication and a round.
+    """
+
+    def __init__(self, display_units, decimal_places):
+        # make extensible / field name agnostic by just branching on the dimensionality
+        # and not the field name (e.g., 'gross_floor_area') ... the dimensionality gets
+        # enforced separately by the django pint column type
+        self.display_units = display_units
+        self.decimal_places = decimal_places
+        self._multipliers = {}
+
+    def multiplier(self, units):
+        try:
+            return self._multipliers[units]
+        except KeyError:
+            quantity = ureg.Quantity(1, units)
+            # default to quantity's units if not found
+            display_units = self.display_units.get(get_dimensionality(quantity))
+            multiplier = quantity.to(display_units).magnitude if display_units else 1.0
+            self._multipliers[units] = multiplier
+            return multiplier
+
+    def convert(self, quantity):
+        magnitude = quantity.magnitude
+        multiplier = self.multiplier(quantity.units)
+        if multiplier != 1:
+            magnitude = magnitude * multiplier
+        return round(magnitude, self.decimal_places)
+
+
+@lru_cache(maxsize=128)
+def _unit_conversion_plan(display_units, decimal_places):
+    return UnitConversionPlan(dict(display_units), decimal_places)
+
+
+def get_unit_conversion_plan(org):
+    """
+    Return the UnitConversionPlan of the organization's display preferences.
+    Plans are shared by the organizations with the same preferences, and a
+    change of the preferences returns a different plan.
+    """
+    display_units = (
+        (EUI_DIMENSIONALITY, org.display_units_eui or EUI_DEFAULT_UNITS),
+        (AREA_DIMENSIONALITY, org.display_units_area or AREA_DEFAULT_UNITS),
+        (GHG_DIMENSIONALITY, org.display_units_ghg or GHG_DEFAULT_UNITS),
+        (GHG_INTENSITY_DIMENSIONALITY, org.display_units_ghg_intensity or GHG_INTENSITY_DEFAULT_UNITS),
+        (WUI_DIMENSIONALITY, org.display_units_wui or WUI_DEFAULT_UNITS),
+        (WATER_USE_DIMENSIONALITY, org.display_units_water_use or WATER_USE_DEFAULT_UNITS),
+    )
+    return _unit_conversion_plan(display_units, org.display_decimal_places)
+
+
+def collapse_unit(org, x, plan=None):
     """
     Collapse a Quantity object present down to a straight Float, per the
     preferences of the organization supplied (or the base units). Generally
     used to hide the fact of Quantities from Angular.
-    """
-    # make extensible / field name agnostic by just branching on the dimensionality
-    # and not the field name (e.g., 'gross_floor_area') ... the dimensionality gets
-    # enforced separately by the django pint column type
-    pint_specs = {
-        EUI_DIMENSIONALITY: org.display_units_eui or EUI_DEFAULT_UNITS,
-        AREA_DIMENSIONALITY: org.display_units_area or AREA_DEFAULT_UNITS,
-        GHG_DIMENSIONALITY: org.display_units_ghg or GHG_DEFAULT_UNITS,
-        GHG_INTENSITY_DIMENSIONALITY: org.display_units_ghg_intensity or GHG_INTENSITY_DEFAULT_UNITS,
-        WUI_DIMENSIONALITY: org.display_units_wui or WUI_DEFAULT_UNITS,
-        WATER_USE_DIMENSIONALITY: org.display_units_water_use or WATER_USE_DEFAULT_UNITS,
-    }
 
+    Callers collapsing many values can pass the org's UnitConversionPlan to
+    skip looking it up for each value.
+    """
     if isinstance(x, ureg.Quantity):
-        dimensionality = get_dimensionality(x)
-        # default to quantity's units if not found
-        pint_spec = pint_specs.get(dimensionality, x.units)
-        converted_value = x.to(pint_spec).magnitude
-        return round(converted_value, org.display_decimal_places)
+        return (plan or get_unit_conversion_plan(org)).convert(x)
     elif isinstance(x, list):
         # recurse out to collapse a dict for eg. the `related` key that
         # contains properties when the pt_dict is for a taxlot and vice-versa
-        return [apply_display_unit_preferences(org, y) for y in x]
+        plan = plan or get_unit_conversion_plan(org)
+        return [apply_display_unit_preferences(org, y, plan) for y in x]
     else:
         return x
 
 
-def apply_display_unit_preferences(org, pt_dict):
+def apply_display_unit_preferences(org, pt_dict, plan=None):
     """
     take a dict of property/taxlot data just before it gets sent off across the
     API and collapse any Quantity objects present down to a straight float, per
@@ -97,11 +143,21 @@ def apply_display_unit_preferences(org, pt_dict):
     # skip non dictionary values
     if not isinstance(pt_dict, dict):
         return pt_dict
-    converted_dict = {k: collapse_unit(org, v) for k, v in pt_dict.items()}
+    plan = plan or get_unit_conversion_plan(org)
+    converted_dict = {k: collapse_unit(org, v, plan) for k, v in pt_dict.items()}
 
     return converted_dict
 
 
+def apply_display_unit_preferences_to_page(org, pt_dicts):
+    """
+    apply_display_unit_preferences to each dict of a page of property/taxlot
+    data, looking up the organization's UnitConversionPlan once for the page.
+    """
+    plan = get_unit_conversion_plan(org)
+    return [apply_display_unit_preferences(org, pt_dict, plan) for pt_dict in pt_dicts]
+
+
 def pretty_units(quantity):
     """
     hack; can lose it when Pint gets something like a "{:~U}" format code
@@ -6,7 +6,6 @@ angular.module('SEED.controller.export_inventory_modal', []).controller('export_
   '$http',
   '$scope',
   '$uibModalInstance',
-  'cache_entry_service',
   'inventory_service',
   'uploader_service',
   'ids',
@@ -16,7 +15,7 @@ angular.module('SEED.controller.export_inventory_modal', []).controller('export_
   'spinner_utility',
   'filter_header_string',
   // eslint-disable-next-line func-names
-  function ($http, $scope, $uibModalInstance, cache_entry_service, inventory_service, uploader_service, ids, columns, inventory_type, profile_id, spinner_utility, filter_header_string) {
+  function ($http, $scope, $uibModalInstance, inventory_service, uploader_service, ids, columns, inventory_type, profile_id, spinner_utility, filter_header_string) {
     $scope.export_name = '';
     $scope.include_notes = true;
     $scope.include_label_header = false;
@@ -58,47 +57,15 @@ angular.module('SEED.controller.export_inventory_modal', []).controller('export_
     };
 
     $scope.get_export = ({ unique_id }) => {
-      cache_entry_service.get_cache_entry(unique_id)
-        .then((response) => {
-          const data = response.data;
-
-          const blob_map = {
-            csv: csv_to_blob,
-            xlsx: base64_to_blob,
-            geojson: geojson_to_blob
-          };
-
-          const blob = blob_map[$scope.export_type](data);
+      inventory_service.download_export(unique_id)
+        .then((data) => {
+          // the label header is only known by the client, so it is prepended to the downloaded csv
+          const blob = $scope.export_type === 'csv' && $scope.include_label_header ? new Blob([filter_header_string, '\r\n', data], { type: 'text/csv' }) : data;
           saveAs(blob, $scope.filename);
           $scope.close();
         });
     };
 
-    const csv_to_blob = (data) => {
-      if ($scope.include_label_header) {
-        data = [filter_header_string, data].join('\r\n');
-      }
-      return new Blob([data], { type: 'text/csv' });
-    };
-
-    const base64_to_blob = (base64) => {
-      const byteCharacters = atob(base64);
-      const byteArrays = [];
-
-      for (let i = 0; i < byteCharacters.length; i += 512) {
-        const slice = byteCharacters.slice(i, i + 512);
-        const byteNumbers = Array.from(slice).map((c) => c.charCodeAt(0));
-        byteArrays.push(new Uint8Array(byteNumbers));
-      }
-
-      return new Blob(byteArrays, { type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' });
-    };
-
-    const geojson_to_blob = (data) => {
-      data = JSON.stringify(data, null, '    ');
-      return new Blob([data], { type: 'application/geo+json' });
-    };
-
     $scope.cancel = () => {
       $uibModalInstance.dismiss('cancel');
     };
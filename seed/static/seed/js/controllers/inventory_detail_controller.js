@@ -25,7 +25,6 @@ angular.module('SEED.controller.inventory_detail', []).controller('inventory_det
   'pairing_service',
   'organization_service',
   'dataset_service',
-  'cache_entry_service',
   'uploader_service',
   'inventory_payload',
   'views_payload',
@@ -66,7 +65,6 @@ angular.module('SEED.controller.inventory_detail', []).controller('inventory_det
     pairing_service,
     organization_service,
     dataset_service,
-    cache_entry_service,
     uploader_service,
     inventory_payload,
     views_payload,
@@ -716,26 +714,12 @@ angular.module('SEED.controller.inventory_detail', []).controller('inventory_det
     $scope.get_export = ({ unique_id }) => {
       const filename = `buildingsync_property_${$stateParams.view_id}.xlsx`;
 
-      cache_entry_service.get_cache_entry(unique_id)
-        .then(({ data }) => {
-          const blob = base64_to_blob(data);
+      inventory_service.download_export(unique_id)
+        .then((blob) => {
           saveAs(blob, filename);
         });
     };
 
-    const base64_to_blob = (base64) => {
-      const byteCharacters = atob(base64);
-      const byteArrays = [];
-
-      for (let i = 0; i < byteCharacters.length; i += 512) {
-        const slice = byteCharacters.slice(i, i + 512);
-        const byteNumbers = Array.from(slice).map((c) => c.charCodeAt(0));
-        byteArrays.push(new Uint8Array(byteNumbers));
-      }
-
-      return new Blob(byteArrays, { type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' });
-    };
-
     $scope.export_building_sync_at_file = () => {
       $http
         .get(
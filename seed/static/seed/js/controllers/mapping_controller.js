@@ -19,7 +19,6 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
   'spinner_utility',
   'urls',
   '$uibModal',
-  'cache_entry_service',
   'user_service',
   'uploader_service',
   'column_mappings_service',
@@ -33,7 +32,6 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
   'simple_modal_service',
   'Notification',
   'organization_payload',
-  'naturalSort',
   'COLUMN_MAPPING_PROFILE_TYPE_NORMAL',
   'COLUMN_MAPPING_PROFILE_TYPE_BUILDINGSYNC_DEFAULT',
   'COLUMN_MAPPING_PROFILE_TYPE_BUILDINGSYNC_CUSTOM',
@@ -56,7 +54,6 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
     spinner_utility,
     urls,
     $uibModal,
-    cache_entry_service,
     user_service,
     uploader_service,
     column_mappings_service,
@@ -70,7 +67,6 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
     simple_modal_service,
     Notification,
     organization_payload,
-    naturalSort,
     COLUMN_MAPPING_PROFILE_TYPE_NORMAL,
     COLUMN_MAPPING_PROFILE_TYPE_BUILDINGSYNC_DEFAULT,
     COLUMN_MAPPING_PROFILE_TYPE_BUILDINGSYNC_CUSTOM,
@@ -721,8 +717,98 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
       });
     };
 
+    // Number of mapped properties and tax lots on each page of the preview tables
+    const mapped_buildings_per_page = 100;
+
+    // https://regexr.com/6cka2
+    const combinedRegex = /^(!?)=\s*(-?\d+(?:\.\d+)?)$|^(!?)=?\s*"((?:[^"]|\\")*)"$|^(<=?|>=?)\s*((-?\d+(?:\.\d+)?)|(\d{4}-\d{2}-\d{2}))$/;
+    const parseFilter = (expression) => {
+      // parses an expression string into an object containing operator and value
+      const filterData = expression.match(combinedRegex);
+      if (filterData) {
+        if (!_.isUndefined(filterData[2])) {
+          // Numeric Equality
+          const operator = filterData[1];
+          const value = Number(filterData[2].replace('\\.', '.'));
+          if (operator === '!') {
+            return { string: 'is not', operator: 'ne', value };
+          }
+          return { string: 'is', operator: 'exact', value };
+        }
+        if (!_.isUndefined(filterData[4])) {
+          // Text Equality
+          const operator = filterData[3];
+          const value = filterData[4];
+          if (operator === '!') {
+            return { string: 'is not', operator: 'ne', value };
+          }
+          return { string: 'is', operator: 'exact', value };
+        }
+        if (!_.isUndefined(filterData[7])) {
+          // Numeric Comparison
+          const operator = filterData[5];
+          const value = Number(filterData[6].replace('\\.', '.'));
+          switch (operator) {
+            case '<':
+              return { string: '<', operator: 'lt', value };
+            case '<=':
+              return { string: '<=', operator: 'lte', value };
+            case '>':
+              return { string: '>', operator: 'gt', value };
+            case '>=':
+              return { string: '>=', operator: 'gte', value };
+          }
+        } else {
+          // Date Comparison
+          const operator = filterData[5];
+          const value = filterData[8];
+          switch (operator) {
+            case '<':
+              return { string: '<', operator: 'lt', value };
+            case '<=':
+              return { string: '<=', operator: 'lte', value };
+            case '>':
+              return { string: '>', operator: 'gt', value };
+            case '>=':
+              return { string: '>=', operator: 'gte', value };
+          }
+        }
+      } else {
+        // Case-insensitive Contains
+        return { string: 'contains', operator: 'icontains', value: expression };
+      }
+    };
+
+    const operatorArr = ['>', '<', '=', '!', '!=', '<=', '>='];
+
+    // parse the filters and sorts of the columns of a preview table into the filters and sorts of the mapping results
+    const getColumnFilterSort = (gridApi) => {
+      const column_filters = [];
+      const column_sorts = [];
+      for (const { name, filters, sort } of gridApi.grid.columns) {
+        for (const filter of filters) {
+          // a filter can contain many comma-separated filters
+          const subFilters = _.map(_.split(filter.term, ','), _.trim);
+          for (const subFilter of subFilters) {
+            // ignore filters with only an operator. user is not done typing
+            if (subFilter && !operatorArr.includes(subFilter)) {
+              const { operator, value } = parseFilter(subFilter);
+              column_filters.push({ name, operator, value });
+            }
+          }
+        }
+
+        if (sort.direction) {
+          column_sorts.push({ name, direction: sort.direction, priority: sort.priority });
+        }
+      }
+      column_sorts.sort((a, b) => a.priority - b.priority);
+
+      return { column_filters, column_sorts };
+    };
+
     /**
-     * start_mapped_buildings: kicks off backend process to format mapped buildings for the preview table
+     * start_mapped_buildings: loads the first page of the mapped properties and tax lots for the preview tables
      */
     $scope.start_mapped_buildings = () => {
       $scope.import_file.progress = 0;
@@ -737,43 +823,48 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
 
       // Request the columns again because they may (most likely)
       // have changed from the initial import
-      $q.all([inventory_service.get_property_columns(), inventory_service.get_taxlot_columns(), inventory_service.search_matching_inventory($scope.import_file.id)])
-        .then((results) => {
-          $scope.property_columns = results[0];
-          $scope.taxlot_columns = results[1];
-          const progress_key = results[2].progress_key;
-
-          uploader_service.check_progress_loop(
-            progress_key,
-            0,
-            1,
-            $scope.get_cached_mapped_buildings,
-            () => {},
-            $scope.import_file
-          );
+      $q.all([
+        inventory_service.get_property_columns(),
+        inventory_service.get_taxlot_columns(),
+        inventory_service.get_mapping_results($scope.import_file.id, 'properties', 1, mapped_buildings_per_page),
+        inventory_service.get_mapping_results($scope.import_file.id, 'taxlots', 1, mapped_buildings_per_page)
+      ])
+        .then(([property_columns, taxlot_columns, properties, taxlots]) => {
+          $scope.property_columns = property_columns;
+          $scope.taxlot_columns = taxlot_columns;
+          $scope.set_mapped_buildings(properties, taxlots);
         })
         .catch((response) => {
           $log.error(response);
         });
     };
 
-    $scope.get_cached_mapped_buildings = ({ unique_id }) => {
-      cache_entry_service.get_cache_entry(unique_id)
-        .then($scope.set_mapped_buildings)
-        .catch($log.error);
+    /**
+     * load_mapped_buildings: loads a page of the mapped properties or tax lots, filtered and sorted as their preview table
+     */
+    $scope.load_mapped_buildings = (inventory_type, page) => {
+      const mapped = $scope.mappedData[inventory_type];
+      const { column_filters, column_sorts } = getColumnFilterSort(mapped.gridApi);
+      return inventory_service
+        .get_mapping_results($scope.import_file.id, inventory_type, page, mapped_buildings_per_page, column_filters, column_sorts)
+        .then((results) => {
+          mapped.pagination = results.pagination;
+          mapped.gridOptions.data = results.data;
+        })
+        .catch((response) => {
+          Notification.error(response.data.message);
+        });
     };
 
-    $scope.set_mapped_buildings = (mapped_data) => {
-      $scope.mappedData = mapped_data;
-
-      const data = $scope.mappedData;
-
+    $scope.set_mapped_buildings = (properties, taxlots) => {
       const gridOptions = {
         enableFiltering: true,
         enableGridMenu: false,
         enableSorting: true,
         fastWatch: true,
-        flatEntityAccess: true
+        flatEntityAccess: true,
+        useExternalFiltering: true,
+        useExternalSorting: true
       };
 
       const defaults = {
@@ -782,20 +873,15 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
         minWidth: 75,
         width: 150
       };
-      const existing_property_keys = _.keys(data.properties[0]);
-      const existing_extra_property_keys = existing_property_keys.length ? _.keys(data.properties[0].extra_data) : [];
-      const existing_taxlot_keys = _.keys(data.tax_lots[0]);
-      const existing_extra_taxlot_keys = existing_taxlot_keys.length ? _.keys(data.tax_lots[0].extra_data) : [];
       _.map($scope.property_columns, (col) => {
         const options = {};
-        if (!_.includes(existing_property_keys, col.name) && !_.includes(existing_extra_property_keys, col.name)) {
+        if (!_.includes(properties.columns, col.name)) {
           col.visible = false;
         } else if (col.data_type === 'datetime') {
           options.cellFilter = "date:'yyyy-MM-dd h:mm a'";
           options.filter = inventory_service.dateFilter();
         } else if (['area', 'eui', 'float', 'number'].includes(col.data_type)) {
           options.cellFilter = `number: ${$scope.organization.display_decimal_places}`;
-          options.sortingAlgorithm = naturalSort;
         } else {
           options.filter = inventory_service.combinedFilter();
         }
@@ -803,7 +889,7 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
       });
       _.map($scope.taxlot_columns, (col) => {
         const options = {};
-        if (!_.includes(existing_taxlot_keys, col.name) && !_.includes(existing_extra_taxlot_keys, col.name)) {
+        if (!_.includes(taxlots.columns, col.name)) {
           col.visible = false;
         } else if (col.data_type === 'datetime') {
           options.cellFilter = "date:'yyyy-MM-dd h:mm a'";
@@ -814,9 +900,30 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
         return _.defaults(col, options, defaults);
       });
 
-      $scope.propertiesGridOptions = angular.copy(gridOptions);
-      $scope.propertiesGridOptions.data = _.map(data.properties, (prop) => _.defaults(prop, prop.extra_data));
-      $scope.propertiesGridOptions.columnDefs = $scope.property_columns;
+      $scope.mappedData = {};
+      for (const [inventory_type, results, columnDefs] of [
+        ['properties', properties, $scope.property_columns],
+        ['taxlots', taxlots, $scope.taxlot_columns]
+      ]) {
+        const mapped = {
+          // the number of mapped buildings before any filters
+          total: results.pagination.total,
+          pagination: results.pagination,
+          gridOptions: {
+            ...angular.copy(gridOptions),
+            data: results.data,
+            columnDefs,
+            onRegisterApi(gridApi) {
+              mapped.gridApi = gridApi;
+              const filterOrSortChanged = _.debounce(() => $scope.load_mapped_buildings(inventory_type, 1), 1000);
+              gridApi.core.on.filterChanged($scope, filterOrSortChanged);
+              gridApi.core.on.sortChanged($scope, filterOrSortChanged);
+            }
+          }
+        };
+        $scope.mappedData[inventory_type] = mapped;
+      }
+      $scope.propertiesGridOptions = $scope.mappedData.properties.gridOptions;
       // Add access level instances to grid
       ['raw_access_level_instance_error', ...$scope.organization.access_level_names].reverse().forEach((level) => {
         $scope.propertiesGridOptions.columnDefs.unshift({
@@ -839,9 +946,7 @@ angular.module('SEED.controller.mapping', []).controller('mapping_controller', [
         });
       });
 
-      $scope.taxlotsGridOptions = angular.copy(gridOptions);
-      $scope.taxlotsGridOptions.data = _.map(data.tax_lots, (taxlot) => _.defaults(taxlot, taxlot.extra_data));
-      $scope.taxlotsGridOptions.columnDefs = $scope.taxlot_columns;
+      $scope.taxlotsGridOptions = $scope.mappedData.taxlots.gridOptions;
 
       $scope.process_mappings = false;
       $scope.show_mapped_buildings = true;
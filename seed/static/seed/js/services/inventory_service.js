@@ -1137,10 +1137,15 @@ angular.module('SEED.service.inventory', []).factory('inventory_service', [
       return pinned.concat(selected).concat(columns);
     };
 
-    inventory_service.search_matching_inventory = (import_file_id) => $http
-      .post(`/api/v3/import_files/${import_file_id}/mapping_results/`, undefined, {
+    inventory_service.get_mapping_results = (import_file_id, inventory_type, page, per_page, column_filters = null, column_sorts = null) => $http
+      .get(`/api/v3/import_files/${import_file_id}/paginated_mapping_results/`, {
         params: {
-          organization_id: user_service.get_organization().id
+          organization_id: user_service.get_organization().id,
+          inventory_type,
+          page,
+          per_page,
+          ...format_column_sorts(column_sorts),
+          ...format_column_filters(column_filters)
         }
       })
       .then((response) => response.data);
@@ -1318,6 +1323,14 @@ angular.module('SEED.service.inventory', []).factory('inventory_service', [
       }
     );
 
+    inventory_service.download_export = (unique_id) => $http.get('/api/v3/tax_lot_properties/download_export/', {
+      params: {
+        organization_id: user_service.get_organization().id,
+        unique_id
+      },
+      responseType: 'blob'
+    }).then((response) => response.data);
+
     return inventory_service;
   }
 ]);
@@ -16,13 +16,14 @@ from django.conf import settings
 from django.core.mail import send_mail
 from django.db import transaction
 from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from django.template import Context, Template, loader
 from django.urls import reverse_lazy
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
 from seed.audit_template.audit_template import AuditTemplate
-from seed.data_importer.tasks import hash_state_object
+from seed.data_importer.tasks import hash_state_objects
 from seed.decorators import lock_and_track
 from seed.lib.mcm.utils import batch
 from seed.lib.progress_data.progress_data import ProgressData
@@ -291,7 +292,7 @@ def _finish_delete_cycle(cycle_id, prog_key):
 
 @shared_task
 @lock_and_track
-def delete_organization_column(column_pk, org_pk, prog_key=None, chunk_size=100, *args, **kwargs):
+def delete_organization_column(column_pk, org_pk, prog_key=None, chunk_size=1000, *args, **kwargs):
     """Deletes an extra_data column from all merged property/taxlot states."""
     progress_data = (
         ProgressData.from_key(prog_key) if prog_key else ProgressData(func_name="delete_organization_column", unique_id=column_pk)
@@ -316,7 +317,7 @@ def update_multiple_columns(key, table_name, org_pk, changes, prog_key=None):
 def _evaluate_update_multiple_columns(prog_key, table_name, org_pk, changes):
     """Update columns, then check for required rehash - and rehash states if need be"""
 
-    chunk_size = 100
+    chunk_size = 1000
 
     rehashed_columns = []
     for key in changes:
@@ -380,16 +381,27 @@ def _build_property_query_for_rehashed_columns(org_pk, rehashed_columns):
     return query
 
 
+def _rehash_states(StateClass, ids):  # noqa: N803
+    """
+    Recompute the hashes of the states, writing only the ones that changed in a single query
+
+    :param StateClass: PropertyState or TaxLotState
+    :param ids: list, ids of the states
+    """
+    states = list(StateClass.objects.filter(id__in=ids))
+
+    changed_states = []
+    for state, hash_object in zip(states, hash_state_objects(states)):
+        if state.hash_object != hash_object:
+            state.hash_object = hash_object
+            changed_states.append(state)
+    StateClass.objects.bulk_update(changed_states, ["hash_object"])
+
+
 @shared_task
 def _rehash_state_chunk(chunk_ids, table_name, prog_key):
-    if table_name == "PropertyState":
-        states = PropertyState.objects.filter(id__in=chunk_ids)
-    else:
-        states = TaxLotState.objects.filter(id__in=chunk_ids)
-    with transaction.atomic():
-        for state in states:
-            state.hash_object = hash_state_object(state)
-            state.save(update_fields=["hash_object"])
+    StateClass = PropertyState if table_name == "PropertyState" else TaxLotState
+    _rehash_states(StateClass, chunk_ids)
 
     progress_data = ProgressData.from_key(prog_key)
     progress_data.step_with_counter()
@@ -436,17 +448,14 @@ def _evaluate_delete_organization_column(column_pk, org_pk, prog_key, chunk_size
 
 
 def _delete_organization_column_chunk(chunk_ids, column_name, table_name, prog_key, *args, **kwargs):
-    """updates a list of ``chunk_ids`` and increments the cache"""
-
-    if table_name == "PropertyState":
-        states = PropertyState.objects.filter(id__in=chunk_ids)
-    else:
-        states = TaxLotState.objects.filter(id__in=chunk_ids)
+    """removes the column from the extra_data of a list of ``chunk_ids``, rehashes them, and increments the cache"""
+    StateClass = PropertyState if table_name == "PropertyState" else TaxLotState
 
     with transaction.atomic():
-        for state in states:
-            del state.extra_data[column_name]
-            state.save(update_fields=["extra_data", "hash_object"])
+        StateClass.objects.filter(id__in=chunk_ids, extra_data__has_key=column_name).update(
+            extra_data=RawSQL("extra_data - %s::text", (column_name,))
+        )
+        _rehash_states(StateClass, chunk_ids)
 
     progress_data = ProgressData.from_key(prog_key)
     progress_data.step_with_counter()
@@ -546,13 +555,13 @@ def set_update_to_now(property_view_ids, taxlot_view_ids, progress_key):
 
 @shared_task
 def update_state_derived_data(property_state_ids=[], taxlot_state_ids=[], derived_column_ids=[]):
+    chunk_size = 1000
+
     progress_data = ProgressData(func_name="update_derived_data", unique_id=randint(10000, 99999))
-    progress_data.total = len(property_state_ids) + len(taxlot_state_ids)
+    progress_data.total = math.ceil(len(property_state_ids) / chunk_size) + math.ceil(len(taxlot_state_ids) / chunk_size)
     progress_data.save()
     progress_key = progress_data.key
 
-    chunk_size = 100
-
     derived_columns = DerivedColumn.objects.filter(id__in=derived_column_ids)
     property_derived_column_ids = list(derived_columns.filter(inventory_type=DerivedColumn.PROPERTY_TYPE).values_list("id", flat=True))
     taxlot_derived_column_ids = list(derived_columns.filter(inventory_type=DerivedColumn.TAXLOT_TYPE).values_list("id", flat=True))
@@ -568,32 +577,27 @@ def update_state_derived_data(property_state_ids=[], taxlot_state_ids=[], derive
     return progress_data.result()
 
 
-@shared_task
-def _update_property_state_derived_data_chunk(progress_key, property_state_ids=[], derived_column_ids=[]):
-    progress_data = ProgressData.from_key(progress_key)
+def _update_state_derived_data(StateClass, state_ids, derived_column_ids):  # noqa: N803
+    """Evaluate the derived columns for all of the states at once, and save their derived_data in one query"""
+    states = list(StateClass.objects.filter(id__in=state_ids))
+    for derived_column in DerivedColumn.objects.filter(id__in=derived_column_ids):
+        for state, value in zip(states, derived_column.evaluate_many(states)):
+            state.derived_data[derived_column.name] = value
 
-    states = PropertyState.objects.filter(id__in=property_state_ids)
-    derived_columns = DerivedColumn.objects.filter(id__in=derived_column_ids)
-
-    for state in states:
-        for derived_column in derived_columns:
-            state.derived_data[derived_column.name] = derived_column.evaluate(state)
-        state.save()
-        progress_data.step()
+    # derived_data is not part of the hash, so the states don't need to be saved one at a time
+    StateClass.objects.bulk_update(states, ["derived_data"])
 
 
 @shared_task
-def _update_taxlot_state_derived_data_chunk(progress_key, taxlot_state_ids=[], derived_column_ids=[]):
-    progress_data = ProgressData.from_key(progress_key)
+def _update_property_state_derived_data_chunk(progress_key, property_state_ids=[], derived_column_ids=[]):
+    _update_state_derived_data(PropertyState, property_state_ids, derived_column_ids)
+    ProgressData.from_key(progress_key).step()
 
-    states = TaxLotState.objects.filter(id__in=taxlot_state_ids)
-    derived_columns = DerivedColumn.objects.filter(id__in=derived_column_ids)
 
-    for state in states:
-        for derived_column in derived_columns:
-            state.derived_data[derived_column.name] = derived_column.evaluate(state)
-        state.save()
-        progress_data.step()
+@shared_task
+def _update_taxlot_state_derived_data_chunk(progress_key, taxlot_state_ids=[], derived_column_ids=[]):
+    _update_state_derived_data(TaxLotState, taxlot_state_ids, derived_column_ids)
+    ProgressData.from_key(progress_key).step()
 
 
 @shared_task
@@ -12,6 +12,8 @@ from seed.analysis_pipelines.utils import (
     _split_reading,
     calendarize_and_extrapolate_meter_readings,
     calendarize_meter_readings,
+    get_days_in_reading,
+    get_number_of_days_covered,
     interpolate_monthly_readings,
 )
 
@@ -305,3 +307,24 @@ class TestAnalysisUtils(TestCase):
         ]
 
         self.assertListEqual(expected, results)
+
+    def test_get_number_of_days_covered_matches_days_in_readings(self):
+        # -- Setup
+        # overlapping, touching, disjoint, and unsorted readings
+        readings = [
+            SimpleMeterReading(dt(2021, 3, 1), dt(2021, 4, 1), 100),
+            SimpleMeterReading(dt(2021, 1, 1, 12), dt(2021, 1, 10, 6), 100),
+            SimpleMeterReading(dt(2021, 1, 5), dt(2021, 1, 20), 100),
+            SimpleMeterReading(dt(2021, 1, 20), dt(2021, 2, 1), 100),
+            SimpleMeterReading(dt(2021, 3, 10), dt(2021, 3, 11), 100),
+            SimpleMeterReading(dt(2021, 5, 2, 1), dt(2021, 5, 2, 2), 100),
+        ]
+
+        # -- Act
+        days = get_number_of_days_covered(readings)
+
+        # -- Assert
+        expected = len({day for reading in readings for day in get_days_in_reading(reading)})
+        self.assertEqual(expected, days)
+        self.assertEqual(32 + 32 + 1, days)
+        self.assertEqual(0, get_number_of_days_covered([]))
@@ -299,6 +299,81 @@ class DataQualityCheckTests(AssertDictSubsetMixin, DataMappingBaseTestCase):
         labels = [r["label"] for r in dq_results]
         self.assertCountEqual(["Check Site EUI", "Check Year Built"], labels)
 
+    def test_check_data_adds_and_removes_labels_in_bulk(self):
+        dq = DataQualityCheck.retrieve(self.org.id)
+
+        year_built_label = StatusLabel.objects.create(name="Check Year Built", super_organization=self.org)
+        year_built_rule = dq.rules.get(table_name="PropertyState", field="year_built")
+        year_built_rule.status_label = year_built_label
+        year_built_rule.save()
+
+        # one state fails the rule and one state passes it but still has the label from a previous check
+        views = []
+        for year_built in [1699, 2000]:
+            ps = self.property_state_factory.get_property_state(
+                None, no_default_data=True, custom_id_1="abcd", address_line_1="742 Evergreen Terrace", year_built=year_built
+            )
+            views.append(PropertyView.objects.create(property=self.property_factory.get_property(), cycle=self.cycle, state=ps))
+        PropertyViewLabel.objects.create(propertyview=views[1], statuslabel=year_built_label)
+
+        dq.check_data("PropertyState", [view.state for view in views])
+
+        self.assertEqual(dq.results[views[0].state.id]["cycle"], self.cycle.name)
+        self.assertTrue(PropertyViewLabel.objects.filter(propertyview=views[0], statuslabel=year_built_label).exists())
+        self.assertFalse(PropertyViewLabel.objects.filter(propertyview=views[1], statuslabel=year_built_label).exists())
+
+    def test_range_valid_matches_minimum_and_maximum_valid(self):
+        rule = Rule.objects.create(name="range_rule", data_type=Rule.TYPE_NUMBER, min=10.5, max=100)
+        values = [5, 10, 10.4, 11, 50.0, 100, 100.5, 101, "50", None]
+
+        min_valid, max_valid = DataQualityCheck.range_valid(rule, values)
+
+        for value, value_min_valid, value_max_valid in zip(values[:8], min_valid, max_valid):
+            self.assertEqual(value_min_valid, rule.minimum_valid(value))
+            self.assertEqual(value_max_valid, rule.maximum_valid(value))
+        # strings and None are left for minimum_valid and maximum_valid
+        self.assertEqual(min_valid[8:], [None, None])
+        self.assertEqual(max_valid[8:], [None, None])
+
+    def test_results_are_saved_per_chunk_and_paginated(self):
+        dq = DataQualityCheck.retrieve(self.org.id)
+        run_id = DataQualityCheck.initialize_results(None, self.org.id)
+
+        # check the states in two chunks, as the celery tasks do
+        states = [
+            self.property_state_factory.get_property_state(None, no_default_data=True, custom_id_1="abcd", year_built=year_built)
+            for year_built in [1699, 2000, 1500]
+        ]
+        for chunk in [states[:2], states[2:]]:
+            dq.reset_results()
+            dq.check_data("PropertyState", chunk)
+            dq.save_results(run_id, self.org.id)
+
+        results = DataQualityCheck.retrieve_results(run_id, self.org.id)
+        self.assertEqual([state.id for state in states], list(results.values_list("state_id", flat=True)))
+        self.assertEqual(results.first().result["id"], states[0].id)
+
+        self.client.login(username="test_user@demo.com", password="test_pass")
+        url = reverse_lazy("api:v3:data_quality_checks-results")
+        response = self.client.get(url, {"organization_id": self.org.id, "run_id": run_id, "page": 2, "per_page": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pagination"]["total"], 3)
+        self.assertEqual([result["id"] for result in response.json()["data"]], [states[2].id])
+
+        # only states 0 and 2 are out of range for the year built
+        response = self.client.get(url, {"organization_id": self.org.id, "run_id": run_id, "field": "year_built"})
+        self.assertEqual([result["id"] for result in response.json()["data"]], [states[0].id, states[2].id])
+
+        response = self.client.get(url, {"organization_id": self.org.id})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, {"organization_id": self.org.id, "run_id": run_id, "per_page": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+        # starting the run again removes its previous results
+        DataQualityCheck.initialize_results(run_id, self.org.id)
+        self.assertFalse(DataQualityCheck.retrieve_results(run_id, self.org.id).exists())
+
     def test_text_match(self):
         dq = DataQualityCheck.retrieve(self.org.id)
         dq.remove_all_rules()
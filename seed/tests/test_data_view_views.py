@@ -878,6 +878,74 @@ class DataViewEvaluationTests(AccessLevelBaseTestCase, TestCase):
         self.assertIsNone(cycle5_data["Sum"])
         self.assertEqual({}, cycle5_data["views_by_default_field"])
 
+    def test_evaluation_cache_is_invalidated_by_inventory_change(self):
+        def evaluate():
+            response = self.client.post(
+                reverse("api:v3:data_views-evaluate", args=[self.data_view2.id]) + "?organization_id=" + str(self.org.id),
+                data=json.dumps({"columns": [self.extra_col.id]}),
+                content_type="application/json",
+            )
+            data = json.loads(response.content)
+            return data["data"]["columns_by_id"][str(self.extra_col.id)]["filter_groups_by_id"][str(self.three_properties_filter_group.id)][
+                "cycles_by_id"
+            ][str(self.cycle1.id)]
+
+        self.assertEqual(3300, evaluate()["Sum"])
+        # the second evaluation is cached
+        self.assertEqual(3300, evaluate()["Sum"])
+
+        self.state10.extra_data["extra_col"] = "1500.5"
+        self.state10.save()
+        fg3_cycle1 = evaluate()
+        self.assertEqual(3800.5, fg3_cycle1["Sum"])
+        self.assertEqual(1500.5, fg3_cycle1["Maximum"])
+        self.assertEqual(3, fg3_cycle1["Count"])
+
+    def test_evaluation_cache_is_invalidated_by_access_level_change(self):
+        self.login_as_child_member()
+
+        def evaluate():
+            response = self.client.post(
+                reverse("api:v3:data_views-evaluate", args=[self.data_view1.id]) + "?organization_id=" + str(self.org.id),
+                data=json.dumps({"columns": [self.site_eui.id]}),
+                content_type="application/json",
+            )
+            data = json.loads(response.content)
+            return data["data"]["columns_by_id"][str(self.site_eui.id)]["filter_groups_by_id"][str(self.office_filter_group.id)][
+                "cycles_by_id"
+            ][str(self.cycle1.id)]
+
+        office_cycle1 = evaluate()
+        self.assertEqual({self.view10.state.address_line_1: 10.0}, office_cycle1["views_by_default_field"])
+        self.assertEqual(10, office_cycle1["Sum"])
+
+        # swap which property the child access level instance covers
+        self.view10.property.access_level_instance = self.root_level_instance
+        self.view10.property.save()
+        self.office2.access_level_instance = self.child_level_instance
+        self.office2.save()
+
+        office_cycle1 = evaluate()
+        self.assertEqual({self.view11.state.address_line_1: 11.0}, office_cycle1["views_by_default_field"])
+        self.assertEqual(11, office_cycle1["Sum"])
+        self.assertEqual(1, office_cycle1["Count"])
+
+    def test_evaluation_ignores_extra_data_out_of_float_range(self):
+        self.state10.extra_data["extra_col"] = "1e400"
+        self.state10.save()
+        response = self.client.post(
+            reverse("api:v3:data_views-evaluate", args=[self.data_view2.id]) + "?organization_id=" + str(self.org.id),
+            data=json.dumps({"columns": [self.extra_col.id]}),
+            content_type="application/json",
+        )
+        self.assertEqual(200, response.status_code)
+        data = json.loads(response.content)
+        fg3_cycle1 = data["data"]["columns_by_id"][str(self.extra_col.id)]["filter_groups_by_id"][
+            str(self.three_properties_filter_group.id)
+        ]["cycles_by_id"][str(self.cycle1.id)]
+        self.assertEqual(2300, fg3_cycle1["Sum"])
+        self.assertEqual(2, fg3_cycle1["Count"])
+
 
 class DataViewInventoryTests(TestCase):
     """
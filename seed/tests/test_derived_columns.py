@@ -4,9 +4,11 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
 import json
+import math
 from json import dumps
 from string import Template, ascii_letters, digits
 
+import numpy as np
 import pytest
 from django.core.exceptions import ValidationError
 from django.urls import reverse
@@ -261,6 +263,29 @@ class TestExpressionEvaluator(TestCase):
         actual = ExpressionEvaluator(expression).evaluate(params)
         self.assertEqual(expected, actual)
 
+    @no_deadline
+    @given(full_expression_with_params_st())
+    @example(("1 / (2 - 3) * min(abs(-100), $a) / 10 - max(1, $b)", {"a": -2, "b": 2}))
+    @example(("$a / $b + $a % $b", {"a": 1, "b": 0}))
+    def test_evaluator_evaluate_many_matches_evaluate(self, s):
+        expression, params = s
+        try:
+            expected = ExpressionEvaluator(expression).evaluate(params)
+        except ZeroDivisionError:
+            expected = None
+        assume(expected is None or (isinstance(expected, float) and math.isfinite(expected)))
+
+        # the second row is missing every parameter
+        arrays = {name: np.array([value, np.nan]) for name, value in params.items()}
+        actual = ExpressionEvaluator(expression).evaluate_many(arrays, 2)
+
+        if expected is None:
+            self.assertTrue(np.isnan(actual[0]))
+        else:
+            self.assertEqual(pytest.approx(expected, rel=1e-12), actual[0])
+        if any(f"${name}" in expression for name in params):
+            self.assertTrue(np.isnan(actual[1]))
+
     def test_evaluator_raises_helpful_exception_when_expression_is_invalid(self):
         # -- Setup
         expression = "1 + HELLO"
@@ -625,6 +650,45 @@ class TestDerivedColumns(TestCase):
         # Derived Column 2 (defined by a different derived column) can be evaluated
         self.assertEqual(derived_column2.evaluate(property_state), 5)
 
+    def test_derived_column_evaluate_many_matches_evaluate(self):
+        """
+        Test that evaluating many states at once, including through a derived column source, has
+        the same results as evaluating each state
+        """
+        # -- Setup
+        source_column = self.col_factory("foo", is_extra_data=True)
+        numeric_column = self.numeric_core_columns[0]
+        models = self._derived_column_for_property_factory(
+            "$a / $b", {"a": {"source_column": source_column, "value": 1}, "b": {"source_column": numeric_column, "value": 4}}
+        )
+        derived_column = models["derived_column"]
+        column_with_derived_column = Column.objects.get(derived_column=derived_column.id)
+        derived_column2 = self._derived_column_for_property_factory(
+            "$c * 2 + $a",
+            {"c": {"source_column": column_with_derived_column, "value": None}, "a": {"source_column": source_column, "value": None}},
+            name="dc2",
+            create_property_state=False,
+        )["derived_column"]
+
+        field = numeric_column.column_name
+        property_states = [
+            models["property_state"],
+            self.property_state_factory.get_property_state(extra_data={"foo": 3}, **{field: 0}),
+            self.property_state_factory.get_property_state(extra_data={"foo": "not a number"}, **{field: 2}),
+            self.property_state_factory.get_property_state(extra_data={}, **{field: 2}),
+        ]
+
+        # -- Act
+        results = derived_column2.evaluate_many(property_states)
+
+        # -- Assert
+        self.assertEqual([1.5, None, None, None], results)
+        self.assertEqual([derived_column2.evaluate(property_state) for property_state in property_states], results)
+        self.assertEqual(
+            [derived_column.id, derived_column2.id],
+            [dc.id for dc in DerivedColumn.objects.get(pk=derived_column2.pk).get_evaluation_order()],
+        )
+
     def test_derived_column_duplicate_name(self):
         """Test that a derived column cannot be created with the same name as another column"""
 
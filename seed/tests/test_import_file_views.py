@@ -38,7 +38,6 @@ from seed.models import (
 )
 from seed.test_helpers.fake import FakeCycleFactory, FakePropertyFactory, FakePropertyStateFactory
 from seed.tests.util import AccessLevelBaseTestCase, DataMappingBaseTestCase
-from seed.utils.cache import get_cache_raw
 from seed.utils.organizations import create_organization
 from seed.views.v3.import_files import ImportFileViewSet, convert_first_five_rows_to_list
 
@@ -896,19 +895,58 @@ class TestViewsMatching(DataMappingBaseTestCase):
         self.client.login(**user_details)
 
     def test_get_mapping_results_returns_numbers_for_unitted_values(self):
-        url = reverse("api:v3:import_files-mapping-results", args=[self.import_file.pk])
-        url += f"?organization_id={self.org.pk}"
-        resp = self.client.post(url, content_type="application/json")
+        url = reverse("api:v3:import_files-paginated-mapping-results", args=[self.import_file.pk])
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "properties"})
 
         self.assertEqual(200, resp.status_code)
-        unique_id = json.loads(resp.content)["unique_id"]
-        mapped_property = get_cache_raw(unique_id)
+        mapped_properties = json.loads(resp.content)["data"]
+        self.assertTrue(mapped_properties)
 
         unitted_column_names = ["gross_floor_area", "site_eui"]
-        for column_name, val in mapped_property.items():
-            for unitted_column_name in unitted_column_names:
-                if column_name.startswith(unitted_column_name):
-                    self.assertTrue(isinstance(val, (float, int)))
+        for mapped_property in mapped_properties:
+            for column_name, val in mapped_property.items():
+                for unitted_column_name in unitted_column_names:
+                    if column_name.startswith(unitted_column_name) and val is not None:
+                        self.assertTrue(isinstance(val, (float, int)))
+
+    def test_get_paginated_mapping_results(self):
+        mapped_states = PropertyState.objects.filter(
+            import_file_id=self.import_file.pk,
+            data_state__in=[DATA_STATE_MAPPING, DATA_STATE_MATCHING],
+            merge_state__in=[MERGE_STATE_UNKNOWN, MERGE_STATE_NEW],
+        )
+        address_line_1 = Column.objects.get(organization=self.org, table_name="PropertyState", column_name="address_line_1")
+        column_name = f"address_line_1_{address_line_1.id}"
+        url = reverse("api:v3:import_files-paginated-mapping-results", args=[self.import_file.pk])
+
+        # page through the mapped properties
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "properties", "per_page": 2, "page": 2})
+        self.assertEqual(200, resp.status_code)
+        body = json.loads(resp.content)
+        self.assertEqual(body["pagination"]["total"], mapped_states.count())
+        self.assertEqual(body["pagination"]["page"], 2)
+        self.assertEqual(len(body["data"]), 2)
+        self.assertIn(column_name, body["columns"])
+        self.assertEqual([state["id"] for state in body["data"]], list(mapped_states.order_by("id").values_list("id", flat=True)[2:4]))
+
+        # sort on a mapped column
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "properties", "order_by": f"-{column_name}"})
+        body = json.loads(resp.content)
+        addresses = [state[column_name] for state in body["data"]]
+        self.assertEqual(addresses, sorted(addresses, reverse=True))
+
+        # filter on a mapped column
+        address = mapped_states.exclude(address_line_1=None).first().address_line_1
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "properties", column_name: address})
+        body = json.loads(resp.content)
+        self.assertEqual(body["pagination"]["total"], mapped_states.filter(address_line_1=address).count())
+        self.assertTrue(all(state[column_name] == address for state in body["data"]))
+
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "buildings"})
+        self.assertEqual(400, resp.status_code)
+
+        resp = self.client.get(url, {"organization_id": self.org.pk, "inventory_type": "properties", "per_page": "abc"})
+        self.assertEqual(400, resp.status_code)
 
     # def test_use_description_updated(self):
     #     """
@@ -1165,16 +1203,16 @@ class TestImportFileViewSetPermissions(AccessLevelBaseTestCase, DataMappingBaseT
         assert response.status_code == 404
 
     def test_import_file_mapping_results(self):
-        url = reverse_lazy("api:v3:import_files-mapping-results", args=[self.import_file.pk])
+        url = reverse_lazy("api:v3:import_files-paginated-mapping-results", args=[self.import_file.pk])
 
         # root users can
         self.login_as_root_member()
-        response = self.client.post(url, {"organization_id": self.org.id}, content_type="application/json")
+        response = self.client.get(url, {"organization_id": self.org.id, "inventory_type": "properties"})
         assert response.status_code == 200
 
         # child user cannot
         self.login_as_child_member()
-        response = self.client.post(url, {"organization_id": self.org.id}, content_type="application/json")
+        response = self.client.get(url, {"organization_id": self.org.id, "inventory_type": "properties"})
         assert response.status_code == 404
 
     def test_import_file_pm_meters_preview(self):
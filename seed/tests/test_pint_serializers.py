@@ -0,0 +1,52 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+from django.test import TestCase
+from quantityfield.units import ureg
+
+from seed.lib.superperms.orgs.models import Organization
+from seed.serializers.pint import apply_display_unit_preferences_to_page, collapse_unit, get_unit_conversion_plan
+
+
+class TestUnitConversionPlan(TestCase):
+    def setUp(self):
+        self.org = Organization(display_units_area="m**2", display_units_eui="kWh/m**2/year", display_decimal_places=2)
+
+    def test_collapse_unit_matches_pint_conversion(self):
+        quantities = [
+            ureg.Quantity(12345.678, "ft**2"),
+            ureg.Quantity(100, "m**2"),
+            ureg.Quantity(87.5, "kBtu/ft**2/year"),
+            ureg.Quantity(1500, "kgal/year"),
+            ureg.Quantity(42, "kW"),
+        ]
+        display_units = {"ft**2": "m**2", "m**2": "m**2", "kBtu/ft**2/year": "kWh/m**2/year", "kgal/year": "kgal/year", "kW": "kW"}
+
+        for quantity in quantities:
+            expected = round(quantity.to(display_units[str(quantity.units)]).magnitude, 2)
+            self.assertEqual(collapse_unit(self.org, quantity), expected, f"Failed for {quantity}")
+
+    def test_collapse_unit_keeps_magnitude_type_without_conversion(self):
+        self.assertEqual(collapse_unit(self.org, ureg.Quantity(3, "kW")), 3)
+        self.assertIsInstance(collapse_unit(self.org, ureg.Quantity(3, "kW")), int)
+
+    def test_plan_follows_organization_preferences(self):
+        plan = get_unit_conversion_plan(self.org)
+        self.assertIs(get_unit_conversion_plan(Organization(display_units_area="m**2", display_units_eui="kWh/m**2/year")), plan)
+
+        self.org.display_units_area = "ft**2"
+        self.assertIsNot(get_unit_conversion_plan(self.org), plan)
+        self.assertEqual(collapse_unit(self.org, ureg.Quantity(10, "ft**2")), 10)
+
+    def test_apply_display_unit_preferences_to_page(self):
+        rows = [
+            {"id": 1, "gross_floor_area": ureg.Quantity(1000, "ft**2"), "related": [{"site_eui": ureg.Quantity(10, "kBtu/ft**2/year")}]},
+            {"id": 2, "gross_floor_area": None, "related": []},
+        ]
+
+        results = apply_display_unit_preferences_to_page(self.org, rows)
+
+        self.assertEqual(results[0], {"id": 1, "gross_floor_area": 92.9, "related": [{"site_eui": 31.55}]})
+        self.assertEqual(results[1], {"id": 2, "gross_floor_area": None, "related": []})
@@ -2532,6 +2532,46 @@ class PropertyMeterViewTests(DataMappingBaseTestCase):
         self.assertCountEqual(result_dict["readings"], expectation["readings"])
         self.assertCountEqual(result_dict["column_defs"], expectation["column_defs"])
 
+    def test_property_meter_usage_annual_readings_use_the_maximum_total_of_nonoverlapping_readings(self):
+        save_raw_data(self.import_file.id)
+
+        tz_obj = timezone(TIME_ZONE)
+        meter = Meter.objects.get(property_id=self.property_view_1.property.id, type=Meter.type_lookup["Natural Gas"])
+        reading_details = {
+            "meter_id": meter.id,
+            "source_unit": "kBtu (thousand Btu)",
+            "conversion_factor": 1,
+        }
+        # The February through March reading overlaps the January through February reading, and is larger
+        for start_month, end_month, reading in [(1, 3, 100), (2, 4, 300), (4, 5, 50)]:
+            reading_details["start_time"] = make_aware(datetime(2018, start_month, 1, 0, 0, 0), timezone=tz_obj)
+            reading_details["end_time"] = make_aware(datetime(2018, end_month, 1, 0, 0, 0), timezone=tz_obj)
+            reading_details["reading"] = reading
+            MeterReading.objects.create(**reading_details)
+
+        # A reading that spans two years isn't counted in either
+        reading_details["start_time"] = make_aware(datetime(2018, 12, 1, 0, 0, 0), timezone=tz_obj)
+        reading_details["end_time"] = make_aware(datetime(2019, 1, 2, 0, 0, 0), timezone=tz_obj)
+        reading_details["reading"] = 1000
+        MeterReading.objects.create(**reading_details)
+
+        url = reverse("api:v3:properties-meter-usage", kwargs={"pk": self.property_view_1.id})
+        url += f"?organization_id={self.org.pk}"
+
+        post_params = json.dumps(
+            {
+                "interval": "Year",
+                "excluded_meter_ids": [],
+            }
+        )
+        result = self.client.post(url, post_params, content_type="application/json")
+        result_dict = ast.literal_eval(result.content.decode("utf-8"))
+
+        readings_by_year = {reading["year"]: reading for reading in result_dict["readings"]}
+        self.assertEqual([2016, 2018], sorted(readings_by_year))
+        self.assertEqual(576000.2 + 488000.1, readings_by_year[2016]["Natural Gas - Portfolio Manager - 5766973-1"])
+        self.assertEqual(300 + 50, readings_by_year[2018]["Natural Gas - Portfolio Manager - 5766973-1"])
+
     def test_property_meter_usage_can_filter_when_usages_span_a_single_month(self):
         save_raw_data(self.import_file.id)
 
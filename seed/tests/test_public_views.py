@@ -8,14 +8,16 @@ from datetime import datetime
 from django.urls import reverse_lazy
 
 from seed.landing.models import SEEDUser as User
-from seed.models import Column
+from seed.models import Column, PropertyView, StatusLabel
 from seed.test_helpers.fake import FakeCycleFactory, FakePropertyFactory, FakePropertyStateFactory, FakePropertyViewFactory
 from seed.tests.util import DataMappingBaseTestCase
+from seed.utils.cache import clear_cache
 from seed.utils.organizations import create_organization
 
 
 class TestPublicViews(DataMappingBaseTestCase):
     def setUp(self):
+        clear_cache()
         user_details = {
             "username": "test_user@demo.com",
             "password": "test_pass",
@@ -91,7 +93,7 @@ class TestPublicViews(DataMappingBaseTestCase):
         assert response.status_code == 200
         res = response.json()
         assert sorted(res.keys()) == ["data", "organization", "pagination", "query_params"]
-        assert sorted(res["pagination"].keys()) == ["page", "per_page", "property_count", "taxlot_count", "total_pages"]
+        assert sorted(res["pagination"].keys()) == ["next_cursor", "page", "per_page", "property_count", "taxlot_count", "total_pages"]
         assert sorted(res["query_params"].keys()) == ["cycle_ids", "labels", "properties", "taxlots"]
         assert res["organization"]["id"] == self.org.id
         data = res["data"]
@@ -103,6 +105,80 @@ class TestPublicViews(DataMappingBaseTestCase):
         assert response.status_code == 200
         assert response.headers["Content-Type"] == "text/html; charset=utf-8"
 
+    def test_public_feed_cursor(self):
+        self.org.public_feed_enabled = True
+        self.org.save()
+        url = reverse_lazy("api:v3:public-organizations-feed-json", args=[self.org.id])
+
+        # read the feed 4 properties at a time
+        response = self.client.get(url, {"taxlots": "false", "per_page": 4})
+        first_page = response.json()
+        assert first_page["pagination"]["property_count"] == 6
+        assert len(first_page["data"]["properties"]) == 4
+
+        response = self.client.get(url, {"taxlots": "false", "per_page": 4, "cursor": first_page["pagination"]["next_cursor"]})
+        second_page = response.json()
+        assert len(second_page["data"]["properties"]) == 2
+        assert second_page["pagination"]["next_cursor"] is None
+
+        # the cursor reads the same views as the page number
+        response = self.client.get(url, {"taxlots": "false", "per_page": 4, "page": 2})
+        ids = [view["id"] for view in response.json()["data"]["properties"]]
+        assert ids == [view["id"] for view in second_page["data"]["properties"]]
+
+    def test_public_feed_conditional_requests(self):
+        self.org.public_feed_enabled = True
+        self.org.save()
+        url = reverse_lazy("api:v3:public-organizations-feed-json", args=[self.org.id])
+
+        response = self.client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert "Last-Modified" in response.headers
+
+        # unchanged feeds aren't sent again
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        # updating a state changes the feed once the cached version expires
+        self.view22.state.property_name = "renamed property 22"
+        self.view22.state.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        clear_cache()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["data"]["properties"][0]["property_name"] == "renamed property 22"
+
+        # the feed isn't cached by date alone
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response.headers["Last-Modified"])
+        assert response.status_code == 200
+
+    def test_public_feed_etag_changes_with_labels(self):
+        self.org.public_feed_enabled = True
+        self.org.public_feed_labels = True
+        self.org.save()
+        url = reverse_lazy("api:v3:public-organizations-feed-json", args=[self.org.id])
+        label = StatusLabel.objects.create(name="Compliant", super_organization=self.org)
+        other_view = PropertyView.objects.filter(cycle=self.cycle1).first()
+        self.view22.labels.add(label)
+
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        # moving the label to another view doesn't update any state, but changes the feed
+        self.view22.labels.remove(label)
+        other_view.labels.add(label)
+        clear_cache()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        labels = {view["id"]: view["labels"] for view in response.json()["data"]["properties"]}
+        assert labels[other_view.id] == "Compliant"
+        assert labels[self.view22.id] == ""
+
     def test_public_geojson(self):
         url = reverse_lazy("api:v3:public-organizations-cycles-geojson", args=[self.org.id, self.cycle2.id])
         response = self.client.get(url, content_type="application/json")
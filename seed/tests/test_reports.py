@@ -9,7 +9,7 @@ from django.urls import reverse
 from django.utils import timezone
 from xlrd import open_workbook
 
-from seed.models import ASSESSED_RAW, Column, Property, PropertyState, PropertyView
+from seed.models import ASSESSED_RAW, Column, FilterGroup, Property, PropertyState, PropertyView, PropertyViewLabel, StatusLabel
 from seed.test_helpers.fake import (
     FakeCycleFactory,
     FakePropertyFactory,
@@ -143,6 +143,54 @@ class ExportReport(DataMappingBaseTestCase):
 
         assert response.json()["aggregated_data"]["property_counts"] == [{"yr_e": "2015", "num_properties": 5, "num_properties_w-data": 5}]
 
+    def test_report_aggregated_bins_continuous_values(self):
+        url = reverse("api:v3:organizations-report-aggregated", args=[self.org.pk])
+        data = {
+            "cycle_ids": [self.cycle.id, self.cycle_2.id],
+            "x_var": "site_eui",
+            "y_var": "gross_floor_area",
+            "access_level_instance_id": self.org.root.id,
+        }
+        response = self.client.get(url, data)
+
+        # bins are 5 equal widths from the min to the max gross floor area, as with np.histogram_bin_edges
+        bins = ["100.0 - 180.0", "180.0 - 260.0", "260.0 - 340.0", "340.0 - 420.0", "420.0 - 500.0"]
+        expected = [{"y": bin, "x": x, "yr_e": yr_e} for yr_e in ["2016", "2015"] for bin, x in zip(bins, [1.0, 2.0, 3.0, 4.0, None])]
+        self.assertListEqual(response.json()["aggregated_data"]["chart_data"], expected)
+
+        # changed states are not read from the cache
+        PropertyState.objects.filter(organization_id=self.org.id, site_eui=1).update(site_eui=11, updated=timezone.now())
+        response = self.client.get(url, data)
+        self.assertEqual(response.json()["aggregated_data"]["chart_data"][0], {"y": "100.0 - 180.0", "x": 11.0, "yr_e": "2016"})
+
+    def test_report_aggregated_cache_is_invalidated_by_label_change(self):
+        label = StatusLabel.objects.create(name="reported", super_organization=self.org)
+        filter_group = FilterGroup.objects.create(name="reported", organization_id=self.org.id, query_dict={})
+        filter_group.and_labels.add(label)
+        view_1 = PropertyView.objects.get(cycle=self.cycle, state__site_eui=1)
+        view_2 = PropertyView.objects.get(cycle=self.cycle, state__site_eui=2)
+        view_3 = PropertyView.objects.get(cycle=self.cycle, state__site_eui=3)
+        PropertyViewLabel.objects.create(propertyview=view_1, statuslabel=label)
+        PropertyViewLabel.objects.create(propertyview=view_3, statuslabel=label)
+
+        url = reverse("api:v3:organizations-report-aggregated", args=[self.org.pk])
+        data = {
+            "cycle_ids": [self.cycle.id],
+            "x_var": "site_eui",
+            "y_var": "gross_floor_area",
+            "access_level_instance_id": self.org.root.id,
+            "filter_group_id": filter_group.id,
+        }
+        response = self.client.get(url, data)
+        chart_data = response.json()["aggregated_data"]["chart_data"]
+        self.assertEqual([1.0, 3.0], [d["x"] for d in chart_data if d["x"] is not None])
+
+        # moving the label keeps the count, the max view and state ids and the last update of the filtered views
+        PropertyViewLabel.objects.filter(propertyview=view_1, statuslabel=label).update(propertyview=view_2)
+        response = self.client.get(url, data)
+        chart_data = response.json()["aggregated_data"]["chart_data"]
+        self.assertEqual([2.0, 3.0], [d["x"] for d in chart_data if d["x"] is not None])
+
     def test_report_missing_arg(self):
         url = reverse("api:v3:organizations-report-aggregated", args=[self.org.pk])
         data = {
@@ -478,3 +478,30 @@ class TestInventoryViewSearchParsersAccessLevelInstances(TestCase):
         self.assertEqual(act_filters, exp_filters)
         self.assertEqual(act_order_by, exp_order_by)
         self.assertEqual(annotations, {})
+
+    def test_filter_and_sort_on_states(self):
+        # -- Setup
+        city_id = Column.objects.get(organization=self.fake_org, table_name="PropertyState", column_name="city").id
+        data = {
+            f"city_{city_id}": "Denver",
+            "3rd_gen__exact": "",
+            "order_by": f"-city_{city_id}",
+        }
+        filters = QueryDict("", mutable=True)
+        filters.update(data)
+
+        # -- Act
+        act_filters, annotations, act_order_by = build_view_filters_and_sorts(
+            filters,
+            self.columns,
+            "property",
+            self.fake_org.access_level_names,
+            state_prefix="",
+            access_level_instance_field="raw_access_level_instance",
+        )
+
+        # -- Assert
+        exp_filters = Q(city="Denver") & ~Q(raw_access_level_instance__path__icontains="3rd_gen")
+        self.assertEqual(act_filters, exp_filters)
+        self.assertEqual(act_order_by, ["-city"])
+        self.assertEqual(annotations, {})
@@ -12,7 +12,9 @@ from django.test import TestCase
 
 from seed import tasks
 from seed.data_importer.models import ImportFile, ImportRecord
+from seed.data_importer.tasks import hash_state_object
 from seed.landing.models import SEEDUser as User
+from seed.lib.progress_data.progress_data import ProgressData
 from seed.lib.superperms.orgs.models import Organization
 from seed.models import DATA_STATE_MATCHING, PORTFOLIO_RAW, SEED_DATA_SOURCES, Column, PropertyState
 from seed.test_helpers.fake import FakePropertyFactory, FakePropertyStateFactory
@@ -111,3 +113,35 @@ class TestTasks(TestCase):
 
         self.assertIn(state_1.id, ids)
         self.assertNotIn(state_2.id, ids)
+
+    def test_rehash_state_chunk(self):
+        state = self.property_state_factory.get_property_state()
+        expected_hash = state.hash_object
+        PropertyState.objects.filter(pk=state.pk).update(hash_object="stale")
+
+        progress_data = ProgressData("update_multiple_columns", state.pk)
+        progress_data.total = 1
+        progress_data.data["total_records"] = 1
+        progress_data.save()
+        tasks._rehash_state_chunk([state.pk], "PropertyState", progress_data.key)
+
+        self.assertEqual(PropertyState.objects.get(pk=state.pk).hash_object, expected_hash)
+        self.assertEqual(ProgressData.from_key(progress_data.key).data["completed_records"], 1)
+
+    def test_delete_organization_column(self):
+        states = []
+        for i in range(3):
+            state = self.property_state_factory.get_property_state(extra_data={"to_delete": f"value {i}", "to_keep": i})
+            state.data_state = DATA_STATE_MATCHING
+            state.save()
+            states.append(state)
+        column = Column.objects.create(column_name="to_delete", table_name="PropertyState", organization=self.org, is_extra_data=True)
+
+        result = tasks.delete_organization_column(column.pk, self.org.pk, chunk_size=2)
+
+        self.assertEqual(ProgressData.from_key(result["progress_key"]).data["total_records"], 3)
+        self.assertFalse(Column.objects.filter(pk=column.pk).exists())
+        for i, state in enumerate(states):
+            refreshed_state = PropertyState.objects.get(pk=state.pk)
+            self.assertEqual(refreshed_state.extra_data, {"to_keep": i})
+            self.assertEqual(refreshed_state.hash_object, hash_state_object(refreshed_state))
@@ -3,15 +3,19 @@ SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and othe
 See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
-import base64
+import csv
+import io
 import json
 import time
 from datetime import datetime
 from random import randint
+from unittest import mock
 
 import pytest
 import pytz
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 from xlrd import open_workbook
 
@@ -21,11 +25,15 @@ from seed.models import (
     Column,
     Cycle,
     DerivedColumn,
+    Goal,
+    InventoryGroup,
+    InventoryGroupMapping,
     Note,
     PropertyView,
     TaxLotProperty,
     TaxLotView,
 )
+from seed.models.inventory_groups import VIEW_LIST_PROPERTY
 from seed.serializers.pint import DEFAULT_UNITS
 from seed.tasks import set_update_to_now
 from seed.test_helpers.fake import (
@@ -39,10 +47,15 @@ from seed.test_helpers.fake import (
     FakeTaxLotViewFactory,
 )
 from seed.tests.util import AccessLevelBaseTestCase, DataMappingBaseTestCase
-from seed.utils.cache import get_cache_raw
 from seed.utils.organizations import create_organization
 
 
+def download_export(client, org_id, unique_id):
+    url = reverse_lazy("api:v3:tax_lot_properties-download-export")
+    response = client.get(url, {"organization_id": org_id, "unique_id": unique_id})
+    return b"".join(response.streaming_content)
+
+
 class TestTaxLotProperty(DataMappingBaseTestCase):
     """Tests for exporting data to various formats."""
 
@@ -128,6 +141,48 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
         # -- Assertion
         assert "my_derived_column_" + str(column.id) in data[0]
 
+    def test_serialize_queries_do_not_depend_on_page_size(self):
+        """Labels, groups, notes and related records are looked up once per page rather than once per row"""
+        label = self.label_factory.get_statuslabel()
+        group = InventoryGroup.objects.create(
+            name="group", organization=self.org, inventory_type=VIEW_LIST_PROPERTY, access_level_instance=self.org.root
+        )
+        view_ids = []
+        for _ in range(20):
+            property_view = self.taxlot_property_factory.get_taxlot_property(cycle=self.cycle).property_view
+            property_view.labels.add(label)
+            property_view.notes.create(name="Manually Created", note_type=Note.NOTE, text="note")
+            InventoryGroupMapping.objects.create(property=property_view.property, group=group)
+            view_ids.append(property_view.id)
+        goal = Goal.objects.create(
+            organization=self.org,
+            baseline_cycle=self.cycle,
+            current_cycle=self.cycle,
+            access_level_instance=self.org.root,
+            eui_column1=Column.objects.get(organization=self.org.id, column_name="site_eui"),
+            area_column=Column.objects.get(organization=self.org.id, column_name="gross_floor_area"),
+            target_percentage=20,
+            name="goal",
+        )
+        columns_from_database = Column.retrieve_all(self.org.id, "property", False)
+
+        def count_queries(page_size):
+            views = list(PropertyView.objects.select_related("state", "property", "cycle").filter(id__in=view_ids[:page_size]))
+            with CaptureQueriesContext(connection) as context:
+                data = TaxLotProperty.serialize(views, None, columns_from_database, goal_id=goal.id)
+
+            self.assertEqual(len(data), page_size)
+            for datum in data:
+                self.assertTrue(datum["groups_indicator"])
+                self.assertEqual(datum["labels"], [label.id])
+                self.assertEqual(datum["notes_count"], 1)
+                self.assertEqual(len(datum["related"]), 1)
+                self.assertEqual(datum["goal_note"]["goal"], goal.id)
+                self.assertIsNotNone(datum["historical_note"])
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(5), count_queries(20))
+
     def test_csv_export(self):
         """Test to make sure get_related returns the fields"""
         for i in range(50):
@@ -148,7 +203,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
 
         # parse the content as array
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
 
         self.assertTrue("Address Line 1" in data[0])
         self.assertTrue("Property Labels\r" in data[0])
@@ -193,7 +248,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
         data = json.dumps({"columns": col_names, "export_type": "csv", "ids": pv_ids})
         response = self.client.post(url, data=data, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         headers = data[0].split(",")
         idx_adr = headers.index("Address Line 1 (Tax Lot)")
         idx_jtl = headers.index("Jurisdiction Tax Lot ID (Tax Lot)")
@@ -208,7 +263,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
         data = json.dumps({"columns": col_names, "export_type": "csv", "ids": tv_ids})
         response = self.client.post(url, data=data, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         headers = data[0].split(",")
         idx_adr = headers.index("Address Line 1 (Property)")
         row1 = data[1].split(",")
@@ -235,7 +290,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
 
         # parse the content as array
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\r\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\r\n")
         notes_string = (
             multi_line_note.created.astimezone().strftime("%Y-%m-%d %I:%M:%S %p")
             + "\n"
@@ -270,9 +325,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
 
         # parse & decode the content as array
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"]
-
-        xlsx_bytes = base64.b64decode(data)
+        xlsx_bytes = download_export(self.client, self.org.pk, unique_id)
         wb = open_workbook(file_contents=xlsx_bytes)
 
         data = [row.value for row in wb.sheet_by_index(0).row(0)]
@@ -302,7 +355,7 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
 
         # parse the content as dictionary
         unique_id = json.loads(response.content)["unique_id"]
-        features = get_cache_raw(unique_id)["data"]["features"]
+        features = json.loads(download_export(self.client, self.org.pk, unique_id))["features"]
         record_level_keys = list(features[0]["properties"].keys())
 
         self.assertIn("Address Line 1", record_level_keys)
@@ -311,6 +364,31 @@ class TestTaxLotProperty(DataMappingBaseTestCase):
         # ids 52 up to and including 102
         self.assertEqual(len(features), 51)
 
+    def test_export_in_batches(self):
+        """Exports are written in batches, in the order of the requested ids, and only downloadable by the org"""
+        states = [self.property_state_factory.get_property_state(address_line_1=f"{i} Batch St") for i in range(5)]
+        view_ids = [self.property_view_factory.get_property_view(state=state).id for state in states]
+        view_ids.reverse()
+
+        url = reverse_lazy("api:v3:tax_lot_properties-start-export")
+        with mock.patch("seed.utils.tax_lot_properties.EXPORT_BATCH_SIZE", 2):
+            response = self.client.post(
+                f"{url}?organization_id={self.org.pk}&inventory_type=properties",
+                data=json.dumps({"columns": ["address_line_1"], "export_type": "csv", "ids": view_ids}),
+                content_type="application/json",
+            )
+        unique_id = json.loads(response.content)["unique_id"]
+
+        rows = list(csv.reader(io.StringIO(download_export(self.client, self.org.pk, unique_id).decode())))
+        idx_adr = rows[0].index("Address Line 1")
+        self.assertEqual([row[idx_adr] for row in rows[1:]], [f"{i} Batch St" for i in reversed(range(5))])
+
+        other_org, _, _ = create_organization(self.user)
+        response = self.client.get(
+            reverse_lazy("api:v3:tax_lot_properties-download-export"), {"organization_id": other_org.pk, "unique_id": unique_id}
+        )
+        self.assertEqual(response.status_code, 404)
+
     def test_set_update_to_now(self):
         property_view_ids = [self.property_view_factory.get_property_view().id for _ in range(50)]
         taxlot_view_ids = [self.taxlot_view_factory.get_taxlot_view().id for _ in range(50)]
@@ -419,13 +497,13 @@ class TestTaxLotPropertyAccessLevel(AccessLevelBaseTestCase):
         self.login_as_root_member()
         response = self.client.post(url, data=params, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         assert len(data) == 3
 
         self.login_as_child_member()
         response = self.client.post(url, data=params, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         assert len(data) == 2
 
     def test_taxlot_export(self):
@@ -436,13 +514,13 @@ class TestTaxLotPropertyAccessLevel(AccessLevelBaseTestCase):
         self.login_as_root_member()
         response = self.client.post(url, data=params, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         assert len(data) == 3
 
         self.login_as_child_member()
         response = self.client.post(url, data=params, content_type="application/json")
         unique_id = json.loads(response.content)["unique_id"]
-        data = get_cache_raw(unique_id)["data"].split("\n")
+        data = download_export(self.client, self.org.pk, unique_id).decode().split("\n")
         assert len(data) == 2
 
     def test_set_update_to_now(self):
@@ -0,0 +1,86 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+from django.test import TestCase
+
+from seed.landing.models import SEEDUser as User
+from seed.models import PropertyState, TaxLotState, UbidModel
+from seed.test_helpers.fake import FakePropertyStateFactory, FakeTaxLotStateFactory
+from seed.utils.geocode import long_lat_wkt
+from seed.utils.organizations import create_organization
+from seed.utils.states import bulk_create_states, bulk_update_states
+
+
+class StateBulkSaveTests(TestCase):
+    def setUp(self):
+        user_details = {
+            "username": "test_user@demo.com",
+            "password": "test_pass",
+        }
+        self.user = User.objects.create_superuser(email="test_user@demo.com", **user_details)
+        self.org, _, _ = create_organization(self.user)
+
+        self.property_state_factory = FakePropertyStateFactory(organization=self.org)
+        self.taxlot_state_factory = FakeTaxLotStateFactory(organization=self.org)
+
+    def _assert_same_as_saved(self, StateClass, details):  # noqa: N803
+        saved_state = StateClass(**details)
+        saved_state.save()
+        bulk_state = bulk_create_states([StateClass(**details)])[0]
+
+        saved_state = StateClass.objects.get(pk=saved_state.id)
+        bulk_state = StateClass.objects.get(pk=bulk_state.id)
+        for field in ["ubid", "normalized_address", "hash_object", "latitude", "longitude", "geocoding_confidence"]:
+            self.assertEqual(getattr(saved_state, field), getattr(bulk_state, field), field)
+        self.assertEqual(long_lat_wkt(saved_state), long_lat_wkt(bulk_state))
+        self.assertEqual(saved_state.bounding_box, bulk_state.bounding_box)
+        self.assertEqual(saved_state.centroid, bulk_state.centroid)
+
+        state_field = "property" if StateClass == PropertyState else "taxlot"
+        self.assertEqual(
+            list(UbidModel.objects.filter(**{state_field: saved_state}).order_by("ubid").values_list("ubid", "preferred")),
+            list(UbidModel.objects.filter(**{state_field: bulk_state}).order_by("ubid").values_list("ubid", "preferred")),
+        )
+
+    def test_bulk_create_states_matches_save(self):
+        details = self.property_state_factory.get_details()
+        details["organization_id"] = self.org.id
+        details["address_line_1"] = "123 Main Street"
+        details["ubid"] = "86HJPCWQ+2VV-1-3-2-3;  86HJPCWQ+2VW-1-3-2-3"
+        self._assert_same_as_saved(PropertyState, details)
+
+        details = self.taxlot_state_factory.get_details()
+        details["organization_id"] = self.org.id
+        details["ubid"] = "86HJPCWQ+2VV-1-3-2-3"
+        self._assert_same_as_saved(TaxLotState, details)
+
+    def test_bulk_create_states_without_ubid(self):
+        details = self.property_state_factory.get_details()
+        details["organization_id"] = self.org.id
+        details["ubid"] = None
+        self._assert_same_as_saved(PropertyState, details)
+
+    def test_bulk_update_states_syncs_long_lat(self):
+        details = self.property_state_factory.get_details()
+        details["organization_id"] = self.org.id
+        states = bulk_create_states([PropertyState(**details), PropertyState(**details)])
+
+        states[0].latitude = 39.74
+        states[0].longitude = -104.98
+        states[1].extra_data = {"new_field": "new value"}
+        bulk_update_states(states, ["latitude", "longitude", "extra_data"])
+
+        updated = PropertyState.objects.get(pk=states[0].id)
+        self.assertEqual(long_lat_wkt(updated), "POINT (-104.98 39.74)")
+        self.assertEqual(updated.geocoding_confidence, "Manually geocoded (N/A)")
+
+        unchanged = PropertyState.objects.get(pk=states[1].id)
+        self.assertIsNone(unchanged.long_lat)
+        self.assertEqual(unchanged.extra_data, {"new_field": "new value"})
+
+        # the hash matches what save would compute
+        hash_object = unchanged.hash_object
+        unchanged.save()
+        self.assertEqual(hash_object, unchanged.hash_object)
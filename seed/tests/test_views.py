@@ -15,7 +15,18 @@ from seed.landing.models import SEEDUser as User
 from seed.lib.mcm.reader import ROW_DELIMITER
 from seed.lib.progress_data.progress_data import ProgressData
 from seed.lib.superperms.orgs.models import OrganizationUser
-from seed.models import VIEW_LIST_TAXLOT, Column, ColumnMapping, PropertyView, StatusLabel, TaxLot, TaxLotProperty, TaxLotView, Unit
+from seed.models import (
+    DATA_STATE_MATCHING,
+    VIEW_LIST_TAXLOT,
+    Column,
+    ColumnMapping,
+    PropertyView,
+    StatusLabel,
+    TaxLot,
+    TaxLotProperty,
+    TaxLotView,
+    Unit,
+)
 from seed.test_helpers.fake import (
     FakeColumnFactory,
     FakeColumnListProfileFactory,
@@ -253,10 +264,23 @@ class ImportFileViewsTests(TestCase):
         self.assertFalse(ImportFile.objects.filter(pk=self.import_file.pk).exists())
 
     def test_get_matching_and_geocoding_results(self):
+        property_state_factory = FakePropertyStateFactory(organization=self.org)
+        for geocoding_confidence in ["High (P1AAA)", "High (P1AAB)", "Low (P1CCC)", "Manually geocoded (N/A)", None]:
+            property_state_factory.get_property_state(
+                import_file=self.import_file, data_state=DATA_STATE_MATCHING, geocoding_confidence=geocoding_confidence
+            )
+        # states that were not matched are not counted
+        property_state_factory.get_property_state(import_file=self.import_file, geocoding_confidence="High (P1AAA)")
+
         response = self.client.get(
             "/api/v3/import_files/" + str(self.import_file.pk) + "/matching_and_geocoding_results/?organization_id=" + str(self.org.pk)
         )
         self.assertEqual("success", response.json()["status"])
+        self.assertEqual(response.json()["properties"]["geocoded_high_confidence"], 2)
+        self.assertEqual(response.json()["properties"]["geocoded_low_confidence"], 1)
+        self.assertEqual(response.json()["properties"]["geocoded_manually"], 1)
+        self.assertEqual(response.json()["properties"]["geocode_not_possible"], 0)
+        self.assertEqual(response.json()["tax_lots"]["geocoded_high_confidence"], 0)
 
 
 class TestMCMViews(TestCase):
@@ -47,8 +47,8 @@ def get_cache(progress_key, default=None):
         # Cache accessed before it was created
         data = {"status": "parsing", "progress": 0.0}
     else:
-        # Set cache to same value to reset timeout
-        set_cache(progress_key, data["status"], data)
+        # Reset the timeout without writing the data back, which could overwrite a concurrent update
+        django_cache.touch(progress_key, DEFAULT_TIMEOUT)
     return data
 
 
@@ -91,6 +91,12 @@ def get_lock(lock_key, default=0):
     return get_cache_raw(lock_key, default)
 
 
+def increment_cache_raw(key, delta=1, initial=0, timeout=DEFAULT_TIMEOUT):
+    """Atomically increment the integer in the cache key by delta, starting from initial if the key doesn't exist"""
+    django_cache.add(key, initial, timeout)
+    return django_cache.incr(key, delta)
+
+
 def increment_cache(key, increment):
     """Increment cache by value increment, never exceed 100."""
     increment = round(increment, 2)
@@ -28,7 +28,41 @@ def long_lat_wkt(state):
     for the GIS fields on the PropertyState and TaxLotState models.
     """
     if state.long_lat:
-        return GEOSGeometry(state.long_lat, srid=4326).wkt
+        geom = state.long_lat
+        return geom.wkt if isinstance(geom, GEOSGeometry) else GEOSGeometry(geom, srid=4326).wkt
+
+
+def sync_long_lat(state, original_state):
+    """
+    Sync the long_lat and geocoding_confidence of a state with its latitude and longitude, given the
+    values of the state in the database. Used by the pre_save receivers of the states and when states
+    are updated in bulk.
+
+    :param state: PropertyState or TaxLotState, with the values to be saved
+    :param original_state: the same state as it is in the database
+    """
+    latitude_change = original_state.latitude != state.latitude
+    longitude_change = original_state.longitude != state.longitude
+    long_lat_change = original_state.long_lat != state.long_lat
+    lat_and_long_both_populated = state.latitude is not None and state.longitude is not None
+    # The 'not long_lat_change' condition removes the case when long_lat is changed by an external API,
+    # so the first block below is when a user manually changes the lat/long and the geocoding confidence
+    # needs to be updated to "manually" (or keep as Census Geocoder for properties)
+    if (latitude_change or longitude_change) and lat_and_long_both_populated and not long_lat_change:
+        state.long_lat = f"POINT ({state.longitude} {state.latitude})"
+        # keep Census Geocoder confidence of properties if newly present in the string
+        keep_census_confidence = (
+            state.__class__.__name__ == "PropertyState"
+            and state.geocoding_confidence is not None
+            and "Census Geocoder" in state.geocoding_confidence
+            and "Census Geocoder" not in (original_state.geocoding_confidence or "")
+        )
+        if not keep_census_confidence:
+            state.geocoding_confidence = "Manually geocoded (N/A)"
+
+    elif (latitude_change or longitude_change) and not lat_and_long_both_populated:
+        state.long_lat = None
+        state.geocoding_confidence = None
 
 
 def wkt_to_polygon(wkt_to_translate):
@@ -41,7 +75,8 @@ def bounding_box_wkt(state):
     This translates GIS data saved as binary (WKB) into a text string (WKT).
     """
     if state.bounding_box:
-        return GEOSGeometry(state.bounding_box, srid=4326).wkt
+        geom = state.bounding_box
+        return geom.wkt if isinstance(geom, GEOSGeometry) else GEOSGeometry(geom, srid=4326).wkt
 
 
 def create_geocoded_additional_columns(organization: Organization):
@@ -24,7 +24,7 @@ from seed.models import (
     TaxLotProperty,
     TaxLotView,
 )
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 from seed.utils.search import FilterError, build_view_filters_and_sorts
 
 
@@ -244,7 +244,7 @@ def get_filtered_results(request: Request, inventory_type: Literal["property", "
 
     # collapse units here so we're only doing the last page; we're already a
     # realized list by now and not a lazy queryset
-    unit_collapsed_results = [apply_display_unit_preferences(org, x) for x in related_results]
+    unit_collapsed_results = apply_display_unit_preferences_to_page(org, related_results)
 
     response = {
         "pagination": {
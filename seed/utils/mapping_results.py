@@ -0,0 +1,102 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+from seed.models import (
+    DATA_STATE_MAPPING,
+    DATA_STATE_MATCHING,
+    MERGE_STATE_NEW,
+    MERGE_STATE_UNKNOWN,
+    Column,
+    PropertyState,
+    TaxLotProperty,
+    TaxLotState,
+)
+from seed.serializers.pint import DEFAULT_UNITS, apply_display_unit_preferences
+
+# Fields of the states that are returned regardless of the mapping
+MAPPING_RESULTS_FIELDS = {"PropertyState": ["id", "extra_data", "lot_number"], "TaxLotState": ["id", "extra_data"]}
+
+MAPPING_RESULTS_STATE_CLASSES = {"PropertyState": PropertyState, "TaxLotState": TaxLotState}
+
+# most states returned in one page of mapping results
+MAPPING_RESULTS_MAX_PER_PAGE = 1000
+
+
+def get_mapped_columns(import_file, org_id):
+    """
+    Find the columns that an import file was mapped to
+
+    :param import_file: ImportFile
+    :param org_id: int
+    :return: dict, keyed by table name, with the mapped columns (in dict format), the mapping of the column
+             names to the API names, the database fields to load, and the units of the extra data columns
+    """
+    columns_by_table_and_name = {(column["table_name"], column["column_name"]): column for column in Column.retrieve_all(org_id)}
+
+    mapped_columns = {
+        table_name: {"columns": [], "column_name_mapping": {}, "fields": list(fields), "extra_data_units": {}}
+        for table_name, fields in MAPPING_RESULTS_FIELDS.items()
+    }
+    for table_name, column_name in import_file.get_cached_mapped_columns:
+        column = columns_by_table_and_name.get((table_name, column_name))
+        if column is None or table_name not in mapped_columns:
+            continue
+
+        mapped_table = mapped_columns[table_name]
+        mapped_table["columns"].append(column)
+        mapped_table["column_name_mapping"][column_name] = column["name"]
+        if not column["is_extra_data"]:
+            mapped_table["fields"].append(column_name)
+        elif table_name == "PropertyState" and DEFAULT_UNITS.get(column["data_type"]):
+            mapped_table["extra_data_units"][column_name] = DEFAULT_UNITS[column["data_type"]]
+
+    return mapped_columns
+
+
+def get_mapped_states(import_file_id, table_name, fields):
+    """
+    Return the states of an import file that were mapped and not merged, with their raw access level
+    instance in the same query
+
+    :param import_file_id: int
+    :param table_name: str, PropertyState or TaxLotState
+    :param fields: list, database fields of the state to load, see get_mapped_columns
+    :return: QuerySet
+    """
+    return (
+        MAPPING_RESULTS_STATE_CLASSES[table_name]
+        .objects.filter(
+            import_file_id=import_file_id,
+            data_state__in=[DATA_STATE_MAPPING, DATA_STATE_MATCHING],
+            merge_state__in=[MERGE_STATE_UNKNOWN, MERGE_STATE_NEW],
+        )
+        .select_related("raw_access_level_instance")
+        .only(*fields, "raw_access_level_instance_error", "raw_access_level_instance__path")
+        .order_by("id")
+    )
+
+
+def mapped_state_to_dict(state, org, mapped_table):
+    """
+    Convert a mapped state to the dict of the mapping results, keyed by the API names of the columns
+
+    :param state: PropertyState or TaxLotState, from get_mapped_states
+    :param org: Organization
+    :param mapped_table: dict, the mapped columns of the state table, see get_mapped_columns
+    :return: dict
+    """
+    state_dict = TaxLotProperty.model_to_dict_with_mapping(
+        state, mapped_table["column_name_mapping"], fields=mapped_table["fields"], exclude=["extra_data"]
+    )
+    state_dict.update(
+        TaxLotProperty.extra_data_to_dict_with_mapping(
+            state.extra_data, mapped_table["column_name_mapping"], fields=state.extra_data.keys(), units=mapped_table["extra_data_units"]
+        ).items()
+    )
+    if state.raw_access_level_instance is not None:
+        state_dict.update(state.raw_access_level_instance.path)
+    state_dict["raw_access_level_instance_error"] = state.raw_access_level_instance_error
+
+    return apply_display_unit_preferences(org, state_dict)
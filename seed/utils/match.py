@@ -8,6 +8,7 @@ from django.contrib.postgres.aggregates.general import ArrayAgg
 from django.db import transaction
 from django.db.models import Subquery
 from django.db.models.aggregates import Count
+from django.utils import timezone
 
 from seed.lib.progress_data.progress_data import ProgressData
 from seed.lib.superperms.orgs.models import AccessLevelInstance
@@ -180,6 +181,89 @@ def _link_matches(matching_views, org_id, view, ViewClass):  # noqa: N803
     return len(matching_views) - 1
 
 
+def _link_matches_in_memory(matching_views, org_id, view, ViewClass, canonical_view_ids, updated_views):  # noqa: N803
+    """
+    Same as _link_matches, but the -Views are not saved so that many -Views can be linked with
+    a few queries. Use save_linked_views to save the -Views in updated_views afterwards.
+
+    :param canonical_view_ids: dict, canonical record ID to the set of IDs of its -Views, used to
+        check for previous links instead of querying. It is updated as the -Views are relinked.
+    :param updated_views: dict, -View ID to the -Views that got a new canonical record
+    :return: int, the count of matches
+    """
+    if ViewClass == PropertyView:
+        CanonicalClass = Property
+        canonical_id_col = "property_id"
+    elif ViewClass == TaxLotView:
+        CanonicalClass = TaxLot
+        canonical_id_col = "taxlot_id"
+
+    def relink(v, canonical_id):
+        canonical_view_ids[getattr(v, canonical_id_col)].discard(v.id)
+        setattr(v, canonical_id_col, canonical_id)
+        canonical_view_ids[canonical_id].add(v.id)
+        updated_views[v.id] = v
+
+    # Exclude target and capture unique canonical IDs
+    unique_canonical_ids = {getattr(v, canonical_id_col) for v in matching_views if v.id != view.id}
+
+    if len(unique_canonical_ids) == 0:
+        # If no matches found - check for past links and disassociate if necessary
+        if canonical_view_ids[getattr(view, canonical_id_col)] - {view.id}:
+            new_record = CanonicalClass.objects.create(organization_id=org_id)
+
+            if CanonicalClass == Property:
+                new_record.copy_meters(view.property_id)
+
+            relink(view, new_record.id)
+    elif len(unique_canonical_ids) == 1:
+        # If all matches are linked already - use the linking ID
+        linking_id = next(iter(unique_canonical_ids))
+
+        if CanonicalClass == Property:
+            Property(id=linking_id).copy_meters(view.property_id)
+
+        relink(view, linking_id)
+    else:
+        # In this case, all matches are NOT linked already - use new canonical record to link
+        new_record = CanonicalClass.objects.create(organization_id=org_id)
+
+        if CanonicalClass == Property:
+            # Copy meters by highest ID order and lastly for the given Property
+            sorted_canonical_ids = sorted(unique_canonical_ids)
+            sorted_canonical_ids.append(view.property_id)
+            for id in sorted_canonical_ids:
+                new_record.copy_meters(id)
+
+        for v in matching_views:
+            relink(v, new_record.id)
+
+    return len(matching_views) - 1
+
+
+def save_linked_views(views, ViewClass):  # noqa: N803
+    """
+    Save the canonical records of -Views linked with _link_matches_in_memory in bulk.
+
+    :param views: list of PropertyViews or TaxLotViews
+    :param ViewClass: PropertyView or TaxLotView
+    """
+    if not views:
+        return
+
+    if ViewClass == PropertyView:
+        CanonicalClass = Property
+        canonical_id_col = "property_id"
+    elif ViewClass == TaxLotView:
+        CanonicalClass = TaxLot
+        canonical_id_col = "taxlot_id"
+
+    ViewClass.objects.bulk_update(views, [canonical_id_col])
+
+    # bulk_update doesn't send post_save, which touches the canonical records of the -Views
+    CanonicalClass.objects.filter(id__in={getattr(v, canonical_id_col) for v in views}).update(updated=timezone.now())
+
+
 def match(state, cycle_id, matching_criteria_column_names=[]):
     org_id = state.organization_id
 
@@ -476,7 +560,5 @@ def update_sub_progress_total(total, sub_progress_key=None, finish=False):
         sub_progress_data = ProgressData.from_key(sub_progress_key)
         if finish:
             sub_progress_data.finish_with_success()
-        sub_progress_data.delete()
-        sub_progress_data.total = total
-        sub_progress_data.save()
+        sub_progress_data.reset_total(total)
         return sub_progress_data
@@ -3,10 +3,10 @@ SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and othe
 See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
-from calendar import monthrange
 from collections import defaultdict
-from datetime import datetime, time, timedelta
+from datetime import datetime
 
+from django.db import connection
 from django.utils.timezone import make_aware
 from pytz import timezone
 
@@ -15,6 +15,65 @@ from seed.data_importer.utils import kbtu_thermal_conversion_factors, kgal_water
 from seed.lib.superperms.orgs.models import Organization
 from seed.models import Meter, Service
 
+# Monthly totals of each meter's readings. Readings are split across the (local time) months they
+# span by the share of the reading's seconds that fall within each month.
+MONTHLY_READINGS_SQL = """
+    SELECT meter_id, month, SUM(reading * (overlap_seconds / total_seconds) ORDER BY start_time)
+    FROM (
+        SELECT
+            reading.meter_id,
+            reading.start_time,
+            reading.reading,
+            month.start AS month,
+            EXTRACT(EPOCH FROM reading.end_time - reading.start_time) AS total_seconds,
+            EXTRACT(
+                EPOCH FROM LEAST(reading.end_time, (month.start + INTERVAL '1 month') AT TIME ZONE %(tz)s)
+                - GREATEST(reading.start_time, month.start AT TIME ZONE %(tz)s)
+            ) AS overlap_seconds
+        FROM seed_meterreading reading
+        CROSS JOIN LATERAL generate_series(
+            date_trunc('month', reading.start_time AT TIME ZONE %(tz)s),
+            date_trunc('month', reading.end_time AT TIME ZONE %(tz)s),
+            INTERVAL '1 month'
+        ) AS month(start)
+        WHERE reading.meter_id = ANY(%(meter_ids)s) AND reading.end_time > reading.start_time
+    ) AS prorated
+    WHERE overlap_seconds > 0
+    GROUP BY meter_id, month
+"""
+
+# Yearly totals of each meter's readings that are fully contained within a (local time) year, and
+# whether the year has overlapping or negative readings, whose total can't simply be summed.
+YEARLY_READINGS_SQL = """
+    SELECT
+        meter_id,
+        year,
+        SUM(reading ORDER BY end_time),
+        BOOL_OR(start_time < previous_end_time OR reading < 0 OR reading IS NULL)
+    FROM (
+        SELECT
+            meter_id,
+            year,
+            start_time,
+            end_time,
+            reading,
+            LAG(end_time) OVER (PARTITION BY meter_id, year ORDER BY end_time) AS previous_end_time
+        FROM (
+            SELECT
+                reading.meter_id,
+                reading.start_time,
+                reading.end_time,
+                reading.reading,
+                EXTRACT(YEAR FROM reading.start_time AT TIME ZONE %(tz)s)::integer AS year
+            FROM seed_meterreading reading
+            WHERE reading.meter_id = ANY(%(meter_ids)s)
+                AND reading.end_time <= (date_trunc('year', reading.start_time AT TIME ZONE %(tz)s) + INTERVAL '1 year') AT TIME ZONE %(tz)s
+        ) AS contained
+    ) AS ordered
+    GROUP BY meter_id, year
+    ORDER BY meter_id, year
+"""
+
 
 class PropertyMeterReadingsExporter:
     """
@@ -109,10 +168,9 @@ class PropertyMeterReadingsExporter:
         Returns readings and column definitions formatted and aggregated to display all
         records in monthly intervals.
 
-        At a high-level, following algorithm is used to accomplish this:
-            - Identify the first start time and last end time
-            - Define a range of dates between start and end time that fall within a month
-            - For each month in the date range, aggregate the readings found in that month using a linear relationship down to the second.
+        The readings are split across the months they span in the database, using a linear
+        relationship between the seconds of the reading within the month and the reading's
+        total seconds. See MONTHLY_READINGS_SQL.
         """
         # Used to consolidate different readings (types) within the same month
         monthly_readings = defaultdict(dict)
@@ -125,55 +183,34 @@ class PropertyMeterReadingsExporter:
             },
         }
 
-        for meter in self.meters:
-            field_name, conversion_factor = self._build_column_def(meter, column_defs)
+        meters_by_id = {meter.id: meter for meter in self.meters}
+        column_def_by_meter_id = {meter_id: self._build_column_def(meter, column_defs) for meter_id, meter in meters_by_id.items()}
 
-            # iterate through each usage and assign to accumulator
-            for usage in meter.meter_readings.values():
-                st, et = usage["start_time"], usage["end_time"]
-                total_seconds = round((et - st).total_seconds())
-                ranges = self._get_month_ranges(st, et)
-
-                # partial usages of the full usage are calculated from a linear relationship between the range_seconds to the total_seconds
-                for range in ranges:
-                    range_seconds = round((range[1] - range[0]).total_seconds())
-                    if range_seconds == 0:
-                        continue
-                    month_key = range[1].strftime("%B %Y")
-                    reading = usage["reading"] / total_seconds * range_seconds / conversion_factor
-                    if reading is not None:
-                        monthly_readings[month_key] = monthly_readings.get(month_key, {"month": month_key})
-                        monthly_readings[month_key][field_name] = round(monthly_readings[month_key].get(field_name, 0) + reading, 2)
+        with connection.cursor() as cursor:
+            cursor.execute(MONTHLY_READINGS_SQL, {"meter_ids": list(meters_by_id), "tz": TIME_ZONE})
+            rows = cursor.fetchall()
+
+        for meter_id, month, total in rows:
+            if total is None:
+                continue
+            field_name, conversion_factor = column_def_by_meter_id[meter_id]
+            month_key = month.strftime("%B %Y")
+            monthly_readings[month_key] = monthly_readings.get(month_key, {"month": month_key})
+            monthly_readings[month_key][field_name] = round(monthly_readings[month_key].get(field_name, 0) + total / conversion_factor, 2)
 
         sorted_readings = sorted(monthly_readings.values(), key=lambda reading: datetime.strptime(reading["month"], "%B %Y"))
 
         return {"readings": sorted_readings, "column_defs": list(column_defs.values())}
 
-    def _get_month_ranges(self, st, et):
-        """
-        Given two dates start time (st) and end date time (et)
-        return a list of date ranges that are within a single month
-        ex:
-            st = may 15th 2020
-            et = july 10th 2020
-            ranges = [[may 15, may 31], [june 1, june 30], [july 1, july 10]]
-        """
-        month_count = (et.year - st.year) * 12 + et.month - st.month + 1
-        start = st
-        ranges = []
-        for idx in range(month_count):
-            end_of_month = make_aware(
-                datetime.combine(start.replace(day=monthrange(start.year, start.month)[1]), time.max), timezone=self.tz
-            )
-            end_of_month = min(et, end_of_month)
-            ranges.append([start, end_of_month])
-            start = end_of_month + timedelta(microseconds=1)
-        return ranges
-
     def _usages_by_year(self):
         """
         Similarly to _usages_by_month, this returns readings and column definitions
         formatted and aggregated to display all records in yearly intervals.
+
+        Only readings that are fully contained in a year are counted, and overlapping readings
+        within a year are resolved to the maximum total of non-overlapping readings. The totals
+        are summed in the database, and only the years with overlapping (or negative) readings
+        are loaded and resolved with _max_reading_total.
         """
         # Used to consolidate different readings (types) within the same year
         yearly_readings = defaultdict(dict)
@@ -186,32 +223,30 @@ class PropertyMeterReadingsExporter:
             },
         }
 
-        for meter in self.meters:
-            field_name, conversion_factor = self._build_column_def(meter, column_defs)
-
-            min_time = meter.meter_readings.earliest("start_time").start_time.astimezone(tz=self.tz)
-            max_time = meter.meter_readings.latest("end_time").end_time.astimezone(tz=self.tz)
-
-            # Iterate through years
-            current_year_time = min_time
-            while current_year_time < max_time:
-                unaware_end = datetime((current_year_time.year + 1), 1, 1, 0, 0, 0)
-                end_of_year = make_aware(unaware_end, timezone=self.tz)
-
-                # Find all meters fully contained within this month (second-level granularity)
-                interval_readings = meter.meter_readings.filter(
-                    start_time__range=(current_year_time, end_of_year), end_time__range=(current_year_time, end_of_year)
-                )
-                if interval_readings.exists():
-                    readings_list = list(interval_readings.order_by("end_time"))
+        meters_by_id = {meter.id: meter for meter in self.meters}
+        column_def_by_meter_id = {meter_id: self._build_column_def(meter, column_defs) for meter_id, meter in meters_by_id.items()}
+
+        with connection.cursor() as cursor:
+            cursor.execute(YEARLY_READINGS_SQL, {"meter_ids": list(meters_by_id), "tz": TIME_ZONE})
+            rows_by_meter_id = defaultdict(list)
+            for meter_id, year, total, needs_resolving in cursor.fetchall():
+                rows_by_meter_id[meter_id].append((year, total, needs_resolving))
+
+        for meter_id, meter in meters_by_id.items():
+            field_name, conversion_factor = column_def_by_meter_id[meter_id]
+            for year, total, needs_resolving in rows_by_meter_id[meter_id]:
+                reading_year_total = total
+                if needs_resolving:
+                    start_of_year = make_aware(datetime(year, 1, 1, 0, 0, 0), timezone=self.tz)
+                    end_of_year = make_aware(datetime(year + 1, 1, 1, 0, 0, 0), timezone=self.tz)
+                    readings_list = list(
+                        meter.meter_readings.filter(start_time__gte=start_of_year, end_time__lte=end_of_year).order_by("end_time")
+                    )
                     reading_year_total = self._max_reading_total(readings_list)
 
-                    if reading_year_total > 0:
-                        year = current_year_time.year
-                        yearly_readings[year]["year"] = year
-                        yearly_readings[year][field_name] = reading_year_total / conversion_factor
-
-                current_year_time = end_of_year
+                if reading_year_total > 0:
+                    yearly_readings[year]["year"] = year
+                    yearly_readings[year][field_name] = reading_year_total / conversion_factor
 
         return {"readings": list(yearly_readings.values()), "column_defs": list(column_defs.values())}
 
@@ -25,7 +25,7 @@ from seed.models import (
     TaxLotProperty,
     TaxLotView,
 )
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 
 logging.basicConfig(format="%(asctime)s %(levelname)-8s %(message)s", level=logging.ERROR, datefmt="%Y-%m-%d %H:%M:%S")
 
@@ -164,7 +164,7 @@ def properties_across_cycles(org_id, ali, profile_id, cycle_ids=[]):
         related_results = TaxLotProperty.serialize(property_views, show_columns, columns_from_database)
 
         org = Organization.objects.get(pk=org_id)
-        unit_collapsed_results = [apply_display_unit_preferences(org, x) for x in related_results]
+        unit_collapsed_results = apply_display_unit_preferences_to_page(org, related_results)
 
         results[cycle_id] = unit_collapsed_results
 
@@ -218,7 +218,7 @@ def _serialize_views(views_list, columns, org_id):
     # use api names and add units
     views_list = views_list.annotate(**annotations).values_list(*values_list)
     views_list = [dict(zip(returned_name, view)) for view in views_list]  # replace django readable name with api name
-    views_list = [apply_display_unit_preferences(org, view) for view in views_list]
+    views_list = apply_display_unit_preferences_to_page(org, views_list)
 
     return views_list
 
@@ -239,7 +239,7 @@ def properties_across_cycles_with_columns(org_id, show_columns=[], cycle_ids=[])
         related_results = TaxLotProperty.serialize(property_views, show_columns, columns_from_database)
 
         org = Organization.objects.get(pk=org_id)
-        unit_collapsed_results = [apply_display_unit_preferences(org, x) for x in related_results]
+        unit_collapsed_results = apply_display_unit_preferences_to_page(org, related_results)
 
         results[cycle_id] = unit_collapsed_results
 
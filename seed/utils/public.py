@@ -1,31 +1,37 @@
 import datetime
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import OrderedDict
 from functools import reduce
+from math import ceil
 from operator import or_
 from urllib.parse import urlencode
 
 import pint
-from django.core.paginator import EmptyPage, Paginator
-from django.db.models import Q
-from django.db.models.functions import Lower
+from django.db.models import BigIntegerField, Count, F, Max, Q, Sum
+from django.db.models.functions import Cast, Lower
 
-from seed.models import Column, PropertyState, TaxLotState
+from seed.models import Column, PropertyState, PropertyView, TaxLotState, TaxLotView
+from seed.utils.cache import get_cache_raw, set_cache_raw
 from seed.utils.generic import get_int
 from seed.utils.geocode import bounding_box_wkt, long_lat_wkt
 from seed.utils.tax_lot_properties import json_response
 from seed.utils.ubid import centroid_wkt
 
+PUBLIC_FEED_CACHE_TIMEOUT = 60 * 60
+PUBLIC_FEED_VERSION_CACHE_TIMEOUT = 60
+# view and state classes of the inventory types of the feed, in the order they are returned
+PUBLIC_FEED_INVENTORY = OrderedDict(
+    [
+        ("properties", (PropertyView, PropertyState)),
+        ("taxlots", (TaxLotView, TaxLotState)),
+    ]
+)
 
-def public_feed(org, request, cycles, endpoint="feed"):
-    """
-    Format all property and taxlot state data to be displayed on a public feed
-    """
-    base_url = request.build_absolute_uri("/")
+
+def _get_feed_params(org, request):
     params = request.query_params
-    page = get_int(params.get("page"), 1)
-    per_page = get_int(params.get("per_page"), 100)
-    properties_param = params.get("properties", "true").lower() == "true"
-    taxlots_param = params.get("taxlots", "true").lower() == "true"
     if not org.public_feed_labels:
         labels = "Disabled"
     else:
@@ -33,21 +39,117 @@ def public_feed(org, request, cycles, endpoint="feed"):
         if labels is not None:
             labels = labels.split(",")
 
+    return {
+        "page": get_int(params.get("page"), 1),
+        "per_page": get_int(params.get("per_page"), 100),
+        "cursor": params.get("cursor"),
+        "properties": params.get("properties", "true").lower() == "true",
+        "taxlots": params.get("taxlots", "true").lower() == "true",
+        "labels": labels,
+    }
+
+
+def public_feed_version(org, request, cycles, endpoint="feed"):
+    """
+    Describe the current version of a public feed without reading its states. The ETag changes when the
+    request, the public settings and columns of the org, the views in the feed, their labels, or their states
+    change. The last modified time is the latest update of the states, which misses views and labels being
+    removed and states written with update(), so only the ETag tells if the feed changed.
+
+    The version is cached for PUBLIC_FEED_VERSION_CACHE_TIMEOUT per org and request, so that polling the
+    feed with conditional requests doesn't aggregate its views every time. Changes to the inventory and
+    columns show up in the feed once the cached version expires.
+
+    :return: dict, with the etag, last_modified datetime (or None when the feed is empty), and the counts
+        and public columns of each inventory type, to be passed on to public_feed
+    """
+    feed_request = {
+        "organization": [org.id, org.name, org.public_feed_labels],
+        "endpoint": endpoint,
+        "base_url": request.build_absolute_uri("/"),
+        "query_params": sorted(request.query_params.lists()),
+        "cycles": cycles,
+    }
+    request_digest = hashlib.md5(json.dumps(feed_request, sort_keys=True, default=str).encode("utf-8")).hexdigest()  # noqa: S324
+    cache_key = f"public_feed_version:{org.id}:{request_digest}"
+    version = get_cache_raw(cache_key)
+    if version is None:
+        version = _read_public_feed_version(org, request, cycles, endpoint, feed_request)
+        set_cache_raw(cache_key, version, PUBLIC_FEED_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def _read_public_feed_version(org, request, cycles, endpoint, feed_request):
+    params = _get_feed_params(org, request)
+    inventory = {}
+    columns = {}
+    for name, (view_class, state_class) in PUBLIC_FEED_INVENTORY.items():
+        if not params[name]:
+            continue
+        aggregates = {"count": Count("id"), "max_id": Max("id"), "states": Sum("state_id"), "updated": Max("state__updated")}
+        if org.public_feed_labels:
+            # labels are listed in the feed, but changing them doesn't update the state. Sum the (view, label)
+            # pairs, which change when a label moves to another view as well as when one is added or removed
+            aggregates["count"] = Count("id", distinct=True)
+            aggregates["label_count"] = Count("labels")
+            aggregates["view_labels"] = Sum(Cast("id", BigIntegerField()) * F("labels__id"))
+        inventory[name] = _feed_views(view_class, cycles, org, params["labels"]).aggregate(**aggregates)
+        columns[name] = list(_public_columns(org, state_class, endpoint))
+
+    definition = {**feed_request, "inventory": inventory, "columns": columns}
+    updated = [counts["updated"] for counts in inventory.values() if counts["updated"] is not None]
+    return {
+        "etag": hashlib.md5(json.dumps(definition, sort_keys=True, default=str).encode("utf-8")).hexdigest(),  # noqa: S324
+        "last_modified": max(updated) if updated else None,
+        "inventory": inventory,
+        "columns": columns,
+    }
+
+
+def public_feed(org, request, cycles, endpoint="feed", version=None):
+    """
+    Format all property and taxlot state data to be displayed on a public feed. Pages are read by page number,
+    or by the cursor of the previous page, which reads the page from an index rather than skipping the views
+    of the previous pages.
+    """
+    base_url = request.build_absolute_uri("/")
+    params = _get_feed_params(org, request)
+    page = params["page"]
+    per_page = params["per_page"]
+    labels = params["labels"]
+    if version is None:
+        version = public_feed_version(org, request, cycles, endpoint)
+    positions = _decode_cursor(params["cursor"])
+
     data = {}
-    p_count = 0
-    t_count = 0
-    if properties_param:
-        data["properties"], p_count = _add_states_to_data(
-            base_url, PropertyState, "propertyview", page, per_page, labels, cycles, org, endpoint
-        )
+    counts = {}
+    next_positions = {}
+    for name, (view_class, _) in PUBLIC_FEED_INVENTORY.items():
+        if not params[name]:
+            continue
+        counts[name] = version["inventory"][name]["count"]
+        if positions is None:
+            # read the page by number, showing the last page past the end as the paginator did
+            num_pages = max(ceil(counts[name] / per_page), 1)
+            offset, position = (min(page, num_pages) - 1) * per_page, None
+        elif positions.get(name) is None:
+            # this inventory type ended on an earlier page
+            data[name], next_positions[name] = [], None
+            continue
+        else:
+            offset, position = 0, positions[name]
 
-    if taxlots_param:
-        data["taxlots"], t_count = _add_states_to_data(base_url, TaxLotState, "taxlotview", page, per_page, labels, cycles, org, endpoint)
+        data[name], next_positions[name] = _add_states_to_data(
+            base_url, name, view_class, offset, position, per_page, labels, cycles, org, endpoint, version["columns"][name]
+        )
 
+    p_count = counts.get("properties", 0)
+    t_count = counts.get("taxlots", 0)
     pagination = {
         "page": page,
         "total_pages": int(max(p_count, t_count) / per_page) + 1,
         "per_page": per_page,
+        "next_cursor": _encode_cursor(next_positions) if any(next_positions.values()) else None,
     }
 
     if endpoint == "html":
@@ -55,9 +157,9 @@ def public_feed(org, request, cycles, endpoint="feed"):
     else:
         organization = {"id": org.id, "name": org.name}
 
-    if properties_param:
+    if params["properties"]:
         pagination["property_count"] = p_count
-    if taxlots_param:
+    if params["taxlots"]:
         pagination["taxlot_count"] = t_count
 
     return {
@@ -65,26 +167,25 @@ def public_feed(org, request, cycles, endpoint="feed"):
         "query_params": {
             "labels": labels,
             "cycle_ids": cycles if cycles else "all",
-            "properties": properties_param,
-            "taxlots": taxlots_param,
+            "properties": params["properties"],
+            "taxlots": params["taxlots"],
         },
         "organization": organization,
         "data": data,
     }
 
 
-def _add_states_to_data(base_url, state_class, view_string, page, per_page, labels, cycles, org, endpoint):
-    states = state_class.objects.filter(**{f"{view_string}__cycle__in": cycles, "organization": org}).order_by("-updated")
+def _feed_views(view_class, cycles, org, labels):
+    views = view_class.objects.filter(cycle_id__in=cycles, state__organization=org)
 
     if labels is not None and org.public_feed_labels:
-        states = states.filter(**{f"{view_string}__labels__name__in": labels})
+        # filter with a subquery so that views with several of the labels aren't repeated
+        views = views.filter(id__in=view_class.objects.filter(labels__name__in=labels).values("id"))
+
+    return views
 
-    paginator = Paginator(states, per_page)
-    try:
-        states_paginated = paginator.page(page)
-    except EmptyPage:
-        states_paginated = paginator.page(paginator.num_pages)
 
+def _public_columns(org, state_class, endpoint):
     # Return public and or geojson fields
     base_query = Column.objects.filter(organization_id=org.id, table_name=state_class._meta.object_name)
     # selected public columns are tagged with shared_field_type = 1
@@ -96,17 +197,55 @@ def _add_states_to_data(base_url, state_class, view_string, page, per_page, labe
     # combine queries with 'or'
     queries = reduce(or_, queries)
 
-    public_columns = (
+    return (
         base_query.filter(queries)
         .annotate(column_name_lower=Lower("column_name"))
         .order_by("column_name_lower")
         .values_list("column_name", "is_extra_data")
     )
 
-    data = []
-    for state in states_paginated:
-        view = getattr(state, f"{view_string}_set").first()
 
+def _encode_cursor(positions):
+    return urlsafe_b64encode(json.dumps(positions).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    """
+    Read the positions of the last views of the previous page by inventory type, as (state updated, view id).
+
+    :return: dict, or None when there is no valid cursor and the page is read by number
+    """
+    if not cursor:
+        return None
+    try:
+        positions = json.loads(urlsafe_b64decode(cursor.encode("utf-8")))
+        return {
+            name: None if position is None else (datetime.datetime.fromisoformat(position[0]), int(position[1]))
+            for name, position in positions.items()
+            if name in PUBLIC_FEED_INVENTORY
+        }
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _add_states_to_data(base_url, inventory_type, view_class, offset, position, per_page, labels, cycles, org, endpoint, public_columns):
+    views = _feed_views(view_class, cycles, org, labels).select_related("state", "cycle").order_by("-state__updated", "-id")
+    if org.public_feed_labels:
+        views = views.prefetch_related("labels")
+    if position is not None:
+        updated, view_id = position
+        views = views.filter(Q(state__updated__lt=updated) | Q(state__updated=updated, id__lt=view_id))
+
+    # read one more view to know if there is a next page
+    views = list(views[offset : offset + per_page + 1])
+    next_position = None
+    if len(views) > per_page:
+        views = views[:per_page]
+        next_position = [views[-1].state.updated.isoformat(), views[-1].id]
+
+    data = []
+    for view in views:
+        state = view.state
         state_data = {"id": view.id}
 
         for name, extra_data in public_columns:
@@ -125,8 +264,8 @@ def _add_states_to_data(base_url, state_class, view_string, page, per_page, labe
 
             state_data[name] = value
 
-        json_link = f"{base_url}api/v3/{'properties' if isinstance(state, PropertyState) else 'taxlots'}/{view.id}/?organization_id={view.cycle.organization.id}"
-        html_link = f"{base_url}app/#/{'properties' if isinstance(state, PropertyState) else 'taxlots'}/{view.id}"
+        json_link = f"{base_url}api/v3/{inventory_type}/{view.id}/?organization_id={org.id}"
+        html_link = f"{base_url}app/#/{inventory_type}/{view.id}"
 
         # /geo.json
         if endpoint == "geojson":
@@ -148,14 +287,14 @@ def _add_states_to_data(base_url, state_class, view_string, page, per_page, labe
             state_data["html_link"] = html_link
         # add labels if enabled
         if org.public_feed_labels:
-            state_data["labels"] = ", ".join(view.labels.all().values_list("name", flat=True))
+            state_data["labels"] = ", ".join(label.name for label in view.labels.all())
         state_data.update(
             {"updated": state.updated.strftime("%Y/%m/%d, %H:%M:%S"), "created": state.created.strftime("%Y/%m/%d, %H:%M:%S")}
         )
 
         data.append(state_data)
 
-    return data, len(states)
+    return data, next_position
 
 
 def get_request_cycles(org, request):
@@ -196,8 +335,12 @@ def page_navigation_link(base_url, pagination, query_params, next_page):
         action_text = "Next"
         query_params["page"] = page + 1 if page < total_pages else total_pages
         condition = page < total_pages
+        # continue from the cursor of this page when there is one
+        if pagination.get("next_cursor"):
+            query_params["cursor"] = pagination["next_cursor"]
     else:
         action_text = "Previous"
+        query_params.pop("cursor", None)
         query_params["page"] = page - 1 if page > 1 else 1
         condition = page > 1
 
@@ -339,10 +482,10 @@ PUBLIC_HTML_STYLE = """
         """
 
 
-def public_geojson(org, cycle, request):
+def public_geojson(org, cycle, request, version=None):
     params = request.query_params
     taxlots_only = params.get("taxlots", "false").lower() == "true"
-    feed = public_feed(org, request, [cycle.id], "geojson")
+    feed = public_feed(org, request, [cycle.id], "geojson", version)
     title = f"Cycle {cycle.id} Public GeoJSON"
 
     if taxlots_only:
@@ -0,0 +1,259 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Cast
+from quantityfield.fields import QuantityField
+from quantityfield.units import ureg
+
+from seed.models import PropertyState
+from seed.serializers.pint import get_unit_conversion_plan
+from seed.utils.cache import get_cache_raw, set_cache_raw
+
+REPORT_AGGREGATION_CACHE_TIMEOUT = 60 * 60
+# number of bins of continuous y values, as in np.histogram_bin_edges(ys, bins=5)
+REPORT_AGGREGATION_BIN_COUNT = 5
+
+
+class WidthBucket(models.Func):
+    """
+    Postgres width_bucket(operand, thresholds), the bucket of the operand given the ascending lower
+    bounds of the buckets. Like np.digitize, values below the first bound are in bucket 0 and values
+    from the last bound up are in bucket len(thresholds).
+    """
+
+    function = "width_bucket"
+    output_field = models.IntegerField()
+
+
+class RoundFloat(models.Func):
+    """
+    Round a double precision value to a number of decimal places. Postgres only rounds numerics to decimal
+    places, so the value is rounded as a numeric and cast back.
+    """
+
+    template = "round((%(expressions)s)::numeric, %(places)d)::double precision"
+    output_field = models.FloatField()
+
+    def __init__(self, expression, places, **extra):
+        super().__init__(expression, places=int(places), **extra)
+
+
+@dataclass
+class ReportField:
+    """How the values of a report axis are stored in the database"""
+
+    # count, number, text, or value (booleans, dates, ...)
+    kind: str
+    # the units of the values in the database, for pint columns
+    base_units: Optional[str] = None
+
+    def has_data(self, name):
+        """Q of the views with data for the axis, like the falsy check of OrganizationViewSet.get_raw_report_data"""
+        if self.kind == "count":
+            return Q()
+        elif self.kind == "number":
+            return Q(**{f"{name}__isnull": False}) & ~Q(**{name: 0})
+        elif self.kind == "text":
+            return Q(**{f"{name}__isnull": False}) & ~Q(**{name: ""})
+        return Q(**{f"{name}__isnull": False})
+
+    def multiplier(self, plan):
+        """Multiplier from the database values to the organization's display units"""
+        if self.base_units is None:
+            return 1
+        return plan.multiplier(ureg(self.base_units).units)
+
+    def display_expression(self, name, plan):
+        """
+        Expression of the values in the organization's display units, rounded to its decimal places as
+        apply_display_unit_preferences rounds each value before it is aggregated in Python
+        """
+        if self.base_units is None:
+            return F(name)
+        value = Cast(name, models.FloatField())
+        multiplier = self.multiplier(plan)
+        if multiplier != 1:
+            value = value * Value(multiplier)
+        return RoundFloat(value, plan.decimal_places)
+
+
+def get_report_field(column, access_level_names):
+    """
+    Describe a report axis for aggregating it in the database
+
+    :param column: Column, access level name, or 'Count'
+    :param access_level_names: list, the access level names of the organization
+    :return: ReportField, or None when the axis can only be read in Python (extra data and derived columns)
+    """
+    if column == "Count":
+        return ReportField("count")
+    elif column in access_level_names:
+        return ReportField("text")
+    elif column.is_extra_data or column.derived_column:
+        return None
+
+    try:
+        field = PropertyState._meta.get_field(column.column_name)
+    except FieldDoesNotExist:
+        return None
+
+    if isinstance(field, QuantityField):
+        return ReportField("number", field.base_units)
+    elif isinstance(field, (models.IntegerField, models.FloatField, models.DecimalField)):
+        return ReportField("number")
+    elif isinstance(field, (models.CharField, models.TextField)):
+        return ReportField("text")
+    return ReportField("value")
+
+
+def aggregate_report_data(organization, property_views, cycles, x_var, y_var, aggregation_type="Average"):
+    """
+    Aggregate x by the bins of y for each cycle in the database. Continuous y values are split into
+    REPORT_AGGREGATION_BIN_COUNT bins from their min to their max with width_bucket, and discrete y values
+    are their own bins. Results are cached until the views or their states change.
+
+    :param organization: Organization
+    :param property_views: PropertyView queryset annotated with x and y, see OrganizationViewSet.setup_report_data
+    :param cycles: list of the Cycles of the report
+    :param x_var: Column or 'Count'
+    :param y_var: Column or access level name
+    :param aggregation_type: str, Average or Sum
+    :return: dict of the chart_data and property_counts, or None when an axis can't be aggregated in the database
+    """
+    x_field = get_report_field(x_var, organization.access_level_names)
+    y_field = get_report_field(y_var, organization.access_level_names)
+    if x_field is None or x_field.kind not in {"count", "number"} or y_field is None or y_field.kind == "count":
+        return None
+
+    # remove the ordering by id so that it isn't grouped by
+    property_views = property_views.order_by()
+    cache_key = _report_cache_key(organization, property_views, cycles, x_var, y_var, aggregation_type)
+    result = get_cache_raw(cache_key)
+    if result is None:
+        result = _aggregate_report_data(organization, property_views, cycles, x_field, y_field, y_var, aggregation_type)
+        set_cache_raw(cache_key, result, REPORT_AGGREGATION_CACHE_TIMEOUT)
+
+    return result
+
+
+def _aggregate_report_data(organization, property_views, cycles, x_field, y_field, y_var, aggregation_type):
+    plan = get_unit_conversion_plan(organization)
+    # read x and y in display units, as the values of the Python path are, so that rounding to zero counts as no data
+    property_views = property_views.annotate(
+        x_display=x_field.display_expression("x", plan), y_display=y_field.display_expression("y", plan)
+    )
+    has_data = x_field.has_data("x_display") & y_field.has_data("y_display")
+    if x_field.kind == "count":
+        aggregate, empty_value = Count("id"), 0
+    elif aggregation_type == "Sum":
+        aggregate, empty_value = Sum("x_display", output_field=models.FloatField() if x_field.base_units else None), 0
+    elif aggregation_type == "Average":
+        aggregate, empty_value = Avg("x_display", output_field=models.FloatField()), None
+    else:
+        raise ValueError(f"Bad aggregation_type: {aggregation_type}")
+
+    # count the views of each cycle, and find the range of continuous y values
+    counts = {"num_properties": Count("id"), "num_properties_with_data": Count("id", filter=has_data)}
+    if y_field.kind == "number":
+        counts["y_min"] = Min("y_display", filter=has_data, output_field=models.FloatField())
+        counts["y_max"] = Max("y_display", filter=has_data, output_field=models.FloatField())
+    counts_by_cycle = {row.pop("cycle_id"): row for row in property_views.values("cycle_id").annotate(**counts)}
+
+    property_counts = [
+        {
+            "yr_e": cycle.end.strftime("%Y"),
+            "num_properties": counts_by_cycle.get(cycle.id, {}).get("num_properties", 0),
+            "num_properties_w-data": counts_by_cycle.get(cycle.id, {}).get("num_properties_with_data", 0),
+        }
+        for cycle in cycles
+    ]
+
+    chart_data = []
+    views_with_data = property_views.filter(has_data)
+    if y_field.kind == "number":
+        y_mins = [row["y_min"] for row in counts_by_cycle.values() if row["y_min"] is not None]
+        y_maxs = [row["y_max"] for row in counts_by_cycle.values() if row["y_max"] is not None]
+        if not y_mins:
+            return {"chart_data": chart_data, "property_counts": property_counts}
+
+        bins = np.histogram_bin_edges([min(y_mins), max(y_maxs)], bins=REPORT_AGGREGATION_BIN_COUNT)
+        # special case for year built: make bins integers
+        if y_var.column_name == "year_built":
+            bins = bins.astype(int)
+
+        # cast both arguments of width_bucket to double precision, an uncast array literal is a numeric[]
+        y = Cast("y_display", models.FloatField())
+        thresholds = Cast(
+            Value([float(edge) for edge in bins], output_field=ArrayField(models.FloatField())), ArrayField(models.FloatField())
+        )
+        rows = views_with_data.annotate(bucket=WidthBucket(y, thresholds)).values("cycle_id", "bucket").annotate(value=aggregate)
+        values = {(row["cycle_id"], row["bucket"]): row["value"] for row in rows}
+
+        for cycle, cycle_counts in zip(cycles, property_counts):
+            for i in range(len(bins) - 1):
+                chart_data.append(
+                    {
+                        "y": f"{round(bins[i], 2)} - {round(bins[i + 1], 2)}",
+                        "x": values.get((cycle.id, i + 1), empty_value),
+                        "yr_e": cycle_counts["yr_e"],
+                    }
+                )
+    else:
+        rows = views_with_data.values("cycle_id", "y_display").annotate(value=aggregate)
+        values = {(row["cycle_id"], row["y_display"]): row["value"] for row in rows}
+        bins = {y for _, y in values}
+
+        for cycle, cycle_counts in zip(cycles, property_counts):
+            results = [{"y": bin, "x": values.get((cycle.id, bin), empty_value), "yr_e": cycle_counts["yr_e"]} for bin in bins]
+            chart_data.extend(sorted(results, key=lambda d: d["x"] if d["x"] is not None else -np.inf, reverse=True))
+
+    return {"chart_data": chart_data, "property_counts": property_counts}
+
+
+def _report_cache_key(organization, property_views, cycles, x_var, y_var, aggregation_type):
+    """
+    Key for the cached aggregation of the views. The key changes when the query of the views (i.e., the
+    access level instance and filter group), the views or their states, their labels, their properties'
+    access level instances, or the display settings change. Labels and access level instances are
+    fingerprinted by their (view, label) and (view, access level instance) pairs, so moving either changes the key.
+    """
+    inventory = property_views.aggregate(
+        count=Count("id", distinct=True),
+        max_id=Max("id"),
+        max_state_id=Max("state_id"),
+        updated=Max("state__updated"),
+        access_levels=Sum(Cast("id", models.BigIntegerField()) * F("property__access_level_instance_id")),
+        label_count=Count("labels"),
+        view_labels=Sum(Cast("id", models.BigIntegerField()) * F("labels__id")),
+    )
+    definition = {
+        "query": str(property_views.query),
+        "cycles": [cycle.id for cycle in cycles],
+        "x_var": x_var if isinstance(x_var, str) else x_var.id,
+        "y_var": y_var if isinstance(y_var, str) else y_var.id,
+        "aggregation_type": aggregation_type,
+        "display_units": [
+            organization.display_units_eui,
+            organization.display_units_area,
+            organization.display_units_ghg,
+            organization.display_units_ghg_intensity,
+            organization.display_units_wui,
+            organization.display_units_water_use,
+            organization.display_decimal_places,
+        ],
+        "inventory": inventory,
+    }
+    digest = hashlib.md5(json.dumps(definition, sort_keys=True, default=str).encode("utf-8")).hexdigest()  # noqa: S324
+    return f"report_aggregated:{organization.id}:{digest}"
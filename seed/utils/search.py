@@ -10,7 +10,7 @@ import re
 from dataclasses import dataclass
 from enum import Enum
 from functools import reduce
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from django.db import models
 from django.db.models import Case, IntegerField, Q, Value, When
@@ -244,7 +244,7 @@ class QueryFilter:
 AnnotationDict = dict[str, models.Func]
 
 
-def _build_extra_data_annotations(column_name: str, data_type: str) -> tuple[str, AnnotationDict]:
+def _build_extra_data_annotations(column_name: str, data_type: str, state_prefix: str = "state__") -> tuple[str, AnnotationDict]:
     """Creates a dictionary of annotations which will cast the extra data column_name
     into the provided data_type, for usage like: `*View.annotate(**annotations)`
 
@@ -255,6 +255,7 @@ def _build_extra_data_annotations(column_name: str, data_type: str) -> tuple[str
 
     :param column_name: the Column.column_name for a Column which is extra_data
     :param data_type: the Column.data_type for the column
+    :param state_prefix: lookup of the state from the queried model, empty when querying states
     :returns: the annotated field name which contains the casted result, along with
               a dict of annotations
     """
@@ -274,7 +275,7 @@ def _build_extra_data_annotations(column_name: str, data_type: str) -> tuple[str
 
     annotations: AnnotationDict = {
         # use postgresql json string operator `->>`
-        text_field_name: KeyTextTransform(column_name, "state__extra_data"),
+        text_field_name: KeyTextTransform(column_name, f"{state_prefix}extra_data"),
     }
     if data_type == "integer":
         annotations.update(
@@ -317,6 +318,8 @@ def _parse_view_filter(
     columns_by_name: dict[str, dict],
     inventory_type: str,
     access_level_names: list[str],
+    state_prefix: str = "state__",
+    access_level_instance_field: Optional[str] = None,
 ) -> tuple[Q, AnnotationDict]:
     """Parse a filter expression into a Q object
 
@@ -327,6 +330,8 @@ def _parse_view_filter(
                               which negates the expression (i.e., column_name != filter_value)
     :param filter_value: the value evaluated against the filter_expression
     :param columns_by_name: mapping of Column.column_name to dict representation of Column
+    :param state_prefix: lookup of the state from the queried model, empty when querying states
+    :param access_level_instance_field: lookup of the access level instance, defaults to the one of the inventory
     :return: query object
     """
     filter = QueryFilter.parse(filter_expression)
@@ -334,7 +339,7 @@ def _parse_view_filter(
 
     if is_access_level_instance:
         filter.operator = QueryFilterOperator.CONTAINS
-        updated_expression = f"{inventory_type}__access_level_instance__path"
+        updated_expression = f"{access_level_instance_field or f'{inventory_type}__access_level_instance'}__path"
         filter.is_negated = filter_expression.endswith("__exact")
 
         if filter_expression.endswith("__icontains"):
@@ -353,10 +358,10 @@ def _parse_view_filter(
     column_name = column["column_name"]
     annotations: AnnotationDict = {}
     if column["is_extra_data"]:
-        new_field_name, annotations = _build_extra_data_annotations(column["column_name"], column["data_type"])
+        new_field_name, annotations = _build_extra_data_annotations(column["column_name"], column["data_type"], state_prefix)
         updated_filter = QueryFilter(new_field_name, filter.operator, filter.is_negated)
     else:
-        updated_filter = QueryFilter(f"state__{column_name}", filter.operator, filter.is_negated)
+        updated_filter = QueryFilter(f"{state_prefix}{column_name}", filter.operator, filter.is_negated)
 
     # isnull filtering should not coerce booleans to the column type
     if filter_expression.endswith("__isnull") and isinstance(filter_value, bool):
@@ -371,13 +376,20 @@ def _parse_view_filter(
 
 
 def _parse_view_sort(
-    sort_expression: str, columns_by_name: dict[str, dict], inventory_type: str, access_level_names: list[str]
+    sort_expression: str,
+    columns_by_name: dict[str, dict],
+    inventory_type: str,
+    access_level_names: list[str],
+    state_prefix: str = "state__",
+    access_level_instance_field: Optional[str] = None,
 ) -> tuple[Union[None, str, Collate], AnnotationDict]:
     """Parse a sort expression
 
     :param sort_expression: should be a valid Column.column_name. Optionally prefixed
                             with '-' to indicate descending order.
     :param columns_by_name: mapping of Column.column_name to dict representation of Column
+    :param state_prefix: lookup of the state from the queried model, empty when querying states
+    :param access_level_instance_field: lookup of the access level instance, defaults to the one of the inventory
     :return: the parsed sort expression or None if not valid followed by a dictionary of annotations
     """
     column_name = sort_expression.lstrip("-")
@@ -390,7 +402,7 @@ def _parse_view_sort(
         if column["related"]:
             return None, {}
         elif column["is_extra_data"]:
-            new_field_name, annotations = _build_extra_data_annotations(column_name, column["data_type"])
+            new_field_name, annotations = _build_extra_data_annotations(column_name, column["data_type"], state_prefix)
             if column["data_type"] in {"None", "string"}:
                 # Natural sort json text data
                 if not direction:
@@ -400,15 +412,20 @@ def _parse_view_sort(
 
             return f"{direction}{new_field_name}", annotations
         else:
-            return f"{direction}state__{column_name}", {}
+            return f"{direction}{state_prefix}{column_name}", {}
     elif column_name in access_level_names:
-        return f"{direction}{inventory_type}__access_level_instance__path__{column_name}", {}
+        return f"{direction}{access_level_instance_field or f'{inventory_type}__access_level_instance'}__path__{column_name}", {}
     else:
         return None, {}
 
 
 def build_view_filters_and_sorts(
-    filters: QueryDict, columns: list[dict], inventory_type: str, access_level_names: list[str] = []
+    filters: QueryDict,
+    columns: list[dict],
+    inventory_type: str,
+    access_level_names: list[str] = [],
+    state_prefix: str = "state__",
+    access_level_instance_field: Optional[str] = None,
 ) -> tuple[Q, AnnotationDict, list[str]]:
     """Build a query object usable for `*View.filter(...)` as well as a list of
     column names for usable for `*View.order_by(...)`.
@@ -442,8 +459,14 @@ def build_view_filters_and_sorts(
     - Handle cases for extra data
     - Convert filtering values into their proper types (e.g., str -> int)
 
+    The same filters and sorts can be applied to `*State` querysets by passing an empty
+    `state_prefix` and the `access_level_instance_field` of the states, e.g.,
+    `raw_access_level_instance`.
+
     :param filters: QueryDict from a request
     :param columns: list of all valid Columns in dict format
+    :param state_prefix: lookup of the state from the queried model, empty when querying states
+    :param access_level_instance_field: lookup of the access level instance, defaults to the one of the inventory
     :return: filters, annotations and sorts
     """
     columns_by_name = {}
@@ -473,7 +496,13 @@ def build_view_filters_and_sorts(
                 is_null_filter_value = True
 
             parsed_filters, parsed_annotations = _parse_view_filter(
-                is_null_filter_expression, is_null_filter_value, columns_by_name, inventory_type, access_level_names
+                is_null_filter_expression,
+                is_null_filter_value,
+                columns_by_name,
+                inventory_type,
+                access_level_names,
+                state_prefix,
+                access_level_instance_field,
             )
 
             # if column data_type is "string", also filter on the empty string
@@ -481,7 +510,13 @@ def build_view_filters_and_sorts(
             column_data_type = columns_by_name.get(filter.field_name, {}).get("data_type")
             if column_data_type in {"string", "None"}:
                 empty_string_parsed_filters, _ = _parse_view_filter(
-                    filter_expression, filter_value, columns_by_name, inventory_type, access_level_names
+                    filter_expression,
+                    filter_value,
+                    columns_by_name,
+                    inventory_type,
+                    access_level_names,
+                    state_prefix,
+                    access_level_instance_field,
                 )
 
                 if filter_expression.endswith("__ne"):
@@ -492,7 +527,13 @@ def build_view_filters_and_sorts(
 
         else:
             parsed_filters, parsed_annotations = _parse_view_filter(
-                filter_expression, filter_value, columns_by_name, inventory_type, access_level_names
+                filter_expression,
+                filter_value,
+                columns_by_name,
+                inventory_type,
+                access_level_names,
+                state_prefix,
+                access_level_instance_field,
             )
 
         new_filters &= parsed_filters
@@ -501,7 +542,9 @@ def build_view_filters_and_sorts(
     order_by = []
 
     for sort_expression in filters.getlist("order_by", ["id"]):
-        parsed_sort, parsed_annotations = _parse_view_sort(sort_expression, columns_by_name, inventory_type, access_level_names)
+        parsed_sort, parsed_annotations = _parse_view_sort(
+            sort_expression, columns_by_name, inventory_type, access_level_names, state_prefix, access_level_instance_field
+        )
         if parsed_sort is not None:
             order_by.append(parsed_sort)
             annotations.update(parsed_annotations)
@@ -0,0 +1,164 @@
+"""
+SEED Platform (TM), Copyright (c) Alliance for Sustainable Energy, LLC, and other contributors.
+See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
+
+Bulk persistence of PropertyStates and TaxLotStates. These do the work of the states' save methods and
+signals (normalized address, hash, lat/long sync and UBID models) for a whole batch of states at once.
+"""
+
+import copy
+from collections import defaultdict
+
+from seed.models import PropertyState, UbidModel
+from seed.utils.address import normalize_address_str
+from seed.utils.geocode import sync_long_lat
+from seed.utils.ubid import set_decoded_ubid_fields
+
+LAT_LONG_FIELDS = ["latitude", "longitude", "long_lat"]
+UBID_FIELDS = ["ubid", "bounding_box", "centroid", "latitude", "longitude", "long_lat", "geocoding_confidence"]
+
+
+def set_normalized_address_and_hash(states, hash_fields=None):
+    """
+    Set the normalized_address and hash_object of the states, as their save methods would
+
+    :param states: list of PropertyStates or TaxLotStates
+    :param hash_fields: list, the fields to hash (see Column.retrieve_db_field_name_for_hash_comparison).
+        If not provided, they are retrieved per organization.
+    """
+    # import here to prevent circular reference
+    from seed.data_importer.tasks import hash_state_objects
+
+    for state in states:
+        if state.address_line_1 is not None:
+            state.normalized_address = normalize_address_str(state.address_line_1)
+        else:
+            state.normalized_address = None
+
+    for state, hash_object in zip(states, hash_state_objects(states, prefetched_columns=hash_fields)):
+        state.hash_object = hash_object
+
+
+def bulk_create_states(states, hash_fields=None):
+    """
+    Create states without calling their save methods or signals one at a time. The normalized
+    address and hash are set before the insert and the UBID models are created afterward.
+
+    :param states: list of unsaved PropertyStates or TaxLotStates of the same class
+    :param hash_fields: list, optional fields to hash, see set_normalized_address_and_hash
+    :return: list, the created states
+    """
+    if not states:
+        return states
+
+    StateClass = type(states[0])
+    set_normalized_address_and_hash(states, hash_fields)
+    StateClass.objects.bulk_create(states)
+    _generate_ubidmodels(StateClass, states, hash_fields)
+
+    return states
+
+
+def bulk_update_states(states, fields, hash_fields=None):
+    """
+    Update fields of existing states without calling their save methods or signals one at a time. The
+    normalized address and hash are always updated, long_lat is synced when the latitude or longitude
+    is updated, and the UBID models are updated when the ubid is.
+
+    :param states: list of saved PropertyStates or TaxLotStates of the same class
+    :param fields: list, names of the fields to update
+    :param hash_fields: list, optional fields to hash, see set_normalized_address_and_hash
+    :return: list, the updated states
+    """
+    if not states:
+        return states
+
+    StateClass = type(states[0])
+    fields = set(fields) | {"normalized_address", "hash_object"}
+
+    if fields & set(LAT_LONG_FIELDS):
+        original_states = StateClass.objects.only(*LAT_LONG_FIELDS, "geocoding_confidence").in_bulk([state.id for state in states])
+        for state in states:
+            if state.id in original_states:
+                sync_long_lat(state, original_states[state.id])
+        fields |= {"long_lat", "geocoding_confidence"}
+
+    set_normalized_address_and_hash(states, hash_fields)
+    StateClass.objects.bulk_update(states, sorted(fields))
+
+    if "ubid" in fields:
+        _generate_ubidmodels(StateClass, states, hash_fields)
+
+    return states
+
+
+def _generate_ubidmodels(StateClass, states, hash_fields=None):  # noqa: N803
+    """
+    Create or update the UbidModels of saved states from their ';' separated ubid fields, with the same
+    result as calling generate_ubidmodels_for_state on each state. The first UBID is preferred and becomes
+    the state's ubid, and the state's bounding box, centroid and lat/long are decoded from it.
+    """
+    states = [state for state in states if state.ubid]
+    if not states:
+        return
+
+    state_field = "property" if StateClass == PropertyState else "taxlot"
+    existing_by_state_id = defaultdict(dict)
+    for ubid_model in UbidModel.objects.filter(**{f"{state_field}_id__in": [state.id for state in states]}):
+        existing_by_state_id[getattr(ubid_model, f"{state_field}_id")][ubid_model.ubid] = ubid_model
+
+    ubid_models_to_create = []
+    ubid_models_to_update = []
+    states_to_update = []
+    for state in states:
+        ubids = [ubid.strip() for ubid in state.ubid.split(";")]
+
+        # update_or_create is applied in order, so the last occurrence of a UBID wins
+        preferred_by_ubid = {}
+        for idx, ubid in enumerate(ubids):
+            preferred_by_ubid[ubid] = idx == 0
+
+        existing = existing_by_state_id[state.id]
+        for ubid, ubid_model in existing.items():
+            preferred = preferred_by_ubid.get(ubid, False)
+            if ubid_model.preferred != preferred:
+                ubid_model.preferred = preferred
+                ubid_models_to_update.append(ubid_model)
+
+        # Follow the changes post_save_ubid_model would make to the state's ubid, and the UBID that
+        # decode_unique_ids would last decode
+        created = set()
+        current_ubid = state.ubid
+        decode_ubid = None
+        for idx, ubid in enumerate(ubids):
+            if ubid not in existing and ubid not in created:
+                created.add(ubid)
+                ubid_models_to_create.append(UbidModel(ubid=ubid, preferred=preferred_by_ubid[ubid], **{state_field: state}))
+                if idx == 0 and current_ubid != ubid:
+                    current_ubid = ubid
+                decode_ubid = current_ubid or decode_ubid
+            elif idx == 0 and current_ubid != ubid:
+                current_ubid = ubid
+                decode_ubid = ubid
+            elif idx > 0 and current_ubid == ubid:
+                current_ubid = None
+
+        if current_ubid == state.ubid and decode_ubid is None:
+            continue
+
+        original_state = copy.copy(state)
+        if decode_ubid is not None:
+            state.ubid = decode_ubid
+            set_decoded_ubid_fields(state)
+        state.ubid = current_ubid
+        sync_long_lat(state, original_state)
+        states_to_update.append(state)
+
+    if ubid_models_to_update:
+        UbidModel.objects.bulk_update(ubid_models_to_update, ["preferred"])
+    if ubid_models_to_create:
+        UbidModel.objects.bulk_create(ubid_models_to_create)
+
+    if states_to_update:
+        set_normalized_address_and_hash(states_to_update, hash_fields)
+        StateClass.objects.bulk_update(states_to_update, [*UBID_FIELDS, "normalized_address", "hash_object"])
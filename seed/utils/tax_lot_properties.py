@@ -1,18 +1,26 @@
-import base64
 import csv
 import datetime
-import io
+import json
 import logging
 import math
-from collections import OrderedDict
+import os
+import tempfile
+import time
+from collections import OrderedDict, defaultdict
 
 import xlsxwriter
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
 from quantityfield.units import ureg
 
+from seed.lib.mcm.utils import batch
 from seed.lib.progress_data.progress_data import ProgressData
 from seed.models import (
     ColumnListProfile,
+    Note,
     PropertyView,
+    StatusLabel,
     TaxLotProperty,
     TaxLotView,
 )
@@ -25,8 +33,44 @@ from seed.utils.cache import set_cache_raw
 
 INVENTORY_MODELS = {"properties": PropertyView, "taxlots": TaxLotView}
 
+# number of views serialized and written to the export file at a time
+EXPORT_BATCH_SIZE = 1000
+# how long the finished export file can be downloaded
+EXPORT_TIMEOUT = 60 * 30  # 30 minutes
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "geojson": "application/geo+json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_file_path(unique_id, export_type):
+    """Path of the file an export is written to, relative paths are not accepted from the client"""
+    return os.path.join(settings.MEDIA_ROOT, "exports", f"{unique_id}.{export_type}")
+
+
+def remove_expired_exports():
+    """Delete export files that are older than the window in which they can be downloaded"""
+    export_dir = os.path.join(settings.MEDIA_ROOT, "exports")
+    if not os.path.isdir(export_dir):
+        return
+
+    expired = time.time() - EXPORT_TIMEOUT
+    for entry in os.scandir(export_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < expired:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # already removed by another export
+            pass
+
 
 def export_data(args):
+    """
+    Write the requested inventory to a file in MEDIA_ROOT/exports. The views are serialized and written in
+    batches of EXPORT_BATCH_SIZE so memory use does not grow with the number of records exported. Once done,
+    the cache entry for the progress unique_id describes the file so that it can be downloaded.
+    """
     org_id = args.get("org_id")
     ali_lft = args.get("ali_lft")
     ali_rgt = args.get("ali_rgt")
@@ -51,13 +95,20 @@ def export_data(args):
     column_ids, add_column_name_mappings, columns_from_database = ColumnListProfile.return_columns(org_id, profile_id, view_klass_str)
     column_name_mappings.update(add_column_name_mappings)
 
+    export_type = request_data.get("export_type", "csv")
+    if export_type not in EXPORT_CONTENT_TYPES:
+        export_type = "csv"
+    include_notes = request_data.get("include_notes", True)
+    include_meter_data = request_data.get("include_meter_readings", False) and export_type == "geojson"
+    # drop duplicates but keep the requested order
+    ids = list(dict.fromkeys(int(view_id) for view_id in request_data.get("ids") or []))
+
     select_related = ["state", "cycle"]
-    prefetch_related = ["labels"]
-    ids = request_data.get("ids", [])
+    prefetch_related = [Prefetch("labels", queryset=StatusLabel.objects.order_by("name"))]
+    if include_notes:
+        prefetch_related.append(Prefetch("notes", queryset=Note.objects.order_by("created")))
 
     filter_str = {}
-    if ids:
-        filter_str["id__in"] = ids
     if hasattr(view_klass, "property"):
         select_related.append("property")
         filter_str["property__organization_id"] = org_id
@@ -67,6 +118,12 @@ def export_data(args):
         column_name_mappings["property_notes"] = "Property Notes"
         column_name_mappings["property_labels"] = "Property Labels"
 
+        if include_meter_data:
+            meter_queryset = Meter.objects.select_related("scenario", "service__system__group", "system__group").prefetch_related(
+                Prefetch("meter_readings", queryset=MeterReading.objects.order_by("start_time"))
+            )
+            prefetch_related.append(Prefetch("property__meters", queryset=meter_queryset))
+
     elif hasattr(view_klass, "taxlot"):
         select_related.append("taxlot")
         filter_str["taxlot__organization_id"] = org_id
@@ -76,223 +133,309 @@ def export_data(args):
         column_name_mappings["taxlot_notes"] = "Tax Lot Notes"
         column_name_mappings["taxlot_labels"] = "Tax Lot Labels"
 
-    model_views = view_klass.objects.select_related(*select_related).prefetch_related(*prefetch_related).filter(**filter_str).order_by("id")
+    model_views = view_klass.objects.select_related(*select_related).prefetch_related(*prefetch_related).filter(**filter_str)
 
-    # get the data in a dict which includes the related data
-    progress_data.step("Exporting Inventory...")
-    data = TaxLotProperty.serialize(model_views, column_ids, columns_from_database)
-
-    derived_columns = column_profile.derived_columns.all() if column_profile is not None else []
+    derived_columns = list(column_profile.derived_columns.all()) if column_profile is not None else []
     column_name_mappings.update({dc.name: dc.name for dc in derived_columns})
+
+    # one step per batch and one to finish the file
+    total_records = model_views.filter(id__in=ids).count() if ids else model_views.count()
+    progress_data.total = math.ceil(total_records / EXPORT_BATCH_SIZE) + 1
+    progress_data.save()
     progress_data.step("Exporting Inventory...")
 
-    export_type = request_data.get("export_type", "csv")
+    remove_expired_exports()
+    filename = request_data.get("filename", f"ExportedData.{export_type}")
+    path = export_file_path(progress_data.unique_id, export_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
 
-    # add labels, notes, and derived columns
-    include_notes = request_data.get("include_notes", True)
-    # keep the batch size below 100 to avoid the frontend requesting data that has not yet been sent to the cache
-    batch_size = math.ceil(len(model_views) / 88)
-    for i, record in enumerate(model_views):
-        label_string = []
-        note_string = []
-        for label in list(record.labels.all().order_by("name")):
-            label_string.append(label.name)
-        if include_notes:
-            for note in list(record.notes.all().order_by("created")):
-                note_string.append(note.created.astimezone().strftime("%Y-%m-%d %I:%M:%S %p") + "\n" + note.text)
-
-        if hasattr(record, "property"):
-            data[i]["property_labels"] = ",".join(label_string)
-            data[i]["property_notes"] = "\n----------\n".join(note_string) if include_notes else "(excluded during export)"
-
-            include_meter_data = request_data.get("include_meter_readings", False)
-            if include_meter_data and export_type == "geojson":
-                meters = []
-                for meter in record.property.meters.all():
-                    meters.append(MeterSerializer(meter).data)
-                    meters[-1]["readings"] = []
-                    for meter_reading in meter.meter_readings.all().order_by("start_time"):
-                        meters[-1]["readings"].append(MeterReadingSerializer(meter_reading).data)
-
-                data[i]["_meters"] = meters
-        elif hasattr(record, "taxlot"):
-            data[i]["taxlot_labels"] = ",".join(label_string)
-            data[i]["taxlot_notes"] = "\n----------\n".join(note_string) if include_notes else "(excluded during export)"
-
-        # add derived columns
-        for derived_column in derived_columns:
-            data[i][derived_column.name] = derived_column.evaluate(inventory_state=record.state)
-
-        if batch_size > 0 and i % batch_size == 0:
-            progress_data.step("Exporting Inventory...")
+    # write next to the final path so a download never sees a partial file
+    partial_path = f"{path}.partial"
+    if export_type == "geojson":
+        writer = _GeoJSONExportWriter(partial_path, filename, column_name_mappings)
+    elif export_type == "xlsx":
+        writer = _SpreadsheetExportWriter(partial_path, column_name_mappings)
+    else:
+        writer = _CSVExportWriter(partial_path, column_name_mappings)
+
+    try:
+        for views in _iter_view_batches(model_views, ids, EXPORT_BATCH_SIZE):
+            # get the data in a dict which includes the related data
+            data = TaxLotProperty.serialize(views, column_ids, columns_from_database)
+
+            # evaluate the derived columns for the whole batch at once
+            derived_values = {
+                derived_column.id: derived_column.evaluate_many([record.state for record in views]) for derived_column in derived_columns
+            }
+
+            # add labels, notes, and derived columns
+            for i, (datum, record) in enumerate(zip(data, views)):
+                label_string = ",".join(label.name for label in record.labels.all())
+                if include_notes:
+                    note_string = "\n----------\n".join(
+                        note.created.astimezone().strftime("%Y-%m-%d %I:%M:%S %p") + "\n" + note.text for note in record.notes.all()
+                    )
+                else:
+                    note_string = "(excluded during export)"
 
-    # force the data into the same order as the IDs
-    if ids:
-        order_dict = {obj_id: index for index, obj_id in enumerate(ids)}
-        if view_klass_str == "properties":
-            view_id_str = "property_view_id"
-        else:
-            view_id_str = "taxlot_view_id"
-        data.sort(key=lambda inventory_obj: order_dict[inventory_obj[view_id_str]])
+                if hasattr(record, "property"):
+                    datum["property_labels"] = label_string
+                    datum["property_notes"] = note_string
 
-    filename = request_data.get("filename", f"ExportedData.{export_type}")
-    if export_type == "csv":
-        data = _csv_response(data, column_name_mappings)
-    elif export_type == "geojson":
-        data = json_response(filename, data, column_name_mappings)
-    elif export_type == "xlsx":
-        data = _spreadsheet_response(data, column_name_mappings)
+                    if include_meter_data:
+                        meters = []
+                        for meter in record.property.meters.all():
+                            meters.append(MeterSerializer(meter).data)
+                            meters[-1]["readings"] = [MeterReadingSerializer(reading).data for reading in meter.meter_readings.all()]
 
-    timeout = 60 * 30  # 30 minutes
-    set_cache_raw(progress_data.unique_id, {"data": data}, timeout)
+                        datum["_meters"] = meters
+                elif hasattr(record, "taxlot"):
+                    datum["taxlot_labels"] = label_string
+                    datum["taxlot_notes"] = note_string
 
+                # add derived columns
+                for derived_column in derived_columns:
+                    datum[derived_column.name] = derived_values[derived_column.id][i]
 
-def _csv_response(data, column_name_mappings):
-    output = io.StringIO()
-    writer = csv.writer(output)
+            writer.write(data)
+            progress_data.step("Exporting Inventory...")
 
-    # check the first item in the header and make sure that it isn't ID (it can be id, or iD).
-    # excel doesn't like the first item to be ID in a CSV
-    header = list(column_name_mappings.values())
-    if header[0] == "ID":
-        header[0] = "id"
-    writer.writerow(header)
+        writer.close()
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
 
-    # iterate over the results to preserve column order and write row.
-    for datum in data:
-        row = []
-        for column in column_name_mappings:
-            row_result = datum.get(column, None)
-
-            # Try grabbing the value out of the related field if not found yet.
-            if row_result is None and datum.get("related"):
-                # Join all non-null non-duplicate related values for this column with ';'
-                row_result = "; ".join(
-                    {
-                        val.strftime("%Y-%m-%d %H:%M:%S") if isinstance(val, datetime.datetime) else str(val)
-                        for related in datum["related"]
-                        if (val := related.get(column)) not in (None, "")
-                    }
-                )
+    set_cache_raw(progress_data.unique_id, {"org_id": org_id, "filename": filename, "export_type": export_type}, EXPORT_TIMEOUT)
 
-            # Convert quantities (this is typically handled in the JSON Encoder, but that isn't here).
-            if isinstance(row_result, ureg.Quantity):
-                row_result = row_result.magnitude
-            elif isinstance(row_result, datetime.datetime):
-                row_result = row_result.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(row_result, datetime.date):
-                row_result = row_result.strftime("%Y-%m-%d")
-            row.append(row_result)
 
-        writer.writerow(row)
+def _iter_view_batches(model_views, ids, batch_size):
+    """
+    Yield lists of views from the queryset, batch_size at a time. If ids are given the views are returned
+    in the order of the ids, otherwise they are paged through by id.
 
-    return output.getvalue()
+    :param model_views: QuerySet of PropertyViews or TaxLotViews
+    :param ids: list of view ids to export, or empty to export every view in the queryset
+    :param batch_size: int, max number of views per batch
+    """
+    if ids:
+        for id_batch in batch(ids, batch_size):
+            views_by_id = model_views.in_bulk(id_batch)
+            yield [views_by_id[view_id] for view_id in id_batch if view_id in views_by_id]
+        return
+
+    last_id = 0
+    while True:
+        views = list(model_views.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not views:
+            return
+        yield views
+        last_id = views[-1].id
+
+
+def _row_values(datum, column_name_mappings):
+    """Return the values of a serialized record in the order of the columns, formatted for csv and xlsx"""
+    row = []
+    for column in column_name_mappings:
+        row_result = datum.get(column, None)
+
+        # Try grabbing the value out of the related field if not found yet.
+        if row_result is None and datum.get("related"):
+            # Join all non-null non-duplicate related values for this column with ';'
+            row_result = "; ".join(
+                {
+                    val.strftime("%Y-%m-%d %H:%M:%S") if isinstance(val, datetime.datetime) else str(val)
+                    for related in datum["related"]
+                    if (val := related.get(column)) not in (None, "")
+                }
+            )
+
+        # Convert quantities (this is typically handled in the JSON Encoder, but that isn't here).
+        if isinstance(row_result, ureg.Quantity):
+            row_result = row_result.magnitude
+        elif isinstance(row_result, datetime.datetime):
+            row_result = row_result.strftime("%Y-%m-%d %H:%M:%S")
+        elif isinstance(row_result, datetime.date):
+            row_result = row_result.strftime("%Y-%m-%d")
+        row.append(row_result)
+
+    return row
+
+
+class _CSVExportWriter:
+    def __init__(self, path, column_name_mappings):
+        self.column_name_mappings = column_name_mappings
+        self.file = open(path, "w", newline="", encoding="utf-8")  # noqa: SIM115
+        self.writer = csv.writer(self.file)
+
+        # check the first item in the header and make sure that it isn't ID (it can be id, or iD).
+        # excel doesn't like the first item to be ID in a CSV
+        header = list(column_name_mappings.values())
+        if header[0] == "ID":
+            header[0] = "id"
+        self.writer.writerow(header)
+
+    def write(self, data):
+        # iterate over the results to preserve column order and write row.
+        for datum in data:
+            self.writer.writerow(_row_values(datum, self.column_name_mappings))
+
+    def close(self):
+        self.file.close()
+
+
+class _GeoJSONExportWriter:
+    """
+    Writes the FeatureCollection one feature at a time. The related records are only known once every
+    batch has been serialized, so they are deduplicated and held in a temporary file until the end.
+    """
+
+    def __init__(self, path, filename, column_name_mappings):
+        self.column_name_mappings = column_name_mappings
+        self.file = open(path, "w", encoding="utf-8")  # noqa: SIM115
+        self.related_file = tempfile.TemporaryFile("w+", encoding="utf-8")  # noqa: SIM115
+        self.related_seen = set()
+        self.first_feature = True
+
+        name = json.dumps(f"SEED Export - {filename.replace('.geojson', '')}")
+        self.file.write(f'{{"type": "FeatureCollection", "name": {name}, "features": [')
+
+    def _write_feature(self, feature_json):
+        if not self.first_feature:
+            self.file.write(", ")
+        self.first_feature = False
+        self.file.write(feature_json)
+
+    def write(self, data):
+        if not data:
+            return
+
+        for datum in data:
+            self._write_feature(json.dumps(_geojson_feature(datum, self.column_name_mappings), cls=DjangoJSONEncoder))
+
+        for related in _extract_related(data):
+            key = tuple(related.items())
+            if key not in self.related_seen:
+                self.related_seen.add(key)
+                self.related_file.write(json.dumps(_geojson_feature(related, self.column_name_mappings), cls=DjangoJSONEncoder) + "\n")
+
+    def close(self):
+        # append related_records to data
+        self.related_file.seek(0)
+        for line in self.related_file:
+            self._write_feature(line.rstrip("\n"))
+        self.related_file.close()
+
+        self.file.write("]}")
+        self.file.close()
 
 
 def json_response(filename, data, column_name_mappings):
-    polygon_fields = ["bounding_box", "centroid", "property_footprint", "taxlot_footprint", "long_lat"]
     response_dict = {"type": "FeatureCollection", "name": f"SEED Export - {filename.replace('.geojson', '')}"}
 
-    features = []
-
     # extract related records
     related_records = _extract_related(data)
 
     # append related_records to data
     complete_data = data + related_records
 
-    for datum in complete_data:
-        feature = {"type": "Feature", "properties": {}}
+    # per geojsonlint.com, the CRS we were defining was the default and should not
+    # be included.
+    response_dict["features"] = [_geojson_feature(datum, column_name_mappings) for datum in complete_data]
+    return response_dict
 
-        feature_geometries = []
-        for key, value in datum.items():
-            if value is None:
-                continue
 
-            if isinstance(value, ureg.Quantity):
-                formatted_value = value.magnitude
-            elif isinstance(value, datetime.datetime):
-                formatted_value = value.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(value, datetime.date):
-                formatted_value = value.strftime("%Y-%m-%d")
+def _geojson_feature(datum, column_name_mappings):
+    polygon_fields = ["bounding_box", "centroid", "property_footprint", "taxlot_footprint", "long_lat"]
+    feature = {"type": "Feature", "properties": {}}
+
+    feature_geometries = []
+    for key, value in datum.items():
+        if value is None:
+            continue
+
+        if isinstance(value, ureg.Quantity):
+            formatted_value = value.magnitude
+        elif isinstance(value, datetime.datetime):
+            formatted_value = value.strftime("%Y-%m-%d %H:%M:%S")
+        elif isinstance(value, datetime.date):
+            formatted_value = value.strftime("%Y-%m-%d")
+        else:
+            formatted_value = value
+
+        if formatted_value and key in polygon_fields:
+            """
+            If object is a polygon and is populated, add the 'geometry'
+            key-value-pair in the appropriate GeoJSON format.
+            When the first geometry is added, the correct format is
+            established. When/If a second geometry is added, this is
+            appended alongside the previous geometry.
+            """
+
+            # long_lat
+            if key == "long_lat":
+                coordinates = _serialized_point(formatted_value)
+                # point
+                feature_geometries.append(
+                    {
+                        "type": "Point",
+                        "coordinates": coordinates,
+                    }
+                )
             else:
-                formatted_value = value
-
-            if formatted_value and key in polygon_fields:
-                """
-                If object is a polygon and is populated, add the 'geometry'
-                key-value-pair in the appropriate GeoJSON format.
-                When the first geometry is added, the correct format is
-                established. When/If a second geometry is added, this is
-                appended alongside the previous geometry.
-                """
-
-                # long_lat
-                if key == "long_lat":
-                    coordinates = _serialized_point(formatted_value)
-                    # point
-                    feature_geometries.append(
-                        {
-                            "type": "Point",
-                            "coordinates": coordinates,
-                        }
-                    )
+                # polygons
+                coordinates = _serialized_coordinates(formatted_value)
+                feature_geometries.append(
+                    {
+                        "type": "Polygon",
+                        "coordinates": [coordinates],
+                    }
+                )
+        else:
+            """
+            Non-polygon data
+            """
+            if key == "_meters":
+                if feature["properties"].get("meters") is None:
+                    feature["properties"]["meters"] = formatted_value
                 else:
-                    # polygons
-                    coordinates = _serialized_coordinates(formatted_value)
-                    feature_geometries.append(
-                        {
-                            "type": "Polygon",
-                            "coordinates": [coordinates],
-                        }
-                    )
+                    logging.warning("meters already exists in properties, not adding")
             else:
-                """
-                Non-polygon data
-                """
-                if key == "_meters":
-                    if feature["properties"].get("meters") is None:
-                        feature["properties"]["meters"] = formatted_value
-                    else:
-                        logging.warning("meters already exists in properties, not adding")
-                else:
-                    display_key = column_name_mappings.get(key, key)
-                    feature["properties"][display_key] = formatted_value
-
-        # now add in the geometry data depending on how many geometries were found
-        if len(feature_geometries) == 0:
-            # no geometry found -- save an empty polygon geometry
-            feature["geometry"] = {"type": "Polygon", "coordinates": []}
-        elif len(feature_geometries) == 1:
-            feature["geometry"] = feature_geometries[0]
-        else:
-            feature["geometry"] = {"type": "GeometryCollection", "geometries": feature_geometries}
-
-        """
-        Before appending feature, ensure that if there is no geometry recorded.
-        Note that the GeoJson will not render if no lat/lng
-        """
+                display_key = column_name_mappings.get(key, key)
+                feature["properties"][display_key] = formatted_value
+
+    # now add in the geometry data depending on how many geometries were found
+    if len(feature_geometries) == 0:
+        # no geometry found -- save an empty polygon geometry
+        feature["geometry"] = {"type": "Polygon", "coordinates": []}
+    elif len(feature_geometries) == 1:
+        feature["geometry"] = feature_geometries[0]
+    else:
+        feature["geometry"] = {"type": "GeometryCollection", "geometries": feature_geometries}
 
-        # add style information
-        if feature["properties"].get("property_state_id") is not None:
-            feature["properties"]["stroke"] = "#185189"  # buildings color
-        elif feature["properties"].get("taxlot_state_id") is not None:
-            feature["properties"]["stroke"] = "#10A0A0"  # buildings color
-        feature["properties"]["marker-color"] = "#E74C3C"
-        # feature["properties"]["stroke-width"] = 3
-        feature["properties"]["fill-opacity"] = 0
+    """
+    Before appending feature, ensure that if there is no geometry recorded.
+    Note that the GeoJson will not render if no lat/lng
+    """
 
-        # append feature
-        features.append(feature)
+    # add style information
+    if feature["properties"].get("property_state_id") is not None:
+        feature["properties"]["stroke"] = "#185189"  # buildings color
+    elif feature["properties"].get("taxlot_state_id") is not None:
+        feature["properties"]["stroke"] = "#10A0A0"  # buildings color
+    feature["properties"]["marker-color"] = "#E74C3C"
+    # feature["properties"]["stroke-width"] = 3
+    feature["properties"]["fill-opacity"] = 0
 
-        # per geojsonlint.com, the CRS we were defining was the default and should not
-        # be included.
+    return feature
 
-    response_dict["features"] = features
-    return response_dict
 
+class _SpreadsheetExportWriter:
+    """
+    Writes the workbook in xlsxwriter's constant_memory mode, which flushes each row to disk once the
+    next row is started. Every worksheet therefore has to be written strictly top to bottom.
+    """
 
-def _spreadsheet_response(data, column_name_mappings):
     scenario_keys = (
         "id",
         "name",
@@ -337,161 +480,120 @@ def _spreadsheet_response(data, column_name_mappings):
         "cost_residual_value",
     )
     measure_keys = ("name", "display_name", "category", "category_display_name")
-    # find measures and scenarios
-    for i, record in enumerate(data):
-        measures = PropertyMeasure.objects.filter(property_state_id=record["property_state_id"])
-        record["measures"] = measures
-
-        scenarios = Scenario.objects.filter(property_state_id=record["property_state_id"])
-        record["scenarios"] = scenarios
-
-    output = io.BytesIO()
-    wb = xlsxwriter.Workbook(output, {"remove_timezone": True})
-
-    # add tabs
-    ws1 = wb.add_worksheet("Properties")
-    ws2 = wb.add_worksheet("Measures")
-    ws3 = wb.add_worksheet("Scenarios")
-    ws4 = wb.add_worksheet("Scenario Measure Join Table")
-    ws5 = wb.add_worksheet("Meter Readings")
-    bold = wb.add_format({"bold": True})
-
-    row = 0
-    row2 = 0
-    col2 = 0
-    row3 = 0
-    col3 = 0
-    row4 = 0
-    row5 = 0
-
-    for index, val in enumerate(list(column_name_mappings.values())):
-        # Do not write the first element as ID, this causes weird issues with Excel.
-        if index == 0 and val == "ID":
-            ws1.write(row, index, "id", bold)
-        else:
-            ws1.write(row, index, val, bold)
 
-    # iterate over the results to preserve column order and write row.
-    add_m_headers = True
-    add_s_headers = True
-    for datum in data:
-        row += 1
-        id = None
-        for index, column in enumerate(column_name_mappings):
-            if column == "id":
-                id = datum.get(column, None)
-
-            row_result = datum.get(column, None)
-
-            # Try grabbing the value out of the related field if not found yet.
-            if row_result is None and datum.get("related"):
-                # Join all non-null non-duplicate related values for this column with ';'
-                row_result = "; ".join(
-                    {
-                        val.strftime("%Y-%m-%d %H:%M:%S") if isinstance(val, datetime.datetime) else str(val)
-                        for related in datum["related"]
-                        if (val := related.get(column)) not in (None, "")
-                    }
-                )
+    def __init__(self, path, column_name_mappings):
+        self.column_name_mappings = column_name_mappings
+        self.wb = xlsxwriter.Workbook(path, {"remove_timezone": True, "constant_memory": True})
+
+        # add tabs
+        self.ws1 = self.wb.add_worksheet("Properties")
+        self.ws2 = self.wb.add_worksheet("Measures")
+        self.ws3 = self.wb.add_worksheet("Scenarios")
+        self.ws4 = self.wb.add_worksheet("Scenario Measure Join Table")
+        self.ws5 = self.wb.add_worksheet("Meter Readings")
+        self.bold = self.wb.add_format({"bold": True})
+        # datetime formatting
+        self.date_format = self.wb.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+
+        self.row = 0
+        self.row2 = 0
+        self.row3 = 0
+        self.row4 = 0
+        self.row5 = 0
+        self.add_m_headers = True
+        self.add_s_headers = True
+
+        for index, val in enumerate(list(column_name_mappings.values())):
+            # Do not write the first element as ID, this causes weird issues with Excel.
+            if index == 0 and val == "ID":
+                self.ws1.write(self.row, index, "id", self.bold)
+            else:
+                self.ws1.write(self.row, index, val, self.bold)
 
-            # Convert quantities (this is typically handled in the JSON Encoder, but that isn't here).
-            if isinstance(row_result, ureg.Quantity):
-                row_result = row_result.magnitude
-            elif isinstance(row_result, datetime.datetime):
-                row_result = row_result.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(row_result, datetime.date):
-                row_result = row_result.strftime("%Y-%m-%d")
-            ws1.write(row, index, row_result)
-
-        # measures
-        for index, m in enumerate(datum["measures"]):
-            if add_m_headers:
-                # grab headers
-                for key in property_measure_keys:
-                    ws2.write(row2, col2, key, bold)
-                    col2 += 1
-                for key in measure_keys:
-                    ws2.write(row2, col2, "measure " + key, bold)
-                    col2 += 1
-                add_m_headers = False
-
-            row2 += 1
-            col2 = 0
-            for key in property_measure_keys:
-                ws2.write(row2, col2, getattr(m, key))
-                col2 += 1
-            for key in measure_keys:
-                ws2.write(row2, col2, getattr(m.measure, key))
-                col2 += 1
-
-        # scenarios (and join table)
         # join table
-        ws4.write("A1", "property_id", bold)
-        ws4.write("B1", "scenario_id", bold)
-        ws4.write("C1", "measure_id", bold)
-        for index, s in enumerate(datum["scenarios"]):
-            scenario_id = s.id
-            if add_s_headers:
-                # grab headers
-                for key in scenario_keys:
-                    # double check scenario_key_mappings in case a different header is desired
-                    updated_key = key
-                    if key in scenario_key_mappings:
-                        updated_key = scenario_key_mappings[key]
-                    ws3.write(row3, col3, updated_key, bold)
-                    col3 += 1
-                add_s_headers = False
-            row3 += 1
-            col3 = 0
-            for key in scenario_keys:
-                ws3.write(row3, col3, getattr(s, key))
-                col3 += 1
-
-            for sm in s.measures.all():
-                row4 += 1
-                ws4.write(row4, 0, id)
-                ws4.write(row4, 1, scenario_id)
-                ws4.write(row4, 2, sm.id)
+        for col, key in enumerate(("property_id", "scenario_id", "measure_id")):
+            self.ws4.write(0, col, key, self.bold)
 
         # scenario meter readings
-        ws5.write("A1", "scenario_id", bold)
-        ws5.write("B1", "meter_id", bold)
-        ws5.write("C1", "type", bold)
-        ws5.write("D1", "start_time", bold)
-        ws5.write("E1", "end_time", bold)
-        ws5.write("F1", "reading", bold)
-        ws5.write("G1", "units", bold)
-        ws5.write("H1", "is_virtual", bold)
-        # datetime formatting
-        date_format = wb.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
-
-        for index, s in enumerate(datum["scenarios"]):
-            scenario_id = s.id
-            # retrieve meters
-            meters = Meter.objects.filter(scenario_id=scenario_id)
-            for m in meters:
-                # retrieve readings
-                readings = MeterReading.objects.filter(meter_id=m.id).order_by("start_time")
-                for r in readings:
-                    row5 += 1
-                    ws5.write(row5, 0, scenario_id)
-                    ws5.write(row5, 1, m.id)
-                    the_type = next((item for item in Meter.ENERGY_TYPES if item[0] == m.type), None)
-                    the_type = the_type[1] if the_type is not None else None
-                    ws5.write(row5, 2, the_type)  # use energy type enum to determine reading type
-                    ws5.write_datetime(row5, 3, r.start_time, date_format)
-                    ws5.write_datetime(row5, 4, r.end_time, date_format)
-                    ws5.write(row5, 5, r.reading)  # this is now a float field
-                    ws5.write(row5, 6, r.source_unit)
-                    ws5.write(row5, 7, m.is_virtual)
-
-    wb.close()
-
-    # xlsx_data contains the Excel file
-    xlsx_bytes = output.getvalue()
-    xlsx_data = base64.b64encode(xlsx_bytes).decode("ascii")
-
-    return xlsx_data
+        for col, key in enumerate(("scenario_id", "meter_id", "type", "start_time", "end_time", "reading", "units", "is_virtual")):
+            self.ws5.write(0, col, key, self.bold)
+
+    def write(self, data):
+        # find measures and scenarios of the whole batch
+        state_ids = [datum["property_state_id"] for datum in data if datum.get("property_state_id") is not None]
+        measures_by_state_id = defaultdict(list)
+        for measure in PropertyMeasure.objects.filter(property_state_id__in=state_ids).select_related("measure").order_by("id"):
+            measures_by_state_id[measure.property_state_id].append(measure)
+
+        meters = Meter.objects.prefetch_related(Prefetch("meter_readings", queryset=MeterReading.objects.order_by("start_time")))
+        scenarios_by_state_id = defaultdict(list)
+        for scenario in (
+            Scenario.objects.filter(property_state_id__in=state_ids)
+            .prefetch_related("measures", Prefetch("meter_set", queryset=meters))
+            .order_by("id")
+        ):
+            scenarios_by_state_id[scenario.property_state_id].append(scenario)
+
+        energy_types = dict(Meter.ENERGY_TYPES)
+
+        # iterate over the results to preserve column order and write row.
+        for datum in data:
+            self.row += 1
+            for index, row_result in enumerate(_row_values(datum, self.column_name_mappings)):
+                self.ws1.write(self.row, index, row_result)
+            record_id = datum.get("id", None)
+
+            # measures
+            for m in measures_by_state_id.get(datum.get("property_state_id"), []):
+                if self.add_m_headers:
+                    # grab headers
+                    headers = list(self.property_measure_keys) + ["measure " + key for key in self.measure_keys]
+                    for col, key in enumerate(headers):
+                        self.ws2.write(self.row2, col, key, self.bold)
+                    self.add_m_headers = False
+
+                self.row2 += 1
+                values = [getattr(m, key) for key in self.property_measure_keys] + [getattr(m.measure, key) for key in self.measure_keys]
+                for col, value in enumerate(values):
+                    self.ws2.write(self.row2, col, value)
+
+            # scenarios (and join table)
+            scenarios = scenarios_by_state_id.get(datum.get("property_state_id"), [])
+            for s in scenarios:
+                scenario_id = s.id
+                if self.add_s_headers:
+                    # grab headers, double check scenario_key_mappings in case a different header is desired
+                    for col, key in enumerate(self.scenario_keys):
+                        self.ws3.write(self.row3, col, self.scenario_key_mappings.get(key, key), self.bold)
+                    self.add_s_headers = False
+                self.row3 += 1
+                for col, key in enumerate(self.scenario_keys):
+                    self.ws3.write(self.row3, col, getattr(s, key))
+
+                for sm in s.measures.all():
+                    self.row4 += 1
+                    self.ws4.write(self.row4, 0, record_id)
+                    self.ws4.write(self.row4, 1, scenario_id)
+                    self.ws4.write(self.row4, 2, sm.id)
+
+            # scenario meter readings
+            for s in scenarios:
+                for m in s.meter_set.all():
+                    # use energy type enum to determine reading type
+                    the_type = energy_types.get(m.type)
+                    for r in m.meter_readings.all():
+                        self.row5 += 1
+                        self.ws5.write(self.row5, 0, s.id)
+                        self.ws5.write(self.row5, 1, m.id)
+                        self.ws5.write(self.row5, 2, the_type)
+                        self.ws5.write_datetime(self.row5, 3, r.start_time, self.date_format)
+                        self.ws5.write_datetime(self.row5, 4, r.end_time, self.date_format)
+                        self.ws5.write(self.row5, 5, r.reading)  # this is now a float field
+                        self.ws5.write(self.row5, 6, r.source_unit)
+                        self.ws5.write(self.row5, 7, m.is_virtual)
+
+    def close(self):
+        self.wb.close()
 
 
 def _serialized_coordinates(polygon_wkt):
@@ -5,7 +5,7 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 
 from seed.lib.superperms.orgs.models import Organization
 from seed.models import VIEW_LIST, VIEW_LIST_TAXLOT, Column, ColumnListProfile, ColumnListProfileColumn, TaxLotProperty, TaxLotView
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 
 
 def taxlots_across_cycles(org_id, ali, profile_id, cycle_ids=[]):
@@ -42,7 +42,7 @@ def taxlots_across_cycles(org_id, ali, profile_id, cycle_ids=[]):
         related_results = TaxLotProperty.serialize(taxlot_views, show_columns, columns_from_database)
 
         org = Organization.objects.get(pk=org_id)
-        unit_collapsed_results = [apply_display_unit_preferences(org, x) for x in related_results]
+        unit_collapsed_results = apply_display_unit_preferences_to_page(org, related_results)
 
         results[cycle_id] = unit_collapsed_results
 
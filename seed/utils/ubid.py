@@ -22,7 +22,8 @@ def centroid_wkt(state):
     This translates GIS data saved as binary (WKB) into a text string (WKT).
     """
     if state.centroid:
-        return GEOSGeometry(state.centroid, srid=4326).wkt
+        geom = state.centroid
+        return geom.wkt if isinstance(geom, GEOSGeometry) else GEOSGeometry(geom, srid=4326).wkt
 
 
 def decode_unique_ids(qs):
@@ -46,38 +47,51 @@ def decode_unique_ids(qs):
     filtered_qs = qs.exclude(ubid__isnull=True)
 
     for state in filtered_qs.iterator():
-        try:
-            bounding_box_obj = decode(getattr(state, "ubid"))
-        except ValueError:
+        if not set_decoded_ubid_fields(state):
             continue  # state with an incorrectly formatted UBID is skipped
 
-        # Starting with the SE point, list the points in counter-clockwise order
-        bounding_box_polygon = (
-            f"POLYGON (({bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeLo}, "
-            f"{bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeHi}, "
-            f"{bounding_box_obj.longitudeLo} {bounding_box_obj.latitudeHi}, "
-            f"{bounding_box_obj.longitudeLo} {bounding_box_obj.latitudeLo}, "
-            f"{bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeLo}))"
-        )
-        state.bounding_box = bounding_box_polygon
-
-        # Starting with the SE point, list the points in counter-clockwise order
-        centroid_polygon = (
-            f"POLYGON (({bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeLo}, "
-            f"{bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeHi}, "
-            f"{bounding_box_obj.centroid.longitudeLo} {bounding_box_obj.centroid.latitudeHi}, "
-            f"{bounding_box_obj.centroid.longitudeLo} {bounding_box_obj.centroid.latitudeLo}, "
-            f"{bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeLo}))"
-        )
-        state.centroid = centroid_polygon
-
-        # Round to avoid floating point errors
-        state.latitude = round(bounding_box_obj.centroid.latitudeCenter, 12)
-        state.longitude = round(bounding_box_obj.centroid.longitudeCenter, 12)
-
         state.save()
 
 
+def set_decoded_ubid_fields(state):
+    """
+    Set the bounding_box, centroid, latitude and longitude of a state from its UBID, without saving it
+
+    :param state: PropertyState or TaxLotState with a UBID
+    :return: bool, False if the UBID is incorrectly formatted and the state was left unchanged
+    """
+    try:
+        bounding_box_obj = decode(getattr(state, "ubid"))
+    except ValueError:
+        return False
+
+    # Starting with the SE point, list the points in counter-clockwise order
+    bounding_box_polygon = (
+        f"POLYGON (({bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeLo}, "
+        f"{bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeHi}, "
+        f"{bounding_box_obj.longitudeLo} {bounding_box_obj.latitudeHi}, "
+        f"{bounding_box_obj.longitudeLo} {bounding_box_obj.latitudeLo}, "
+        f"{bounding_box_obj.longitudeHi} {bounding_box_obj.latitudeLo}))"
+    )
+    state.bounding_box = bounding_box_polygon
+
+    # Starting with the SE point, list the points in counter-clockwise order
+    centroid_polygon = (
+        f"POLYGON (({bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeLo}, "
+        f"{bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeHi}, "
+        f"{bounding_box_obj.centroid.longitudeLo} {bounding_box_obj.centroid.latitudeHi}, "
+        f"{bounding_box_obj.centroid.longitudeLo} {bounding_box_obj.centroid.latitudeLo}, "
+        f"{bounding_box_obj.centroid.longitudeHi} {bounding_box_obj.centroid.latitudeLo}))"
+    )
+    state.centroid = centroid_polygon
+
+    # Round to avoid floating point errors
+    state.latitude = round(bounding_box_obj.centroid.latitudeCenter, 12)
+    state.longitude = round(bounding_box_obj.centroid.longitudeCenter, 12)
+
+    return True
+
+
 def get_jaccard_index(ubid1: str, ubid2: str) -> float:
     """
     Calculates the Jaccard index given two UBIDs
@@ -29,7 +29,7 @@ from seed.models import (
 )
 from seed.serializers.column_list_profiles import ColumnListProfileSerializer
 from seed.serializers.columns import ColumnSerializer
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 
 
 class InventoryFilterError(Exception):
@@ -92,7 +92,7 @@ class InventoryFilter:
         except InventoryFilterError as e:
             return e.response
 
-        unit_collapsed_results = [apply_display_unit_preferences(self.org, x) for x in related_results]
+        unit_collapsed_results = apply_display_unit_preferences_to_page(self.org, related_results)
         results = self.parse_related_results(unit_collapsed_results)
         column_defs = self.get_column_defs()
         response = self.build_response(results, column_defs)
@@ -6,6 +6,7 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 import csv
 
 from celery.utils.log import get_task_logger
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.http import HttpResponse, JsonResponse
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
@@ -21,10 +22,13 @@ from seed.models import PropertyView, TaxLotView
 from seed.models.data_quality import DataQualityCheck
 from seed.utils.api import OrgMixin, api_endpoint
 from seed.utils.api_schema import AutoSchemaHelper
-from seed.utils.cache import get_cache_raw
+from seed.utils.generic import get_int
 
 logger = get_task_logger(__name__)
 
+# results per page by default, which is every result of most runs, and at most
+DATA_QUALITY_RESULTS_MAX_PER_PAGE = 100000
+
 
 class DataQualityCheckViewSet(viewsets.ViewSet, OrgMixin):
     """
@@ -133,17 +137,19 @@ class DataQualityCheckViewSet(viewsets.ViewSet, OrgMixin):
         are stored in redis!
         """
         run_id = request.query_params.get("run_id")
-        if run_id is None:
+        try:
+            run_id = int(run_id)
+        except (TypeError, ValueError):
             return JsonResponse(
                 {"status": "error", "message": "must include Import file ID or cache key as run_id"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        data_quality_results = get_cache_raw(DataQualityCheck.cache_key(run_id, self.get_organization(request)))
+        data_quality_results = DataQualityCheck.retrieve_results(run_id, self.get_organization(request))
         response = HttpResponse(content_type="text/csv")
         response["Content-Disposition"] = 'attachment; filename="Data Quality Check Results.csv"'
 
         writer = csv.writer(response)
-        if data_quality_results is None:
+        if not data_quality_results.exists():
             writer.writerow(["Error"])
             writer.writerow(["data quality results not found"])
             return response
@@ -163,7 +169,7 @@ class DataQualityCheckViewSet(viewsets.ViewSet, OrgMixin):
             ]
         )
 
-        for row in data_quality_results:
+        for row in data_quality_results.values_list("result", flat=True).iterator():
             for result in row["data_quality_results"]:
                 writer.writerow(
                     [
@@ -188,6 +194,11 @@ class DataQualityCheckViewSet(viewsets.ViewSet, OrgMixin):
         manual_parameters=[
             AutoSchemaHelper.query_org_id_field(),
             AutoSchemaHelper.query_integer_field("run_id", True, "Import file ID or cache key"),
+            AutoSchemaHelper.query_integer_field("page", False, "Page to fetch"),
+            AutoSchemaHelper.query_integer_field("per_page", False, "Number of records per page"),
+            AutoSchemaHelper.query_string_field("table_name", False, "Only return results for PropertyState, TaxLotState or Goal"),
+            AutoSchemaHelper.query_string_field("severity", False, "Only return records with a result of this severity"),
+            AutoSchemaHelper.query_string_field("field", False, "Only return records with a result for this field"),
         ]
     )
     @method_decorator(
@@ -203,9 +214,54 @@ class DataQualityCheckViewSet(viewsets.ViewSet, OrgMixin):
         Return the results of a data quality run based on either the ID that was
         given during the creation of the data quality task or the ID of the
         import file which had it's records checked.
-        Note that it is not related to objects in the database, since the results
-        are stored in redis!
+        The results can be filtered by table_name, severity and field, and are paginated
+        with page and per_page.
         """
-        data_quality_id = request.query_params["run_id"]
-        data_quality_results = get_cache_raw(DataQualityCheck.cache_key(data_quality_id, self.get_organization(request)))
-        return JsonResponse({"data": data_quality_results})
+        try:
+            data_quality_id = int(request.query_params.get("run_id"))
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {"status": "error", "message": "must include Import file ID or cache key as run_id"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        page = request.query_params.get("page", 1)
+        per_page = get_int(request.query_params.get("per_page", DATA_QUALITY_RESULTS_MAX_PER_PAGE))
+        if per_page is None:
+            return JsonResponse({"status": "error", "message": "per_page must be a positive integer"}, status=status.HTTP_400_BAD_REQUEST)
+        per_page = min(per_page, DATA_QUALITY_RESULTS_MAX_PER_PAGE)
+
+        data_quality_results = DataQualityCheck.retrieve_results(data_quality_id, self.get_organization(request))
+        table_name = request.query_params.get("table_name")
+        if table_name:
+            data_quality_results = data_quality_results.filter(table_name=table_name)
+        severity = request.query_params.get("severity")
+        if severity:
+            data_quality_results = data_quality_results.filter(result__data_quality_results__contains=[{"severity": severity}])
+        field = request.query_params.get("field")
+        if field:
+            data_quality_results = data_quality_results.filter(result__data_quality_results__contains=[{"field": field}])
+
+        paginator = Paginator(data_quality_results.values_list("result", flat=True), per_page)
+        try:
+            results = paginator.page(page).object_list
+            page = int(page)
+        except PageNotAnInteger:
+            results = paginator.page(1).object_list
+            page = 1
+        except EmptyPage:
+            results = paginator.page(paginator.num_pages).object_list
+            page = paginator.num_pages
+
+        return JsonResponse(
+            {
+                "pagination": {
+                    "page": page,
+                    "start": paginator.page(page).start_index(),
+                    "end": paginator.page(page).end_index(),
+                    "num_pages": paginator.num_pages,
+                    "has_next": paginator.page(page).has_next(),
+                    "has_previous": paginator.page(page).has_previous(),
+                    "total": paginator.count,
+                },
+                "data": list(results),
+            }
+        )
@@ -283,9 +283,9 @@ class DerivedColumnViewSet(viewsets.ViewSet, OrgMixin):
             }
         ).prefetch_related("state", inventory_name)
 
-        results = []
-        for view in inventory_views:
-            results.append({"id": getattr(view, inventory_name).id, "value": derived_column.evaluate(view.state)})
+        inventory_views = list(inventory_views)
+        values = derived_column.evaluate_many([view.state for view in inventory_views])
+        results = [{"id": getattr(view, inventory_name).id, "value": value} for view, value in zip(inventory_views, values)]
 
         return JsonResponse({"status": "success", "results": results})
 
@@ -26,7 +26,7 @@ from seed.models import (
     TaxLotProperty,
 )
 from seed.serializers.facilities_plan_run import FacilitiesPlanRunSerializer
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 from seed.utils.api import api_endpoint
 from seed.utils.search import FilterError, build_view_filters_and_sorts
 from seed.utils.viewsets import SEEDOrgNoPatchOrOrgCreateModelViewSet
@@ -177,7 +177,7 @@ class FacilitiesPlanRunViewSet(SEEDOrgNoPatchOrOrgCreateModelViewSet):
 
         # collapse pint quantity units to their magnitudes
         properties = TaxLotProperty.serialize(views, show_columns, columns_from_database, False, pk)
-        properties = [apply_display_unit_preferences(org, x) for x in properties]
+        properties = apply_display_unit_preferences_to_page(org, properties)
 
         if paginator.page(page).start_index() > 0:
             for property_json, run_info in zip(
@@ -14,7 +14,7 @@ from seed.decorators import ajax_request
 from seed.lib.superperms.orgs.decorators import has_hierarchy_access, has_perm
 from seed.models import AccessLevelInstance, Column, Goal, GoalNote, HistoricalNote, Organization, Property, TaxLotProperty
 from seed.serializers.goals import GoalSerializer
-from seed.serializers.pint import apply_display_unit_preferences
+from seed.serializers.pint import apply_display_unit_preferences_to_page
 from seed.utils.api import OrgMixin
 from seed.utils.api_schema import swagger_auto_schema_org_query_param
 from seed.utils.generic import get_int
@@ -275,8 +275,8 @@ class GoalViewSet(ModelViewSetWithoutPatch, OrgMixin):
         properties1 = TaxLotProperty.serialize(views1, show_columns, columns_from_database, False, pk)
         properties2 = TaxLotProperty.serialize(views2, show_columns, columns_from_database, False, pk)
         # collapse pint quantity units to their magnitudes
-        properties1 = [apply_display_unit_preferences(org, x) for x in properties1]
-        properties2 = [apply_display_unit_preferences(org, x) for x in properties2]
+        properties1 = apply_display_unit_preferences_to_page(org, properties1)
+        properties2 = apply_display_unit_preferences_to_page(org, properties2)
 
         area_name = f"{goal.area_column.column_name}_{goal.area_column.id}"
         eui_columns = [f"{col.column_name}_{col.id}" for col in goal.eui_columns()]
@@ -5,39 +5,37 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 
 import logging
 from datetime import datetime
-from random import randint
 
 import xlrd
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import DataError
+from django.db.models import Count, Q
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
 from django.utils.timezone import make_aware
 from drf_yasg.utils import swagger_auto_schema
 from pytz import AmbiguousTimeError, NonExistentTimeError, timezone
-from rest_framework import serializers, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 
 from config.settings.common import TIME_ZONE
 from seed.data_importer.meters_parser import MetersParser
 from seed.data_importer.models import ROW_DELIMITER, ImportRecord
 from seed.data_importer.sensor_readings_parser import SensorsReadingsParser
-from seed.data_importer.tasks import do_checks, geocode_and_match_buildings_task, map_data, mapping_results_task
+from seed.data_importer.tasks import do_checks, geocode_and_match_buildings_task, map_data
 from seed.data_importer.tasks import save_raw_data as task_save_raw
 from seed.data_importer.tasks import validate_use_cases as task_validate_use_cases
 from seed.data_importer.utils import kbtu_thermal_conversion_factors, kgal_water_conversion_factors
 from seed.decorators import ajax_request
 from seed.lib.mappings import mapper as simple_mapper
 from seed.lib.mcm import mapper, reader
-from seed.lib.progress_data.progress_data import ProgressData
 from seed.lib.superperms.orgs.decorators import has_hierarchy_access, has_perm
 from seed.lib.superperms.orgs.models import AccessLevelInstance, OrganizationUser
 from seed.lib.xml_mapping import mapper as xml_mapper
 from seed.models import (
     ASSESSED_RAW,
-    AUDIT_USER_EDIT,
     DATA_STATE_MATCHING,
-    MERGE_STATE_MERGED,
-    MERGE_STATE_NEW,
     PORTFOLIO_METER_USAGE,
     SEED_DATA_SOURCES,
     Column,
@@ -46,39 +44,22 @@ from seed.models import (
     Meter,
     MeterReading,
     Organization,
-    PropertyAuditLog,
     PropertyState,
     PropertyView,
     System,
-    TaxLotAuditLog,
     TaxLotState,
     get_column_mapping,
     obj_to_dict,
 )
 from seed.utils.api import OrgMixin, api_endpoint
 from seed.utils.api_schema import AutoSchemaHelper, swagger_auto_schema_org_query_param
+from seed.utils.generic import get_int
+from seed.utils.mapping_results import MAPPING_RESULTS_MAX_PER_PAGE, get_mapped_columns, get_mapped_states, mapped_state_to_dict
+from seed.utils.search import FilterError, build_view_filters_and_sorts
 
 _log = logging.getLogger(__name__)
 
 
-class MappingResultsPropertySerializer(serializers.Serializer):
-    pm_property_id = serializers.CharField(max_length=100)
-    address_line_1 = serializers.CharField(max_length=100)
-    property_name = serializers.CharField(max_length=100)
-
-
-class MappingResultsTaxLotSerializer(serializers.Serializer):
-    pm_property_id = serializers.CharField(max_length=100)
-    address_line_1 = serializers.CharField(max_length=100)
-    jurisdiction_tax_lot_id = serializers.CharField(max_length=100)
-
-
-class MappingResultsResponseSerializer(serializers.Serializer):
-    status = serializers.CharField(max_length=100)
-    properties = MappingResultsPropertySerializer(many=True)
-    tax_lots = MappingResultsTaxLotSerializer(many=True)
-
-
 def convert_first_five_rows_to_list(header, first_five_rows):
     """
     Return the first five rows. This is a complicated method because it handles converting the
@@ -134,6 +115,23 @@ def convert_first_five_rows_to_list(header, first_five_rows):
     return [dict(zip(header, row)) for row in rows]
 
 
+def _geocoding_results(state_class, import_file_id):
+    """
+    Count the matched states of an import file by geocoding confidence in one query
+
+    :param state_class: PropertyState or TaxLotState
+    :param import_file_id: int
+    :return: dict, number of states per geocoding result
+    """
+    return state_class.objects.filter(import_file_id=import_file_id, data_state=DATA_STATE_MATCHING).aggregate(
+        high_confidence=Count("id", filter=Q(geocoding_confidence__startswith="High")),
+        low_confidence=Count("id", filter=Q(geocoding_confidence__startswith="Low")),
+        census_geocoder=Count("id", filter=Q(geocoding_confidence__startswith="Census")),
+        manual=Count("id", filter=Q(geocoding_confidence="Manually geocoded (N/A)")),
+        missing_address_components=Count("id", filter=Q(geocoding_confidence="Missing address components (N/A)")),
+    )
+
+
 class ImportFileViewSet(viewsets.ViewSet, OrgMixin):
     raise_exception = True
     queryset = ImportFile.objects.all()
@@ -313,8 +311,15 @@ class ImportFileViewSet(viewsets.ViewSet, OrgMixin):
     @swagger_auto_schema(
         manual_parameters=[
             AutoSchemaHelper.query_org_id_field(),
-        ],
-        responses={200: MappingResultsResponseSerializer},
+            AutoSchemaHelper.query_string_field("inventory_type", required=True, description="Either properties or taxlots"),
+            AutoSchemaHelper.query_integer_field("page", required=False, description="Page to fetch"),
+            AutoSchemaHelper.query_integer_field(
+                "per_page", required=False, description=f"Number of mapped states per page, at most {MAPPING_RESULTS_MAX_PER_PAGE}"
+            ),
+            AutoSchemaHelper.query_string_field(
+                "order_by", required=False, description="Column name to sort by, prefixed with '-' for descending order"
+            ),
+        ]
     )
     @method_decorator(
         [
@@ -324,27 +329,82 @@ class ImportFileViewSet(viewsets.ViewSet, OrgMixin):
             has_hierarchy_access(import_file_id_kwarg="pk"),
         ]
     )
-    @action(detail=True, methods=["POST"], url_path="mapping_results")
-    def mapping_results(self, request, pk=None):
+    @action(detail=True, methods=["GET"])
+    def paginated_mapping_results(self, request, pk=None):
         """
-        Retrieves a paginated list of Properties and Tax Lots for an import file after mapping.
+        Retrieves a page of the Properties or Tax Lots of an import file after mapping, sorted and
+        filtered on the mapped columns with the same query parameters as the inventory lists. The
+        names of the mapped columns are returned with the page so that empty pages can be shown.
         """
-        import_file_id = pk
         org_id = self.get_organization(request)
-        inventory_type = request.data.get("inventory_type", "all")
-
-        progress_data = ProgressData(func_name="mapping_results", unique_id=f"{org_id}{randint(10000, 99999)}")
-        progress_key = progress_data.key
-        args = {
-            "import_file_id": import_file_id,
-            "inventory_type": inventory_type,
-            "org_id": org_id,
-            "progress_key": progress_key,
-        }
+        org = Organization.objects.get(pk=org_id)
+        inventory_type = request.query_params.get("inventory_type")
+        page = request.query_params.get("page", 1)
+        per_page = get_int(request.query_params.get("per_page", 100))
+        if per_page is None:
+            return JsonResponse({"status": "error", "message": "per_page must be a positive integer"}, status=status.HTTP_400_BAD_REQUEST)
+        per_page = min(per_page, MAPPING_RESULTS_MAX_PER_PAGE)
+
+        table_names = {"properties": "PropertyState", "taxlots": "TaxLotState"}
+        if inventory_type not in table_names:
+            return JsonResponse(
+                {"status": "error", "message": "inventory_type must be either properties or taxlots"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        table_name = table_names[inventory_type]
+
+        try:
+            import_file = ImportFile.objects.get(pk=pk, import_record__super_organization_id=org_id)
+        except ImportFile.DoesNotExist:
+            return JsonResponse(
+                {"status": "error", "message": "Could not find import file with pk=" + str(pk)}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-        mapping_results_task.s(args).apply_async()
+        mapped_table = get_mapped_columns(import_file, org_id)[table_name]
+        states = get_mapped_states(import_file.pk, table_name, mapped_table["fields"])
+        try:
+            filters, annotations, order_by = build_view_filters_and_sorts(
+                request.query_params,
+                mapped_table["columns"],
+                "property" if inventory_type == "properties" else "taxlot",
+                org.access_level_names,
+                state_prefix="",
+                access_level_instance_field="raw_access_level_instance",
+            )
+            states = states.annotate(**annotations).filter(filters).order_by(*order_by, "id")
 
-        return progress_data.result()
+            paginator = Paginator(states, per_page)
+            try:
+                states_page = paginator.page(page)
+            except PageNotAnInteger:
+                states_page = paginator.page(1)
+            except EmptyPage:
+                states_page = paginator.page(paginator.num_pages)
+            # read the page here, the filters are only cast by the database when it is evaluated
+            data = [mapped_state_to_dict(state, org, mapped_table) for state in states_page]
+        except (FilterError, ValueError) as e:
+            return JsonResponse({"status": "error", "message": f"Error filtering: {e!s}"}, status=status.HTTP_400_BAD_REQUEST)
+        except DataError as e:
+            return JsonResponse(
+                {"status": "error", "message": f"Error filtering - your data might not match the column settings data type: {e!s}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return JsonResponse(
+            {
+                "status": "success",
+                "pagination": {
+                    "page": states_page.number,
+                    "start": states_page.start_index(),
+                    "end": states_page.end_index(),
+                    "num_pages": paginator.num_pages,
+                    "has_next": states_page.has_next(),
+                    "has_previous": states_page.has_previous(),
+                    "total": paginator.count,
+                },
+                "columns": [column["name"] for column in mapped_table["columns"]],
+                "data": data,
+            }
+        )
 
     @staticmethod
     def has_coparent(state_id, inventory_type):
@@ -606,119 +666,8 @@ class ImportFileViewSet(viewsets.ViewSet, OrgMixin):
                 {"status": "error", "message": "Could not find import file with pk=" + str(pk)}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # property views associated with this imported file (including merges)
-        properties_new = []
-        properties_matched = list(
-            PropertyState.objects.filter(
-                import_file__pk=import_file.pk,
-                data_state=DATA_STATE_MATCHING,
-                merge_state=MERGE_STATE_MERGED,
-            ).values_list("id", flat=True)
-        )
-
-        # Check audit log in case PropertyStates are listed as "new" but were merged into a different property
-        properties = list(
-            PropertyState.objects.filter(
-                import_file__pk=import_file.pk,
-                data_state=DATA_STATE_MATCHING,
-                merge_state=MERGE_STATE_NEW,
-            )
-        )
-
-        for state in properties:
-            audit_creation_id = (
-                PropertyAuditLog.objects.only("id").exclude(import_filename=None).get(state_id=state.id, name="Import Creation")
-            )
-            if PropertyAuditLog.objects.exclude(record_type=AUDIT_USER_EDIT).filter(parent1_id=audit_creation_id).exists():
-                properties_matched.append(state.id)
-            else:
-                properties_new.append(state.id)
-
-        tax_lots_new = []
-        tax_lots_matched = list(
-            TaxLotState.objects.only("id")
-            .filter(
-                import_file__pk=import_file.pk,
-                data_state=DATA_STATE_MATCHING,
-                merge_state=MERGE_STATE_MERGED,
-            )
-            .values_list("id", flat=True)
-        )
-
-        # Check audit log in case TaxLotStates are listed as "new" but were merged into a different tax lot
-        taxlots = list(
-            TaxLotState.objects.filter(
-                import_file__pk=import_file.pk,
-                data_state=DATA_STATE_MATCHING,
-                merge_state=MERGE_STATE_NEW,
-            )
-        )
-
-        for state in taxlots:
-            audit_creation_id = (
-                TaxLotAuditLog.objects.only("id").exclude(import_filename=None).get(state_id=state.id, name="Import Creation")
-            )
-            if TaxLotAuditLog.objects.exclude(record_type=AUDIT_USER_EDIT).filter(parent1_id=audit_creation_id).exists():
-                tax_lots_matched.append(state.id)
-            else:
-                tax_lots_new.append(state.id)
-
-        # Construct Geocode Results
-        property_geocode_results = {
-            "high_confidence": len(
-                PropertyState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="High"
-                )
-            ),
-            "low_confidence": len(
-                PropertyState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="Low"
-                )
-            ),
-            "census_geocoder": len(
-                PropertyState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="Census"
-                )
-            ),
-            "manual": len(
-                PropertyState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence="Manually geocoded (N/A)"
-                )
-            ),
-            "missing_address_components": len(
-                PropertyState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence="Missing address components (N/A)"
-                )
-            ),
-        }
-
-        tax_lot_geocode_results = {
-            "high_confidence": len(
-                TaxLotState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="High"
-                )
-            ),
-            "low_confidence": len(
-                TaxLotState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="Low"
-                )
-            ),
-            "census_geocoder": len(
-                TaxLotState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence__startswith="Census"
-                )
-            ),
-            "manual": len(
-                TaxLotState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence="Manually geocoded (N/A)"
-                )
-            ),
-            "missing_address_components": len(
-                TaxLotState.objects.filter(
-                    import_file__pk=import_file.pk, data_state=DATA_STATE_MATCHING, geocoding_confidence="Missing address components (N/A)"
-                )
-            ),
-        }
+        property_geocode_results = _geocoding_results(PropertyState, import_file.pk)
+        tax_lot_geocode_results = _geocoding_results(TaxLotState, import_file.pk)
 
         # merge in any of the matching results from the JSON field
         return {
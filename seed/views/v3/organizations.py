@@ -66,7 +66,7 @@ from seed.models import StatusLabel as Label
 from seed.serializers.column_mappings import SaveColumnMappingsRequestPayloadSerializer
 from seed.serializers.columns import ColumnSerializer
 from seed.serializers.organizations import SaveSettingsSerializer, SharedFieldsReturnSerializer
-from seed.serializers.pint import add_pint_unit_suffix, apply_display_unit_preferences
+from seed.serializers.pint import add_pint_unit_suffix, apply_display_unit_preferences_to_page
 from seed.serializers.report_configurations import ReportConfigurationSerializer
 from seed.utils.api import api_endpoint
 from seed.utils.api_schema import AutoSchemaHelper
@@ -77,6 +77,7 @@ from seed.utils.merge import merge_properties
 from seed.utils.organizations import create_organization, create_suborganization, set_default_2fa_method
 from seed.utils.properties import pair_unpair_property_taxlot
 from seed.utils.public import public_feed
+from seed.utils.reports import aggregate_report_data
 from seed.utils.salesforce import toggle_salesforce_sync
 from seed.utils.users import get_js_role
 
@@ -181,6 +182,7 @@ def _dict_org(request, organizations):
                 Column.objects.filter(organization=o, table_name="PropertyState", is_option_for_reports_y_axis=True), many=True
             ).data,
             "require_2fa": o.require_2fa,
+            "import_chunk_size": o.import_chunk_size,
         }
         orgs.append(org)
 
@@ -747,6 +749,17 @@ class OrganizationViewSet(viewsets.ViewSet):
 
             org.ubid_threshold = ubid_threshold
 
+        # update the import chunk size override, null reverts to the computed chunk size
+        if "import_chunk_size" in posted_org:
+            import_chunk_size = posted_org.get("import_chunk_size")
+            if import_chunk_size is not None and (type(import_chunk_size) is not int or import_chunk_size < 1):
+                return JsonResponse(
+                    {"status": "error", "message": "import_chunk_size must be a positive integer or null"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            org.import_chunk_size = import_chunk_size
+
         org.save()
 
         # Update the selected exportable fields.
@@ -937,8 +950,10 @@ class OrganizationViewSet(viewsets.ViewSet):
             all_property_views = filter_group.views(all_property_views)
 
         # annotate properties with fields
+        access_level_names = Organization.objects.get(pk=organization_id).access_level_names
+
         def get_column_model_field(column):
-            if column in Organization.objects.get(pk=organization_id).access_level_names:
+            if column in access_level_names:
                 return F("property__access_level_instance__path__" + column)
             elif column == "Count":
                 return Value(1)
@@ -965,7 +980,7 @@ class OrganizationViewSet(viewsets.ViewSet):
         results = []
         for cycle in cycles:
             property_views = all_property_views.annotate(yr_e=Value(str(cycle.end.year))).filter(cycle_id=cycle)
-            data = [apply_display_unit_preferences(organization, d) for d in property_views.values("id", *fields.keys(), "yr_e")]
+            data = apply_display_unit_preferences_to_page(organization, property_views.values("id", *fields.keys(), "yr_e"))
 
             # count before and after we prune the empty ones
             # watch out not to prune boolean fields
@@ -1128,6 +1143,14 @@ class OrganizationViewSet(viewsets.ViewSet):
 
         cycles = Cycle.objects.filter(id__in=params["cycle_ids"]).order_by("-end")
         report_data = self.setup_report_data(pk, ali, cycles, x_var, y_var, filter_group_id)
+
+        # bin and aggregate in the database unless the values are only known in Python, e.g., extra data
+        aggregated_data = aggregate_report_data(
+            Organization.objects.get(pk=pk), report_data["all_property_views"], cycles, x_var, y_var, params["aggregation_type"]
+        )
+        if aggregated_data is not None:
+            return Response({"status": "success", "aggregated_data": aggregated_data}, status=status.HTTP_200_OK)
+
         data = self.get_raw_report_data(pk, cycles, report_data["all_property_views"], report_data["field_data"])
         chart_data = []
         property_counts = []
@@ -1368,7 +1391,7 @@ class OrganizationViewSet(viewsets.ViewSet):
 
         data = [
             d[axis]
-            for d in [apply_display_unit_preferences(organization, d) for d in filtered_properties.values(axis)]
+            for d in apply_display_unit_preferences_to_page(organization, filtered_properties.values(axis))
             if axis in d and d[axis] is not None and d[axis] is not True and d[axis] is not False and isinstance(d[axis], (int, float))
         ]
 
@@ -1,10 +1,14 @@
 from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 
 from seed.models import Cycle, Organization
+from seed.utils.cache import get_cache_raw, set_cache_raw
 from seed.utils.public import (
+    PUBLIC_FEED_CACHE_TIMEOUT,
     PUBLIC_HTML_DISABLED,
     PUBLIC_HTML_HEADER,
     PUBLIC_HTML_STYLE,
@@ -12,10 +16,37 @@ from seed.utils.public import (
     get_request_cycles,
     page_navigation_link,
     public_feed,
+    public_feed_version,
     public_geojson,
 )
 
 
+def _public_feed_response(request, org, version, render):
+    """
+    Respond with Not Modified when the client has the current version of the feed, else with the feed
+    rendered by render(), which is cached by the version of the feed. Only the ETag is checked, as the
+    Last-Modified time doesn't change with every change of the feed.
+    """
+    etag = quote_etag(version["etag"])
+    last_modified = int(version["last_modified"].timestamp()) if version["last_modified"] else None
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cache_key = f"public_feed:{org.id}:{version['etag']}"
+        cached = get_cache_raw(cache_key)
+        if cached is None:
+            response = render()
+            set_cache_raw(cache_key, (response.content, response["Content-Type"]), PUBLIC_FEED_CACHE_TIMEOUT)
+        else:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
+
+
 class PublicOrganizationViewSet(viewsets.ViewSet):
     """
     Public endpoints that do not require a login
@@ -35,6 +66,10 @@ class PublicOrganizationViewSet(viewsets.ViewSet):
         :query_param taxlots: boolean to return taxlots. Default is True
         :query_param page: integer page number
         :query_param per_page: integer results per page
+        :query_param cursor: pagination.next_cursor of the previous page, to read the next page faster than by page number
+
+        Responses have an ETag and a Last-Modified header, and requests with If-None-Match are answered with
+        304 Not Modified until the feed changes. Changes show up within PUBLIC_FEED_VERSION_CACHE_TIMEOUT.
 
         Example requests:
         {seed_url}/api/v3/public/organizations/feed.json?{query_param1}={value1}&{query_param2}={value2}
@@ -54,8 +89,15 @@ class PublicOrganizationViewSet(viewsets.ViewSet):
                 }
             )
         cycles = get_request_cycles(org, request)
-        feed = public_feed(org, request, cycles)
-        return JsonResponse(feed, json_dumps_params={"indent": 4}, status=status.HTTP_200_OK)
+        version = public_feed_version(org, request, cycles)
+        return _public_feed_response(
+            request,
+            org,
+            version,
+            lambda: JsonResponse(
+                public_feed(org, request, cycles, version=version), json_dumps_params={"indent": 4}, status=status.HTTP_200_OK
+            ),
+        )
 
     @action(detail=True, methods=["get"], url_path="feed.html")
     def feed_html(self, request, pk):
@@ -69,6 +111,7 @@ class PublicOrganizationViewSet(viewsets.ViewSet):
         :query_param taxlots: boolean to return taxlots. Default is True
         :query_param page: integer page number
         :query_param per_page: integer results per page
+        :query_param cursor: pagination.next_cursor of the previous page, to read the next page faster than by page number
 
         Example requests:
         {seed_url}/api/v3/public/organizations/feed.html?{query_param1}={value1}&{query_param2}={value2}
@@ -84,10 +127,14 @@ class PublicOrganizationViewSet(viewsets.ViewSet):
         if not org.public_feed_enabled:
             return HttpResponse(PUBLIC_HTML_DISABLED.format(org.name, org.id))
 
-        query_params = request.GET.copy()
-        base_url = f"/api/v3/public/organizations/{pk}/feed.html"
         cycles = get_request_cycles(org, request)
-        data = public_feed(org, request, cycles, "html")
+        version = public_feed_version(org, request, cycles, "html")
+        return _public_feed_response(request, org, version, lambda: self._render_feed_html(request, org, cycles, version))
+
+    def _render_feed_html(self, request, org, cycles, version):
+        query_params = request.GET.copy()
+        base_url = f"/api/v3/public/organizations/{org.id}/feed.html"
+        data = public_feed(org, request, cycles, "html", version)
 
         page_header = f"""
             <div class="page_title">
@@ -168,6 +215,10 @@ class PublicCycleViewSet(viewsets.ViewSet):
                 }
             )
 
-        geojson = public_geojson(org, cycle, request)
-
-        return JsonResponse(geojson, json_dumps_params={"indent": 4}, status=status.HTTP_200_OK)
+        version = public_feed_version(org, request, [cycle.id], "geojson")
+        return _public_feed_response(
+            request,
+            org,
+            version,
+            lambda: JsonResponse(public_geojson(org, cycle, request, version), json_dumps_params={"indent": 4}, status=status.HTTP_200_OK),
+        )
@@ -4,9 +4,10 @@ See also https://github.com/SEED-platform/seed/blob/main/LICENSE.md
 """
 
 import logging
+import os
 from random import randint
 
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import action
@@ -21,7 +22,9 @@ from seed.serializers.tax_lot_properties import TaxLotPropertySerializer
 from seed.tasks import export_data_task, set_update_to_now
 from seed.utils.api import OrgMixin, api_endpoint
 from seed.utils.api_schema import AutoSchemaHelper
+from seed.utils.cache import get_cache_raw
 from seed.utils.match import update_sub_progress_total
+from seed.utils.tax_lot_properties import EXPORT_CONTENT_TYPES, export_file_path
 
 _log = logging.getLogger(__name__)
 
@@ -100,6 +103,42 @@ class TaxLotPropertyViewSet(GenericViewSet, OrgMixin):
 
         return progress_data.result()
 
+    @swagger_auto_schema(
+        manual_parameters=[
+            AutoSchemaHelper.query_org_id_field(),
+            AutoSchemaHelper.query_string_field("unique_id", True, "unique_id of the finished export's progress data"),
+        ],
+    )
+    @method_decorator(
+        [
+            api_endpoint,
+            ajax_request,
+            has_perm("requires_member"),
+        ]
+    )
+    @action(detail=False, methods=["GET"])
+    def download_export(self, request):
+        """
+        Download the file written by a finished start_export. The file is streamed from disk and is
+        available for 30 minutes after the export finishes.
+        """
+        org_id = self.get_organization(request)
+        unique_id = request.query_params.get("unique_id")
+        export = get_cache_raw(unique_id) if unique_id else None
+        if not isinstance(export, dict) or str(export.get("org_id")) != str(org_id):
+            return JsonResponse({"status": "error", "message": "No export found for the provided unique_id"}, status=404)
+
+        path = export_file_path(unique_id, export["export_type"])
+        if not os.path.exists(path):
+            return JsonResponse({"status": "error", "message": "Export file has expired, please export again"}, status=404)
+
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=export["filename"],
+            content_type=EXPORT_CONTENT_TYPES[export["export_type"]],
+        )
+
     def _serialized_coordinates(self, polygon_wkt):
         string_coord_pairs = polygon_wkt.lstrip("POLYGON (").rstrip(")").split(", ")
 